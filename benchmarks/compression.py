@@ -0,0 +1,52 @@
+"""Compare content encodings compressing pages of artists.
+
+Prints the bytes on the wire and the time spent compressing a page, for
+the default page size of 10 artists and the maximum of 100.
+
+Usage: python benchmarks/compression.py
+"""
+import timeit
+
+from muckr_api.compression import ENCODINGS, _compress, _is_installed
+from muckr_api.json_provider import BACKENDS, _is_installed as _is_json_installed
+
+
+def _page(size):
+    dumps = next(
+        BACKENDS[name](True, str) for name in BACKENDS if _is_json_installed(name)
+    )
+    return dumps(
+        [
+            {"id": n, "name": "The Artist Formerly Known As {}".format(n)}
+            for n in range(size)
+        ]
+    )
+
+
+def main(number=1000):
+    print("{:<8} {:>6} {:>8} {:>12}".format("encoding", "items", "bytes", "per page"))
+    for size in [10, 100]:
+        data = _page(size)
+        print("{:<8} {:>6} {:>8} {:>12}".format("identity", size, len(data), "-"))
+        for encoding in ENCODINGS:
+            if not _is_installed(encoding):
+                print("{:<8} {:>6} {:>8}".format(encoding, size, "n/a"))
+                continue
+
+            seconds = min(
+                timeit.repeat(
+                    lambda: _compress(data, encoding), number=number, repeat=5
+                )
+            )
+            print(
+                "{:<8} {:>6} {:>8} {:>9.1f} us".format(
+                    encoding,
+                    size,
+                    len(_compress(data, encoding)),
+                    seconds / number * 1e6,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
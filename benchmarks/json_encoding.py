@@ -0,0 +1,41 @@
+"""Compare JSON backends encoding a page of 100 venues.
+
+Usage: python benchmarks/json_encoding.py
+"""
+import timeit
+
+import flask
+
+from muckr_api.json_provider import BACKENDS, JSONProvider, _is_installed
+
+
+def _page():
+    return [
+        {"id": n, "name": "venue{}".format(n), "city": "Berlin", "country": "Germany"}
+        for n in range(100)
+    ]
+
+
+def main(number=2000):
+    app = flask.Flask(__name__)
+    data = _page()
+    print("{:<8} {:>12} {:>8}".format("backend", "per page", "bytes"))
+    for backend in BACKENDS:
+        if not _is_installed(backend):
+            print("{:<8} {:>12}".format(backend, "n/a"))
+            continue
+
+        app.config["JSON_BACKEND"] = backend
+        provider = JSONProvider(app)
+        seconds = min(
+            timeit.repeat(lambda: provider.dumps(data), number=number, repeat=5)
+        )
+        print(
+            "{:<8} {:>9.1f} us {:>8}".format(
+                backend, seconds / number * 1e6, len(provider.dumps(data))
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compare building queries on each request with cached compiled queries.
+
+Prints the time per lookup of a user by token and by username, and of an
+artist by id and owner, against an in-memory SQLite database. Both
+variants execute the same SQL; the difference is the ORM overhead of
+building and compiling the query.
+
+Usage: python benchmarks/queries.py
+"""
+import timeit
+import types
+
+import flask
+
+from muckr_api.app import create_app
+from muckr_api.artist.models import Artist
+from muckr_api.extensions import database
+from muckr_api.user.models import User
+from muckr_api.utils import get_owned_or_404
+
+CONFIG = types.SimpleNamespace(
+    SECRET_KEY="benchmark",
+    SQLALCHEMY_DATABASE_URI="sqlite://",
+    SQLALCHEMY_TRACK_MODIFICATIONS=False,
+)
+
+
+def _lookups(user, artist):
+    token, username, id = user.token, user.username, artist.id
+    return [
+        (
+            "token",
+            lambda: User.query.filter_by(token=token).first(),
+            lambda: User.get_by("token", token),
+        ),
+        (
+            "username",
+            lambda: User.query.filter_by(username=username).first(),
+            lambda: User.get_by("username", username),
+        ),
+        (
+            "artist",
+            lambda: Artist.query.filter(
+                Artist.id == id, Artist.user_id == user.id
+            ).first(),
+            lambda: get_owned_or_404(Artist, id),
+        ),
+    ]
+
+
+def main(number=2000):
+    app = create_app(CONFIG)
+    with app.test_request_context():
+        database.create_all()
+        user = User(username="user", email="user@example.com")
+        user.get_token()
+        artist = Artist(name="artist", user=user)
+        database.session.add(artist)
+        database.session.commit()
+        flask.g.current_user = user
+
+        print("{:<10} {:>12} {:>12}".format("lookup", "query", "cached"))
+        for name, query, cached in _lookups(user, artist):
+            times = [
+                min(timeit.repeat(function, number=number, repeat=5)) / number
+                for function in (query, cached)
+            ]
+            print(
+                "{:<10} {:>9.1f} us {:>9.1f} us".format(
+                    name, times[0] * 1e6, times[1] * 1e6
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
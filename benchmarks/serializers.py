@@ -0,0 +1,61 @@
+"""Compare compiled serializers with plain marshmallow.
+
+Usage: python benchmarks/serializers.py
+"""
+import timeit
+
+import marshmallow
+
+from muckr_api.artist.models import Artist, ArtistSchema
+from muckr_api.user.models import User, UserSchema
+from muckr_api.venue.models import Venue, VenueSchema
+
+
+def _objects():
+    return {
+        ArtistSchema: [Artist(id=n, name="artist{}".format(n)) for n in range(100)],
+        VenueSchema: [
+            Venue(id=n, name="venue{}".format(n), city="Berlin", country="Germany")
+            for n in range(100)
+        ],
+        UserSchema: [
+            User(
+                id=n, username="user{}".format(n), email="user{}@example.com".format(n)
+            )
+            for n in range(100)
+        ],
+    }
+
+
+def main(number=200):
+    print(
+        "{:<14} {:>14} {:>14} {:>8}".format(
+            "schema", "marshmallow", "compiled", "speedup"
+        )
+    )
+    for schema_class, objects in _objects().items():
+        schema = schema_class(many=True)
+        assert schema.dump(objects) == marshmallow.Schema.dump(schema, objects)
+
+        plain = min(
+            timeit.repeat(
+                lambda: marshmallow.Schema.dump(schema, objects),
+                number=number,
+                repeat=5,
+            )
+        )
+        compiled = min(
+            timeit.repeat(lambda: schema.dump(objects), number=number, repeat=5)
+        )
+        print(
+            "{:<14} {:>11.1f} us {:>11.1f} us {:>7.1f}x".format(
+                schema_class.__name__,
+                plain / number * 1e6,
+                compiled / number * 1e6,
+                plain / compiled,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
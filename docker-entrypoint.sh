@@ -10,4 +10,4 @@ do
      sleep 1
 done
 
-exec gunicorn --bind 0.0.0.0:5000 --forwarded-allow-ips='*' wsgi:app
+exec gunicorn --worker-class gthread --threads 8 --bind 0.0.0.0:5000 --forwarded-allow-ips='*' wsgi:app
@@ -0,0 +1,46 @@
+"""Create indexes for searching artists and venues by name."""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "3f7b2d8c6a15"
+down_revision = "c81d6f0b2e95"
+branch_labels = None
+depends_on = None
+
+TABLES = ["artists", "venues"]
+
+
+def upgrade():
+    postgresql = op.get_bind().dialect.name == "postgresql"
+    if postgresql:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for table in TABLES:
+        if postgresql:
+            # text_pattern_ops lets prefix searches use the index under any
+            # collation; the trigram index serves substring searches.
+            op.execute(
+                "CREATE INDEX ix_{0}_user_id_lower_name ON {0} "
+                "(user_id, lower(name) text_pattern_ops)".format(table)
+            )
+            op.execute(
+                "CREATE INDEX ix_{0}_lower_name_trgm ON {0} "
+                "USING gin (lower(name) gin_trgm_ops)".format(table)
+            )
+        else:
+            op.create_index(
+                "ix_{}_user_id_lower_name".format(table),
+                table,
+                ["user_id", sa.text("lower(name)")],
+                unique=False,
+            )
+
+
+def downgrade():
+    postgresql = op.get_bind().dialect.name == "postgresql"
+    for table in TABLES:
+        if postgresql:
+            op.drop_index("ix_{}_lower_name_trgm".format(table), table_name=table)
+        op.drop_index("ix_{}_user_id_lower_name".format(table), table_name=table)
@@ -0,0 +1,28 @@
+"""Create indexes for paginating artists and venues by user."""
+
+from alembic import op
+
+
+revision = "5d0b7e2c4f81"
+down_revision = "c3e1f0a9d2b7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ["artists", "venues"]:
+        op.create_index(
+            "ix_{}_user_id_id".format(table), table, ["user_id", "id"], unique=False
+        )
+        op.create_index(
+            "ix_{}_user_id_name".format(table),
+            table,
+            ["user_id", "name", "id"],
+            unique=False,
+        )
+
+
+def downgrade():
+    for table in ["artists", "venues"]:
+        op.drop_index("ix_{}_user_id_name".format(table), table_name=table)
+        op.drop_index("ix_{}_user_id_id".format(table), table_name=table)
@@ -0,0 +1,23 @@
+"""Create column users.is_deleting."""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "6c1a9e3f5b28"
+down_revision = "8d2e6a4f1c37"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "users",
+        sa.Column(
+            "is_deleting", sa.Boolean(), nullable=False, server_default=sa.false()
+        ),
+    )
+
+
+def downgrade():
+    op.drop_column("users", "is_deleting")
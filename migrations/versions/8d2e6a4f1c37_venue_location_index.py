@@ -0,0 +1,22 @@
+"""Create an index for filtering venues by country and city."""
+
+from alembic import op
+
+
+revision = "8d2e6a4f1c37"
+down_revision = "3f7b2d8c6a15"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_venues_user_id_country_city",
+        "venues",
+        ["user_id", "country", "city"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_venues_user_id_country_city", table_name="venues")
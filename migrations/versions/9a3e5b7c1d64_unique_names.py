@@ -0,0 +1,100 @@
+"""Make artist and venue names unique per user."""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "9a3e5b7c1d64"
+down_revision = "f4c8a1e37d20"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def _find_duplicates(connection, table):
+    # Return the rows sharing their name with a row of the same user that
+    # has a lower id, which keeps the name.
+    first = (
+        sa.select([table.c.user_id, table.c.name, sa.func.min(table.c.id).label("id")])
+        .group_by(table.c.user_id, table.c.name)
+        .having(sa.func.count() > 1)
+        .alias("first")
+    )
+    join = table.join(
+        first,
+        sa.and_(table.c.user_id == first.c.user_id, table.c.name == first.c.name),
+    )
+    query = (
+        sa.select([table.c.id, table.c.user_id, table.c.name])
+        .select_from(join)
+        .where(table.c.id != first.c.id)
+        .order_by(table.c.id)
+    )
+    return connection.execute(query).fetchall()
+
+
+def _rename_duplicates(connection, name):
+    """Rename duplicate names of a user by appending the id of the row.
+
+    Duplicates could be created before, as admins' edits were checked
+    against their own names rather than the owner's.
+    """
+    table = sa.table(
+        name,
+        sa.column("id", sa.Integer),
+        sa.column("user_id", sa.Integer),
+        sa.column("name", sa.String),
+        sa.column("version_id", sa.Integer),
+    )
+    users = sa.table(
+        "users", sa.column("id", sa.Integer), sa.column(name + "_version", sa.Integer)
+    )
+    collection_version = users.c[name + "_version"]
+
+    duplicates = _find_duplicates(connection, table)
+    for id, user_id, value in duplicates:
+        suffix = " ({})".format(id)
+        renamed = value[: 128 - len(suffix)] + suffix
+        logger.warning("Renaming %s %d of user %d to %r", name, id, user_id, renamed)
+        connection.execute(
+            table.update()
+            .where(table.c.id == id)
+            .values(name=renamed, version_id=table.c.version_id + 1)
+        )
+
+    user_ids = sorted({user_id for _, user_id, _ in duplicates})
+    if user_ids:
+        connection.execute(
+            users.update()
+            .where(users.c.id.in_(user_ids))
+            .values({collection_version: collection_version + 1})
+        )
+
+    remaining = _find_duplicates(connection, table)
+    if remaining:
+        raise RuntimeError(
+            "cannot make {} names unique, rename these rows first: {}".format(
+                name, ", ".join(str(row.id) for row in remaining)
+            )
+        )
+
+
+def upgrade():
+    connection = op.get_bind()
+    for table in ["artists", "venues"]:
+        _rename_duplicates(connection, table)
+        # Deferred, so that rows may swap names within a transaction.
+        op.create_unique_constraint(
+            "uq_{}_user_id_name".format(table),
+            table,
+            ["user_id", "name"],
+            deferrable=True,
+            initially="DEFERRED",
+        )
+
+
+def downgrade():
+    for table in ["artists", "venues"]:
+        op.drop_constraint("uq_{}_user_id_name".format(table), table, type_="unique")
@@ -0,0 +1,23 @@
+"""Add artist and venue collection versions to users."""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "b2f9d4e61a58"
+down_revision = "e7a4c2d9b0f3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for column in ["artists_version", "venues_version"]:
+        op.add_column(
+            "users",
+            sa.Column(column, sa.Integer(), nullable=False, server_default="0"),
+        )
+
+
+def downgrade():
+    for column in ["venues_version", "artists_version"]:
+        op.drop_column("users", column)
@@ -0,0 +1,31 @@
+"""Create table revoked_tokens."""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "c3e1f0a9d2b7"
+down_revision = "17b2d9bb4a15"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "revoked_tokens",
+        sa.Column("jti", sa.String(length=64), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(), nullable=False),
+        sa.Column("expiration", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("jti"),
+    )
+    op.create_index(
+        op.f("ix_revoked_tokens_expiration"),
+        "revoked_tokens",
+        ["expiration"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_revoked_tokens_expiration"), table_name="revoked_tokens")
+    op.drop_table("revoked_tokens")
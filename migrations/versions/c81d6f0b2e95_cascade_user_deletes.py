@@ -0,0 +1,32 @@
+"""Delete artists and venues with their user."""
+
+from alembic import op
+
+
+revision = "c81d6f0b2e95"
+down_revision = "9a3e5b7c1d64"
+branch_labels = None
+depends_on = None
+
+# The foreign key of venues was created without a name, so it has the
+# default name given by PostgreSQL.
+OLD_NAMES = {"artists": "fk_user_id", "venues": "venues_user_id_fkey"}
+
+
+def upgrade():
+    for table, name in OLD_NAMES.items():
+        op.drop_constraint(name, table, type_="foreignkey")
+        op.create_foreign_key(
+            "fk_{}_user_id".format(table),
+            table,
+            "users",
+            ["user_id"],
+            ["id"],
+            ondelete="CASCADE",
+        )
+
+
+def downgrade():
+    for table, name in OLD_NAMES.items():
+        op.drop_constraint("fk_{}_user_id".format(table), table, type_="foreignkey")
+        op.create_foreign_key(name, table, "users", ["user_id"], ["id"])
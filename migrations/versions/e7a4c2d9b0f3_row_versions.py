@@ -0,0 +1,23 @@
+"""Add row versions to users, artists and venues."""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "e7a4c2d9b0f3"
+down_revision = "5d0b7e2c4f81"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ["users", "artists", "venues"]:
+        op.add_column(
+            table,
+            sa.Column("version_id", sa.Integer(), nullable=False, server_default="1"),
+        )
+
+
+def downgrade():
+    for table in ["users", "artists", "venues"]:
+        op.drop_column(table, "version_id")
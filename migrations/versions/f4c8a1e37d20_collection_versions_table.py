@@ -0,0 +1,24 @@
+"""Create collection versions table."""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "f4c8a1e37d20"
+down_revision = "b2f9d4e61a58"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    table = op.create_table(
+        "collection_versions",
+        sa.Column("name", sa.String(length=32), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.bulk_insert(table, [{"name": "users", "version": 0}])
+
+
+def downgrade():
+    op.drop_table("collection_versions")
@@ -1,9 +1,11 @@
+from pathlib import Path
+
 import nox
 
 
 nox.options.sessions = "lint", "tests", "pytype"
 
-locations = "migrations", "noxfile.py", "src", "tests", "wsgi.py"
+locations = "benchmarks", "migrations", "noxfile.py", "src", "tests", "wsgi.py"
 
 
 @nox.session(python="3.7")
@@ -44,3 +46,12 @@ def integration_tests(session):
     session.run(
         "pytest", "-m", "integration_test", "--with-integration-tests", *session.posargs
     )
+
+
+@nox.session(python="3.7")
+def benchmarks(session):
+    """Run the benchmarks."""
+    env = {"VIRTUAL_ENV": session.virtualenv.location}
+    session.run("poetry", "install", external=True, env=env)
+    for benchmark in sorted(Path("benchmarks").glob("*.py")):
+        session.run("python", str(benchmark))
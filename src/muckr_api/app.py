@@ -1,7 +1,11 @@
 """The app module, containing the app factory function."""
 import importlib
+import sqlite3
 
 import flask
+import sqlalchemy
+import sqlalchemy.ext.compiler
+import sqlalchemy.orm.exc
 
 import muckr_api
 import muckr_api.extensions
@@ -9,8 +13,13 @@ import muckr_api.errors
 import muckr_api.commands
 import muckr_api.artist.views
 import muckr_api.main.views
+import muckr_api.user.auth
+import muckr_api.user.deletion
 import muckr_api.user.views
+import muckr_api.user.hashing
+import muckr_api.user.tokens
 import muckr_api.venue.views
+import muckr_api.versions
 
 
 def create_app(config_object="muckr_api.config"):
@@ -29,8 +38,34 @@ def create_app(config_object="muckr_api.config"):
 def register_extensions(app):
     muckr_api.extensions.database.init_app(app)
     muckr_api.extensions.migrate.init_app(app, muckr_api.extensions.database)
+    muckr_api.extensions.replica.init_app(app, muckr_api.extensions.database)
+    muckr_api.extensions.database_pool.init_app(app)
     muckr_api.extensions.bcrypt.init_app(app)
+    muckr_api.extensions.hasher.init_app(app)
     muckr_api.extensions.cors.init_app(app)
+    muckr_api.extensions.token_cache.init_app(app)
+    muckr_api.extensions.response_cache.init_app(app)
+    muckr_api.extensions.json_provider.init_app(app)
+    muckr_api.user.tokens.signed_tokens.init_app(app)
+    muckr_api.user.deletion.user_deleter.init_app(app)
+    muckr_api.extensions.compress.init_app(app)
+
+
+@sqlalchemy.event.listens_for(sqlalchemy.engine.Engine, "connect")
+def _enable_sqlite_foreign_keys(connection, record):
+    # SQLite ignores foreign keys, including ON DELETE CASCADE, by default.
+    if isinstance(connection, sqlite3.Connection):
+        cursor = connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+@sqlalchemy.ext.compiler.compiles(sqlalchemy.UniqueConstraint, "sqlite")
+def _compile_sqlite_unique_constraint(constraint, compiler, **kwargs):
+    # SQLite checks unique constraints on each row, and rejects DEFERRABLE.
+    text = compiler.visit_unique_constraint(constraint, **kwargs)
+    deferrability = compiler.define_constraint_deferrability(constraint)
+    return text[: len(text) - len(deferrability)]
 
 
 def register_blueprints(app):
@@ -42,6 +77,15 @@ def register_blueprints(app):
 
 def register_errorhandlers(app):
     app.errorhandler(muckr_api.errors.APIError)(muckr_api.errors.APIError.handle)
+    app.errorhandler(muckr_api.user.hashing.HasherBusyError)(
+        muckr_api.errors.handle_busy
+    )
+    app.errorhandler(sqlalchemy.orm.exc.StaleDataError)(
+        muckr_api.errors.handle_conflict
+    )
+    app.errorhandler(sqlalchemy.orm.exc.ObjectDeletedError)(
+        muckr_api.user.auth.handle_object_deleted
+    )
     for status_code in [401, 404, 500]:
         app.errorhandler(status_code)(muckr_api.errors.handle_error)
 
@@ -64,3 +108,4 @@ def register_shellcontext(app):
 def register_commands(app):
     app.cli.add_command(muckr_api.commands.create_admin)
     app.cli.add_command(muckr_api.commands.client)
+    app.cli.add_command(muckr_api.commands.delete_users)
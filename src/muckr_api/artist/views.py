@@ -2,41 +2,95 @@
 import flask
 from marshmallow import ValidationError
 
+from muckr_api.bulk import (
+    create_items,
+    delete_items,
+    get_ids,
+    get_items,
+    load_collection,
+    load_items,
+    load_updates,
+    sync_items,
+    update_items,
+)
 from muckr_api.errors import APIError
-from muckr_api.extensions import database
+from muckr_api.extensions import database, replica, response_cache
 from muckr_api.user.auth import token_auth
 from muckr_api.artist.models import Artist, ArtistSchema
+from muckr_api.search import filter_by_name
+from muckr_api.serializers import get_schema
 from muckr_api.utils import (
-    check_unique_on_create,
-    check_unique_on_update,
+    check_if_match,
+    commit_unique,
+    get_etag,
+    get_fields,
+    get_owned_or_404,
+    is_not_modified,
     jsonify,
+    load_fields,
+    not_modified,
     paginate,
+    stream_ndjson,
 )
+from muckr_api.versions import get_collection_etag
 
 
 blueprint = flask.Blueprint("artist", __name__)
 artist_schema = ArtistSchema()
 artists_schema = ArtistSchema(many=True)
+sort_keys = {"id": Artist.id, "name": Artist.name}
 
 
 @blueprint.route("/artists", methods=["GET"])
+@replica.read_only
 @token_auth.login_required
 def get_artists():
-    artists = paginate(flask.g.current_user.artists)
-    data = artists_schema.dump(artists.items)
+    fields = get_fields(artists_schema)
+    ids = get_ids() if "ids" in flask.request.args else None
+    etag = get_collection_etag(flask.g.current_user, "artists")
+    if is_not_modified(etag):
+        return not_modified(etag)
+
+    response = response_cache.get(etag)
+    if response is None:
+        schema = get_schema(ArtistSchema, fields, many=True)
+        if ids is None:
+            query = filter_by_name(flask.g.current_user.artists, Artist)
+            artists = paginate(query, sort_keys, fields=fields)
+            response = jsonify(
+                schema.dump(artists.items), headers=artists.headers, etag=etag
+            )
+        else:
+            options = load_fields(fields)
+            artists, missing = get_items(Artist, flask.g.current_user.id, ids, *options)
+            data = {"items": schema.dump(artists), "missing": missing}
+            response = jsonify(data, etag=etag)
+        response_cache.add(etag, response, "artists", flask.g.current_user.id)
+
+    return response
 
-    return jsonify(data)
+
+@blueprint.route("/artists/export", methods=["GET"])
+@token_auth.login_required
+def export_artists():
+    fields = get_fields(artist_schema)
+    query = flask.g.current_user.artists.options(*load_fields(fields))
+    return stream_ndjson(query.order_by(Artist.id), get_schema(ArtistSchema, fields))
 
 
 @blueprint.route("/artists/<int:id>", methods=["GET"])
+@replica.read_only
 @token_auth.login_required
 def get_artist(id):
-    artist = Artist.query.get_or_404(id)
-    if artist.user.id != flask.g.current_user.id and not flask.g.current_user.is_admin:
-        raise APIError(404)
-    data = artist_schema.dump(artist)
+    fields = get_fields(artist_schema)
+    artist = get_owned_or_404(Artist, id, fields)
+
+    etag = get_etag(artist, fields)
+    if is_not_modified(etag):
+        return not_modified(etag)
 
-    return jsonify(data)
+    data = get_schema(ArtistSchema, fields).dump(artist)
+    return jsonify(data, etag=etag)
 
 
 @blueprint.route("/artists", methods=["POST"])
@@ -49,28 +103,56 @@ def create_artist():
     except ValidationError as error:
         raise APIError(422, details=error.messages)
 
-    check_unique_on_create(flask.g.current_user.artists, data, ["name"])
-
     artist = Artist(**data)
     artist.user = flask.g.current_user
 
     database.session.add(artist)
-    database.session.commit()
+    commit_unique(flask.g.current_user.artists, data, ["name"])
 
     data = artist_schema.dump(artist)
 
-    response = jsonify(data)
+    response = jsonify(data, etag=get_etag(artist))
     response.status_code = 201
     response.headers["Location"] = flask.url_for("artist.get_artist", id=artist.id)
     return response
 
 
+@blueprint.route("/artists/bulk", methods=["POST"])
+@token_auth.login_required
+def create_artists():
+    items = load_items(ArtistSchema)
+    artists = create_items(Artist, flask.g.current_user.id, items)
+    return jsonify(artists_schema.dump(artists)), 201
+
+
+@blueprint.route("/artists", methods=["PUT"])
+@token_auth.login_required
+def sync_artists():
+    items = load_collection(ArtistSchema)
+    return jsonify(sync_items(Artist, flask.g.current_user.id, items))
+
+
+@blueprint.route("/artists", methods=["PATCH"])
+@token_auth.login_required
+def update_artists():
+    items = load_updates(ArtistSchema)
+    artists = update_items(Artist, flask.g.current_user.id, items)
+    return jsonify(artists_schema.dump(artists))
+
+
+@blueprint.route("/artists", methods=["DELETE"])
+@token_auth.login_required
+def delete_artists():
+    delete_items(Artist, flask.g.current_user.id, get_ids())
+    return jsonify({}), 204
+
+
 @blueprint.route("/artists/<int:id>", methods=["PUT"])
 @token_auth.login_required
 def update_artist(id):
-    artist = Artist.query.get_or_404(id)
-    if artist.user.id != flask.g.current_user.id and not flask.g.current_user.is_admin:
-        raise APIError(404)
+    artist = get_owned_or_404(Artist, id)
+
+    check_if_match(artist)
 
     json = flask.request.get_json() or {}
 
@@ -79,23 +161,22 @@ def update_artist(id):
     except ValidationError as error:
         raise APIError(422, details=error.messages)
 
-    check_unique_on_update(flask.g.current_user.artists, artist, data, ["name"])
-
+    query = Artist.query.filter_by(user_id=artist.user_id)
     for key, value in data.items():
         setattr(artist, key, value)
 
-    database.session.commit()
+    commit_unique(query, data, ["name"], artist)
 
     data = ArtistSchema().dump(artist)
-    return jsonify(data)
+    return jsonify(data, etag=get_etag(artist))
 
 
 @blueprint.route("/artists/<int:id>", methods=["DELETE"])
 @token_auth.login_required
 def delete_artist(id):
-    artist = Artist.query.get_or_404(id)
-    if artist.user.id != flask.g.current_user.id and not flask.g.current_user.is_admin:
-        raise APIError(404)
+    artist = get_owned_or_404(Artist, id)
+
+    check_if_match(artist)
 
     database.session.delete(artist)
     database.session.commit()
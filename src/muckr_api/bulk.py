@@ -0,0 +1,447 @@
+"""Bulk operations on artists and venues.
+
+Errors concerning individual items are reported in ``details``, keyed by
+the index of the item in the request.
+"""
+import flask
+import sqlalchemy
+import sqlalchemy.exc
+from marshmallow import EXCLUDE, Schema, ValidationError, fields
+
+from muckr_api.errors import APIError
+from muckr_api.extensions import database
+from muckr_api.versions import bump_versions
+
+MAX_ITEMS = 1000
+SYNC_MAX_ITEMS = 10000
+
+
+class _IdSchema(Schema):
+    id = fields.Integer(required=True, strict=True)
+
+    class Meta:
+        unknown = EXCLUDE
+
+
+def _by_index(errors):
+    return {str(index): messages for index, messages in errors.items()}
+
+
+def _check_size(count, setting="BULK_MAX_ITEMS", default=MAX_ITEMS):
+    max_items = flask.current_app.config.get(setting, default)
+    if count > max_items:
+        message = "at most {} items are allowed".format(max_items)
+        raise APIError(413, message=message)
+
+
+def _get_json(*args):
+    json = flask.request.get_json()
+    if json is None:
+        json = {}
+    if isinstance(json, list):
+        _check_size(len(json), *args)
+    return json
+
+
+def load_items(schema_class, **kwargs):
+    """Validate the list of items in the request body.
+
+    At most ``BULK_MAX_ITEMS`` items are accepted. Keyword arguments are
+    passed to the schema.
+    """
+    try:
+        return schema_class(many=True, **kwargs).load(_get_json())
+    except ValidationError as error:
+        raise APIError(422, details=_by_index(error.messages))
+
+
+def load_collection(schema_class):
+    """Validate the complete collection in the request body.
+
+    At most ``BULK_SYNC_MAX_ITEMS`` items are accepted, and names must not
+    repeat.
+    """
+    json = _get_json("BULK_SYNC_MAX_ITEMS", SYNC_MAX_ITEMS)
+    try:
+        items = schema_class(many=True).load(json)
+    except ValidationError as error:
+        raise APIError(422, details=_by_index(error.messages))
+
+    _raise_taken(items, set())
+    return items
+
+
+def load_updates(schema_class):
+    """Validate the list of changes in the request body.
+
+    Each item holds the id of a row and the fields to change in it.
+    """
+    json = _get_json()
+    errors = {}
+    try:
+        ids = [item["id"] for item in _IdSchema(many=True).load(json)]
+    except ValidationError as error:
+        errors = error.messages
+
+    if isinstance(json, list):
+        json = [
+            {key: value for key, value in item.items() if key != "id"}
+            if isinstance(item, dict)
+            else item
+            for item in json
+        ]
+
+    try:
+        items = schema_class(many=True, partial=True).load(json)
+    except ValidationError as error:
+        for index, messages in error.messages.items():
+            if isinstance(messages, dict):
+                errors.setdefault(index, {}).update(messages)
+            else:
+                errors[index] = messages
+
+    if errors:
+        raise APIError(422, details=_by_index(errors))
+
+    message = "each id may appear only once"
+    details = {}
+    for index, id in enumerate(ids):
+        if ids.index(id) != index:
+            details[str(index)] = {"id": message}
+    if details:
+        raise APIError(400, message=message, details=details)
+
+    return [dict(item, id=id) for id, item in zip(ids, items)]
+
+
+def get_ids():
+    """Return the ids in the ``ids`` request argument.
+
+    The argument is a comma-separated list of ids, of which at most
+    ``BULK_MAX_ITEMS`` are accepted.
+    """
+    value = flask.request.args.get("ids", "")
+    try:
+        ids = [int(id) for id in value.split(",") if id.strip()]
+    except ValueError:
+        ids = None
+
+    if not ids:
+        message = "please pass a comma-separated list of ids"
+        raise APIError(400, message=message, details={"ids": message})
+
+    ids = list(dict.fromkeys(ids))
+    _check_size(len(ids))
+    return ids
+
+
+def check_names(model, user_id, items, exclude=()):
+    """Raise 400 if items repeat a name, or use the name of another row.
+
+    Rows whose ids are in ``exclude`` are not considered.
+    """
+    names = {item["name"] for item in items if "name" in item}
+    taken = set()
+    if names:
+        query = database.session.query(model.name).filter(
+            model.user_id == user_id, model.name.in_(names)
+        )
+        if exclude:
+            query = query.filter(~model.id.in_(exclude))
+        taken = {name for name, in query}
+
+    _raise_taken(items, taken)
+
+
+def _raise_taken(items, taken):
+    message = "please use a different name"
+    details = {}
+    for index, item in enumerate(items):
+        name = item.get("name")
+        if name is None:
+            continue
+        if name in taken:
+            details[str(index)] = {"name": message}
+        taken.add(name)
+
+    if details:
+        raise APIError(400, message=message, details=details)
+
+
+def get_items(model, user_id, ids, *options):
+    """Return the rows of the user with the ids, and the ids not found.
+
+    The rows are loaded with a single query and returned in the order of
+    the ids.
+    """
+    query = model.query.options(*options).filter(
+        model.user_id == user_id, model.id.in_(ids)
+    )
+    by_id = {instance.id: instance for instance in query}
+    items = [by_id[id] for id in ids if id in by_id]
+    missing = [id for id in ids if id not in by_id]
+    return items, missing
+
+
+def _execute(statement, condition):
+    """Execute the statement, returning the rows written by it.
+
+    Without RETURNING, the rows are read back using the condition.
+    """
+    table = statement.table
+    if database.session.connection().dialect.name == "postgresql":
+        rows = database.session.execute(statement.returning(*table.c))
+    else:
+        database.session.execute(statement)
+        rows = database.session.execute(table.select().where(condition))
+    return [dict(row) for row in rows]
+
+
+def _raise_not_found(model, user_id, ids):
+    # The transaction was rolled back, so this sees the rows as they were.
+    table = model.__table__
+    found = {
+        id
+        for id, in database.session.execute(
+            sqlalchemy.select([table.c.id]).where(
+                sqlalchemy.and_(table.c.user_id == user_id, table.c.id.in_(ids))
+            )
+        )
+    }
+    message = "not found"
+    details = {
+        str(index): {"id": message} for index, id in enumerate(ids) if id not in found
+    }
+    raise APIError(404, details=details)
+
+
+def _insert(model, user_id, items):
+    table = model.__table__
+    statement = table.insert().values([dict(item, user_id=user_id) for item in items])
+    names = [item["name"] for item in items]
+    rows = _execute(
+        statement, sqlalchemy.and_(table.c.user_id == user_id, table.c.name.in_(names))
+    )
+    by_name = {row["name"]: row for row in rows}
+    return [by_name[name] for name in names]
+
+
+def _update(model, user_id, items):
+    table = model.__table__
+    ids = [item["id"] for item in items]
+    keys = sorted({key for item in items for key in item} - {"id"})
+
+    # Each column is set from a CASE expression on the id, keeping the
+    # current value in rows where it is not changed.
+    values = {"version_id": table.c.version_id + 1}
+    for key in keys:
+        changes = {item["id"]: item[key] for item in items if key in item}
+        values[key] = sqlalchemy.case(changes, value=table.c.id, else_=table.c[key])
+
+    condition = sqlalchemy.and_(table.c.user_id == user_id, table.c.id.in_(ids))
+    rows = _execute(table.update().where(condition).values(values), condition)
+    by_id = {row["id"]: row for row in rows}
+    return [by_id.get(id) for id in ids]
+
+
+def create_items(model, user_id, items):
+    """Insert the items for the user with a single statement, and commit.
+
+    Returns the new rows, in the order of the items.
+    """
+    if not items:
+        return []
+
+    check_names(model, user_id, items)
+
+    try:
+        rows = _insert(model, user_id, items)
+        bump_versions(model.__tablename__, [user_id])
+        database.session.commit()
+    except sqlalchemy.exc.IntegrityError:
+        # Another request created one of the names since they were checked.
+        database.session.rollback()
+        check_names(model, user_id, items)
+        raise APIError(409)
+
+    return rows
+
+
+def _raise_swapped(model, user_id, items, renamed):
+    # Only a deferred unique constraint, as on PostgreSQL, lets rows take
+    # each other's names in one statement.
+    table = model.__table__
+    names = [item["name"] for item in items if "name" in item]
+    owners = {
+        name: id
+        for name, id in database.session.execute(
+            sqlalchemy.select([table.c.name, table.c.id]).where(
+                sqlalchemy.and_(
+                    table.c.user_id == user_id,
+                    table.c.name.in_(names),
+                    table.c.id.in_(renamed),
+                )
+            )
+        )
+    }
+    message = "cannot swap names within a request"
+    details = {
+        str(index): {"name": message}
+        for index, item in enumerate(items)
+        if "name" in item and owners.get(item["name"], item["id"]) != item["id"]
+    }
+    if details:
+        raise APIError(400, message=message, details=details)
+
+
+def update_items(model, user_id, items):
+    """Apply the changes to rows of the user with a single statement.
+
+    Returns the changed rows, in the order of the items. Raises 404 if a
+    row does not exist or belongs to another user, changing no rows. Rows
+    may swap names only where the unique constraint on names is deferred,
+    as on PostgreSQL; elsewhere, this raises 400.
+    """
+    if not items:
+        return []
+
+    renamed = [item["id"] for item in items if "name" in item]
+    check_names(model, user_id, items, exclude=renamed)
+
+    ids = [item["id"] for item in items]
+    try:
+        rows = _update(model, user_id, items)
+        if None in rows:
+            database.session.rollback()
+            _raise_not_found(model, user_id, ids)
+        bump_versions(model.__tablename__, [user_id])
+        database.session.commit()
+    except sqlalchemy.exc.IntegrityError:
+        # Names were taken since they were checked, or swapped between rows.
+        database.session.rollback()
+        check_names(model, user_id, items, exclude=renamed)
+        _raise_swapped(model, user_id, items, renamed)
+        raise APIError(409)
+
+    return rows
+
+
+def delete_items(model, user_id, ids):
+    """Delete rows of the user with a single statement.
+
+    Raises 404 if a row does not exist or belongs to another user,
+    deleting no rows.
+    """
+    table = model.__table__
+    result = database.session.execute(
+        table.delete().where(
+            sqlalchemy.and_(table.c.user_id == user_id, table.c.id.in_(ids))
+        )
+    )
+    if result.rowcount < len(ids):
+        database.session.rollback()
+        _raise_not_found(model, user_id, ids)
+
+    bump_versions(model.__tablename__, [user_id])
+    database.session.commit()
+
+
+def _create_temporary_table(table, columns, items):
+    temporary = sqlalchemy.Table(
+        "sync_{}".format(table.name),
+        sqlalchemy.MetaData(),
+        *[sqlalchemy.Column(column.name, column.type) for column in columns],
+        prefixes=["TEMPORARY"]
+    )
+    connection = database.session.connection()
+    temporary.create(connection)
+    if items:
+        connection.execute(
+            temporary.insert(),
+            [
+                {column.name: item.get(column.name) for column in columns}
+                for item in items
+            ],
+        )
+    return temporary
+
+
+def _sync(model, user_id, items):
+    table = model.__table__
+    columns = [
+        column
+        for column in table.c
+        if column.name not in ("id", "user_id", "version_id")
+    ]
+    temporary = _create_temporary_table(table, columns, items)
+    execute = database.session.execute
+
+    owned = table.c.user_id == user_id
+    desired = sqlalchemy.select([temporary.c.name])
+    existing = sqlalchemy.select([table.c.name]).where(owned)
+
+    deleted = execute(
+        table.delete().where(sqlalchemy.and_(owned, table.c.name.notin_(desired)))
+    ).rowcount
+
+    updated = 0
+    fields = [column for column in columns if column.name != "name"]
+    if fields:
+        matches = temporary.c.name == table.c.name
+        changed = sqlalchemy.or_(
+            *[temporary.c[column.name].is_distinct_from(column) for column in fields]
+        )
+        values = {
+            column.name: sqlalchemy.select([temporary.c[column.name]])
+            .where(matches)
+            .as_scalar()
+            for column in fields
+        }
+        values["version_id"] = table.c.version_id + 1
+        updated = execute(
+            table.update()
+            .where(
+                sqlalchemy.and_(
+                    owned, sqlalchemy.exists().where(sqlalchemy.and_(matches, changed)),
+                )
+            )
+            .values(values)
+        ).rowcount
+
+    created = execute(
+        table.insert().from_select(
+            ["user_id"] + [column.name for column in columns],
+            sqlalchemy.select(
+                [sqlalchemy.literal(user_id)]
+                + [temporary.c[column.name] for column in columns]
+            ).where(temporary.c.name.notin_(existing)),
+        )
+    ).rowcount
+
+    temporary.drop(database.session.connection())
+    return {
+        "created": created,
+        "updated": updated,
+        "deleted": deleted,
+        "unchanged": len(items) - created - updated,
+    }
+
+
+def sync_items(model, user_id, items):
+    """Make the rows of the user match the items, in a single transaction.
+
+    Items are matched to rows by name. The items are loaded into a
+    temporary table, and the rows are deleted, updated and created with
+    one statement each. Returns the number of rows in each case.
+    """
+    try:
+        summary = _sync(model, user_id, items)
+        if summary["created"] or summary["updated"] or summary["deleted"]:
+            bump_versions(model.__tablename__, [user_id])
+        database.session.commit()
+    except sqlalchemy.exc.IntegrityError:
+        # Another request created one of the names in the meantime.
+        database.session.rollback()
+        raise APIError(409)
+
+    return summary
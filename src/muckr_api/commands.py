@@ -8,6 +8,7 @@ import flask
 import flask.cli
 import requests
 
+from muckr_api.user.deletion import user_deleter
 from muckr_api.user.models import User
 from muckr_api.extensions import database
 
@@ -25,6 +26,15 @@ def create_admin():
     database.session.commit()
 
 
+@click.command()
+@flask.cli.with_appcontext
+def delete_users():
+    """Finish deleting users whose deletion was interrupted."""
+    for user_id in user_deleter.pending():
+        click.echo(f"Deleting user {user_id}")
+        user_deleter.delete(user_id)
+
+
 def _get_admin_credentials(url):
     app = _get_heroku_app_from_url(url)
     if app:
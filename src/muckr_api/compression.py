@@ -0,0 +1,167 @@
+"""Response compression.
+
+Responses are compressed with gzip, and with `brotli`_ or `zstandard`_ if
+they are installed, using the best encoding accepted by the client. The
+``COMPRESS_ALGORITHMS`` setting lists the encodings in order of preference;
+it is consulted when the client accepts several encodings equally.
+
+Responses smaller than ``COMPRESS_MIN_SIZE`` bytes are sent uncompressed,
+as are responses of blueprints listed in ``COMPRESS_EXCLUDE_BLUEPRINTS``.
+Streaming responses are compressed as they are generated.
+
+.. _brotli: https://github.com/google/brotli
+.. _zstandard: https://github.com/indygreg/python-zstandard
+"""
+import importlib
+import importlib.util
+import zlib
+
+import flask
+
+
+def _gzip():
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return (
+        compressor.compress,
+        lambda: compressor.flush(zlib.Z_SYNC_FLUSH),
+        compressor.flush,
+    )
+
+
+def _brotli():
+    brotli = importlib.import_module("brotli")
+    compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=4)
+    return compressor.process, compressor.flush, compressor.finish
+
+
+def _zstd():
+    zstandard = importlib.import_module("zstandard")
+    compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    return (
+        compressor.compress,
+        lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+        compressor.flush,
+    )
+
+
+# Each function returns a new compressor, as a function compressing data,
+# a function flushing the data compressed so far, and a function ending
+# the stream. The levels trade some compression for speed, which suits
+# responses that are compressed on every request.
+ENCODINGS = {"br": _brotli, "zstd": _zstd, "gzip": _gzip}
+
+_MODULES = {"br": "brotli", "zstd": "zstandard"}
+
+# Uncompressed bytes of a streaming response after which the compressed
+# output is flushed to the client.
+STREAM_FLUSH_SIZE = 64 * 1024
+
+
+def _is_installed(encoding):
+    module = _MODULES.get(encoding)
+    return module is None or importlib.util.find_spec(module) is not None
+
+
+def _compress(data, encoding):
+    compress, _, finish = ENCODINGS[encoding]()
+    return compress(data) + finish()
+
+
+def _compress_stream(chunks, encoding, charset):
+    compress, flush, finish = ENCODINGS[encoding]()
+    pending = 0
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode(charset)
+            data = compress(chunk)
+            pending += len(chunk)
+            if pending >= STREAM_FLUSH_SIZE:
+                data += flush()
+                pending = 0
+            if data:
+                yield data
+        yield finish()
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+class Compress:
+    """Compress responses using the encoding negotiated with the client."""
+
+    def __init__(self, app=None):
+        self.encodings = []
+        self.min_size = 500
+        self.mimetypes = set()
+        self.exclude_blueprints = set()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("COMPRESS_ALGORITHMS", ["zstd", "br", "gzip"])
+        app.config.setdefault("COMPRESS_MIN_SIZE", 500)
+        app.config.setdefault(
+            "COMPRESS_MIMETYPES", ["application/json", "application/x-ndjson"]
+        )
+        app.config.setdefault("COMPRESS_EXCLUDE_BLUEPRINTS", [])
+
+        for encoding in app.config["COMPRESS_ALGORITHMS"]:
+            if encoding not in ENCODINGS:
+                raise ValueError("unknown content encoding: {}".format(encoding))
+
+        self.encodings = [
+            encoding
+            for encoding in app.config["COMPRESS_ALGORITHMS"]
+            if _is_installed(encoding)
+        ]
+        self.min_size = app.config["COMPRESS_MIN_SIZE"]
+        self.mimetypes = set(app.config["COMPRESS_MIMETYPES"])
+        self.exclude_blueprints = set(app.config["COMPRESS_EXCLUDE_BLUEPRINTS"])
+
+        app.after_request(self.after_request)
+
+    def is_compressible(self, mimetype):
+        """Return True if responses of this type to the request are compressed."""
+        return (
+            mimetype in self.mimetypes
+            and flask.request.blueprint not in self.exclude_blueprints
+        )
+
+    def _is_compressible(self, response):
+        return (
+            200 <= response.status_code < 300
+            and response.status_code not in (204, 206)
+            and "Content-Encoding" not in response.headers
+            and self.is_compressible(response.mimetype)
+        )
+
+    def after_request(self, response):
+        if not self._is_compressible(response):
+            return response
+
+        response.vary.add("Accept-Encoding")
+
+        encoding = flask.request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = _compress_stream(
+                response.response, encoding, response.charset
+            )
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            response.set_data(_compress(data, encoding))
+
+        # A compressed representation needs an entity tag of its own.
+        etag, weak = response.get_etag()
+        if etag is not None and not weak:
+            response.set_etag("{}.{}".format(etag, encoding))
+
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -14,6 +14,35 @@ ADMIN_USERNAME = env.str("ADMIN_USERNAME", "admin")
 ADMIN_EMAIL = env.str("ADMIN_EMAIL", "admin@localhost")
 ADMIN_PASSWORD = env.str("ADMIN_PASSWORD")
 BCRYPT_LOG_ROUNDS = env.int("BCRYPT_LOG_ROUNDS", default=12)
+BCRYPT_POOL_SIZE = env.int("BCRYPT_POOL_SIZE", default=2)
+BCRYPT_QUEUE_SIZE = env.int("BCRYPT_QUEUE_SIZE", default=4)
+BCRYPT_RETRY_AFTER = env.int("BCRYPT_RETRY_AFTER", default=1)
+BULK_MAX_ITEMS = env.int("BULK_MAX_ITEMS", default=1000)
+BULK_SYNC_MAX_ITEMS = env.int("BULK_SYNC_MAX_ITEMS", default=10000)
+COMPRESS_ALGORITHMS = env.list("COMPRESS_ALGORITHMS", default=["zstd", "br", "gzip"])
+COMPRESS_EXCLUDE_BLUEPRINTS = env.list("COMPRESS_EXCLUDE_BLUEPRINTS", default=[])
+COMPRESS_MIN_SIZE = env.int("COMPRESS_MIN_SIZE", default=500)
+DATABASE_MAX_OVERFLOW = env.int("DATABASE_MAX_OVERFLOW", default=10)
+DATABASE_PGBOUNCER = env.bool("DATABASE_PGBOUNCER", default=False)
+DATABASE_POOL_PRE_PING = env.bool("DATABASE_POOL_PRE_PING", default=False)
+DATABASE_POOL_RECYCLE = env.int("DATABASE_POOL_RECYCLE", default=-1)
+DATABASE_POOL_SIZE = env.int("DATABASE_POOL_SIZE", default=5)
+DATABASE_POOL_TIMEOUT = env.int("DATABASE_POOL_TIMEOUT", default=30)
+DATABASE_REPLICA_RETRY = env.int("DATABASE_REPLICA_RETRY", default=30)
+DATABASE_REPLICA_STICKY = env.int("DATABASE_REPLICA_STICKY", default=5)
+DATABASE_REPLICA_URL = env.str("DATABASE_REPLICA_URL", default=None)
+JSON_BACKEND = env.str("JSON_BACKEND", default="auto")
+RESPONSE_CACHE_BACKEND = env.str("RESPONSE_CACHE_BACKEND", default="memory")
+RESPONSE_CACHE_SIZE = env.int("RESPONSE_CACHE_SIZE", default=16 * 1024 * 1024)
+RESPONSE_CACHE_TTL = env.int("RESPONSE_CACHE_TTL", default=300)
+RESPONSE_CACHE_URL = env.str("RESPONSE_CACHE_URL", default=None)
 SECRET_KEY = env.str("SECRET_KEY")
 SQLALCHEMY_DATABASE_URI = env.str("DATABASE_URL")
 SQLALCHEMY_TRACK_MODIFICATIONS = False
+TOKEN_CACHE_SIZE = env.int("TOKEN_CACHE_SIZE", default=1024)
+TOKEN_CACHE_TTL = env.int("TOKEN_CACHE_TTL", default=60)
+TOKEN_EXPIRES_IN = env.int("TOKEN_EXPIRES_IN", default=3600)
+TOKEN_MODE = env.str("TOKEN_MODE", default="database")
+TOKEN_REVOCATION_REFRESH = env.int("TOKEN_REVOCATION_REFRESH", default=30)
+USER_DELETE_BATCH_SIZE = env.int("USER_DELETE_BATCH_SIZE", default=1000)
+USER_DELETE_MODE = env.str("USER_DELETE_MODE", default="cascade")
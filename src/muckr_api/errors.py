@@ -1,18 +1,18 @@
 """Error handlers."""
 from werkzeug.http import HTTP_STATUS_CODES
-from flask import jsonify
 
-from muckr_api.extensions import database
+from muckr_api.extensions import database, json_provider
 
 
 class APIError(Exception):
-    def __init__(self, status_code, message=None, details=None):
+    def __init__(self, status_code, message=None, details=None, headers=None):
         super().__init__()
 
         error = HTTP_STATUS_CODES.get(status_code, "Unknown error")
 
         self.status_code = status_code
         self.payload = {"error": error}
+        self.headers = headers or {}
 
         if message is not None:
             self.payload["message"] = message
@@ -21,10 +21,9 @@ class APIError(Exception):
             self.payload["details"] = details
 
     def handle(self):
-        response = jsonify(self.payload)
-        response.status_code = self.status_code
-        response.mimetype = "application/json"
-        return response
+        return json_provider.response(
+            self.payload, status=self.status_code, headers=self.headers
+        )
 
 
 def handle_error(error):
@@ -33,3 +32,14 @@ def handle_error(error):
     if status_code == 500:
         database.session.rollback()
     return APIError(status_code).handle()
+
+
+def handle_busy(error):
+    headers = {"Retry-After": str(error.retry_after)}
+    return APIError(503, headers=headers).handle()
+
+
+def handle_conflict(error):
+    # The row was updated or deleted by another request since it was loaded.
+    database.session.rollback()
+    return APIError(409).handle()
@@ -3,12 +3,29 @@
 Each extension is initialized in the app factory located
 in app.py.
 """
-import flask_sqlalchemy
 import flask_migrate
 import flask_bcrypt
 import flask_cors
+from sqlalchemy.ext import baked
 
-database = flask_sqlalchemy.SQLAlchemy()
+from muckr_api.compression import Compress
+from muckr_api.json_provider import JSONProvider
+from muckr_api.pool import DatabasePool
+from muckr_api.replica import Replica, RoutingSQLAlchemy
+from muckr_api.response_cache import ResponseCache
+from muckr_api.user.cache import TokenCache
+from muckr_api.user.hashing import PasswordHasher
+
+database = RoutingSQLAlchemy()
+replica = Replica()
+database_pool = DatabasePool()
+# Compiled queries of the hottest lookups, cached by the code building them.
+bakery = baked.bakery()
 migrate = flask_migrate.Migrate()
 bcrypt = flask_bcrypt.Bcrypt()
+hasher = PasswordHasher(bcrypt)
 cors = flask_cors.CORS()
+token_cache = TokenCache()
+json_provider = JSONProvider()
+compress = Compress()
+response_cache = ResponseCache()
@@ -0,0 +1,105 @@
+"""JSON encoding for responses.
+
+Responses are encoded with `orjson`_ or `ujson`_ if one of them is
+installed, and with the standard library otherwise. The ``JSON_BACKEND``
+setting selects a backend explicitly; its default, ``auto``, picks the
+fastest one available.
+
+.. _orjson: https://github.com/ijl/orjson
+.. _ujson: https://github.com/ultrajson/ultrajson
+"""
+import importlib
+import importlib.util
+import json
+
+import flask
+
+
+def _orjson(sort_keys, default):
+    orjson = importlib.import_module("orjson")
+    option = orjson.OPT_PASSTHROUGH_DATETIME
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+
+    def dumps(data):
+        return orjson.dumps(data, default=default, option=option)
+
+    return dumps
+
+
+def _ujson(sort_keys, default):
+    ujson = importlib.import_module("ujson")
+
+    def dumps(data):
+        return ujson.dumps(
+            data,
+            sort_keys=sort_keys,
+            default=default,
+            ensure_ascii=False,
+            escape_forward_slashes=False,
+        ).encode("utf-8")
+
+    return dumps
+
+
+def _stdlib(sort_keys, default):
+    def dumps(data):
+        return json.dumps(
+            data,
+            sort_keys=sort_keys,
+            default=default,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    return dumps
+
+
+BACKENDS = {"orjson": _orjson, "ujson": _ujson, "stdlib": _stdlib}
+
+
+def _is_installed(backend):
+    return backend == "stdlib" or importlib.util.find_spec(backend) is not None
+
+
+class JSONProvider:
+    """Encode response bodies using the configured JSON backend.
+
+    Values the backend cannot encode natively, such as dates, are passed
+    to the app's JSON encoder, so they are encoded the same way as by
+    :func:`flask.jsonify`.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self._dumps = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("JSON_BACKEND", "auto")
+
+        backend = app.config["JSON_BACKEND"]
+        if backend == "auto":
+            backend = next(name for name in BACKENDS if _is_installed(name))
+        elif backend not in BACKENDS:
+            raise ValueError("unknown JSON backend: {}".format(backend))
+
+        sort_keys = app.config["JSON_SORT_KEYS"]
+        default = app.json_encoder().default
+
+        self.backend = backend
+        self._dumps = BACKENDS[backend](sort_keys, default)
+
+    def dumps(self, data):
+        """Encode data as JSON, returning bytes."""
+        return self._dumps(data)
+
+    def response(self, data, status=None, headers=None):
+        return flask.current_app.response_class(
+            self.dumps(data) + b"\n",
+            status=status,
+            headers=headers,
+            mimetype="application/json",
+        )
@@ -2,6 +2,16 @@
 import flask
 
 import muckr_api
+from muckr_api.errors import APIError
+from muckr_api.extensions import (
+    database,
+    database_pool,
+    replica,
+    response_cache,
+    token_cache,
+)
+from muckr_api.user.auth import token_auth
+from muckr_api.utils import jsonify
 
 
 blueprint = flask.Blueprint("main", __name__)
@@ -10,3 +20,20 @@ blueprint = flask.Blueprint("main", __name__)
 @blueprint.route("/")
 def index():
     return "muckr_api {version}".format(version=muckr_api.__version__)
+
+
+@blueprint.route("/stats", methods=["GET"])
+@token_auth.login_required
+def get_stats():
+    if not flask.g.current_user.is_admin:
+        raise APIError(401)
+    engines = {"primary": database.engine}
+    if replica.url is not None:
+        engines["replica"] = database.get_engine(bind="replica")
+    return jsonify(
+        {
+            "token_cache": token_cache.stats(),
+            "response_cache": response_cache.stats(),
+            "database": database_pool.stats(engines),
+        }
+    )
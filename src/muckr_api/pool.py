@@ -0,0 +1,175 @@
+"""Database connection pools.
+
+The pool of each engine is configured from the ``DATABASE_POOL_*``
+settings, and instrumented to count checkouts, the time spent waiting for
+a connection, and connections opened beyond the pool size. The counters
+are shown by ``/stats``, and help to size the pools of all processes
+against the ``max_connections`` of the database server.
+
+With ``DATABASE_PGBOUNCER`` set, connections are closed when they are
+returned, leaving pooling to pgbouncer, and no statements are prepared on
+the server, as pgbouncer may run each transaction on a different server
+connection.
+"""
+import threading
+import time
+
+import sqlalchemy.exc
+import sqlalchemy.pool
+
+
+class PoolStats:
+    """Counters of a connection pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checkout_time = 0.0
+        self.max_checkout_time = 0.0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.overflows = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def add_checkout(self, elapsed, waited, overflowed):
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_time += elapsed
+            self.max_checkout_time = max(self.max_checkout_time, elapsed)
+            if waited:
+                self.waits += 1
+                self.wait_time += elapsed
+            if overflowed:
+                self.overflows += 1
+
+    def add_timeout(self, elapsed):
+        with self._lock:
+            self.timeouts += 1
+            self.waits += 1
+            self.wait_time += elapsed
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_time_avg": (
+                    self.checkout_time / self.checkouts if self.checkouts else None
+                ),
+                "checkout_time_max": self.max_checkout_time,
+                "waits": self.waits,
+                "wait_time": self.wait_time,
+                "overflows": self.overflows,
+                "timeouts": self.timeouts,
+            }
+
+
+class InstrumentedPool:
+    """Mixin counting the checkouts of a pool class.
+
+    Checkouts are timed from the request for a connection until it is
+    returned by the pool, including the time to open a new connection.
+    """
+
+    def __init__(self, creator, **kwargs):
+        super().__init__(creator, **kwargs)
+        self.stats = PoolStats()
+
+    def _is_exhausted(self):
+        return (
+            isinstance(self, sqlalchemy.pool.QueuePool)
+            and self._max_overflow > -1
+            and self.checkedin() == 0
+            and self._overflow >= self._max_overflow
+        )
+
+    def _get_overflow(self):
+        if isinstance(self, sqlalchemy.pool.QueuePool):
+            return max(self._overflow, 0)
+        return 0
+
+    def _do_get(self):
+        waited = self._is_exhausted()
+        overflow = self._get_overflow()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except sqlalchemy.exc.TimeoutError:
+            self.stats.add_timeout(time.perf_counter() - start)
+            raise
+
+        overflowed = self._get_overflow() > overflow
+        self.stats.add_checkout(time.perf_counter() - start, waited, overflowed)
+        return connection
+
+    def get_stats(self):
+        stats = {"pool": type(self).__bases__[-1].__name__}
+        if isinstance(self, sqlalchemy.pool.QueuePool):
+            stats.update(
+                size=self.size(),
+                in_use=self.checkedout(),
+                idle=self.checkedin(),
+                overflow=self._get_overflow(),
+            )
+        stats.update(self.stats.as_dict())
+        return stats
+
+
+_instrumented = {}
+
+
+def instrument(pool_class):
+    """Return a subclass of the pool class with instrumentation."""
+    if issubclass(pool_class, InstrumentedPool):
+        return pool_class
+    if pool_class not in _instrumented:
+        name = "Instrumented{}".format(pool_class.__name__)
+        _instrumented[pool_class] = type(name, (InstrumentedPool, pool_class), {})
+    return _instrumented[pool_class]
+
+
+class DatabasePool:
+    """Configure and instrument the connection pools of the database."""
+
+    def __init__(self, app=None):
+        self.pgbouncer = False
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("DATABASE_POOL_SIZE", 5)
+        app.config.setdefault("DATABASE_MAX_OVERFLOW", 10)
+        app.config.setdefault("DATABASE_POOL_TIMEOUT", 30)
+        app.config.setdefault("DATABASE_POOL_RECYCLE", -1)
+        app.config.setdefault("DATABASE_POOL_PRE_PING", False)
+        app.config.setdefault("DATABASE_PGBOUNCER", False)
+
+        self.pgbouncer = app.config["DATABASE_PGBOUNCER"]
+        app.extensions["database_pool"] = self
+
+    def configure(self, app, sa_url, options):
+        """Add the pool settings to the options of a new engine."""
+        if app.config["DATABASE_PGBOUNCER"]:
+            options["poolclass"] = sqlalchemy.pool.NullPool
+
+        pool_class = options.get("poolclass")
+        if pool_class is None:
+            pool_class = sa_url.get_dialect().get_pool_class(sa_url)
+
+        if issubclass(pool_class, sqlalchemy.pool.QueuePool):
+            options["pool_size"] = app.config["DATABASE_POOL_SIZE"]
+            options["max_overflow"] = app.config["DATABASE_MAX_OVERFLOW"]
+            options["pool_timeout"] = app.config["DATABASE_POOL_TIMEOUT"]
+
+        options["pool_recycle"] = app.config["DATABASE_POOL_RECYCLE"]
+        options["pool_pre_ping"] = app.config["DATABASE_POOL_PRE_PING"]
+        options["poolclass"] = instrument(pool_class)
+        return options
+
+    def stats(self, engines):
+        """Return the stats of the pools of the engines, by name."""
+        return {
+            name: engine.pool.get_stats()
+            for name, engine in engines.items()
+            if isinstance(engine.pool, InstrumentedPool)
+        }
@@ -0,0 +1,199 @@
+"""Routing of reads to a database replica.
+
+If ``DATABASE_REPLICA_URL`` is set, views decorated with
+:meth:`Replica.read_only` run their queries against the replica, including
+the lookup of the token. Flushes and all other views use the primary.
+
+Users who made a write keep reading from the primary for
+``DATABASE_REPLICA_STICKY`` seconds, so replication lag does not hide
+their own changes from them. Each process remembers the users who wrote
+through it, and the response to the write sets a cookie with the end of
+this window, so that other processes read from the primary as well when
+the client sends the cookie back. If the replica cannot be reached, the
+request is repeated on the primary, and the replica is not used for
+``DATABASE_REPLICA_RETRY`` seconds.
+"""
+import collections
+import functools
+import math
+import threading
+import time
+
+import flask
+import flask_sqlalchemy
+import sqlalchemy
+import sqlalchemy.exc
+import sqlalchemy.orm
+
+STICKY_COOKIE = "muckr_primary_until"
+
+
+class RoutingSession(flask_sqlalchemy.SignallingSession):
+    """Session sending the queries of read-only views to the replica."""
+
+    def get_bind(self, mapper=None, clause=None):
+        replica = self.app.extensions.get("replica")
+        if replica is not None and not self._flushing and replica.is_active():
+            flask.g.used_replica = True
+            return replica.db.get_engine(self.app, bind="replica")
+        return super().get_bind(mapper, clause)
+
+
+class RoutingSQLAlchemy(flask_sqlalchemy.SQLAlchemy):
+    """Flask-SQLAlchemy extension using :class:`RoutingSession`.
+
+    Engines are created with the pool settings of the ``database_pool``
+    extension, if it is registered.
+    """
+
+    def create_session(self, options):
+        return sqlalchemy.orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+    def apply_driver_hacks(self, app, sa_url, options):
+        result = super().apply_driver_hacks(app, sa_url, options)
+        # Flask-SQLAlchemy 2.5 returns the URL and the options, while 2.4
+        # changes the options in place and returns None.
+        if result is not None:
+            sa_url, options = result
+        database_pool = app.extensions.get("database_pool")
+        if database_pool is not None:
+            database_pool.configure(app, sa_url, options)
+        return result
+
+
+def _user_id(user):
+    # Read the id from the identity key, which never loads the user.
+    identity = sqlalchemy.inspect(user).identity
+    return identity[0] if identity else None
+
+
+class Replica:
+    """Send queries of read-only views to a replica of the database."""
+
+    def __init__(self, app=None, db=None):
+        self.db = None
+        self.url = None
+        self.sticky = 5
+        self.retry = 30
+        self._writers = collections.OrderedDict()
+        self._down_until = 0
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        app.config.setdefault("DATABASE_REPLICA_URL", None)
+        app.config.setdefault("DATABASE_REPLICA_STICKY", 5)
+        app.config.setdefault("DATABASE_REPLICA_RETRY", 30)
+
+        self.db = db
+        self.url = app.config["DATABASE_REPLICA_URL"]
+        self.sticky = app.config["DATABASE_REPLICA_STICKY"]
+        self.retry = app.config["DATABASE_REPLICA_RETRY"]
+
+        with self._lock:
+            self._writers.clear()
+            self._down_until = 0
+
+        if self.url is not None:
+            binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+            binds["replica"] = self.url
+            app.config["SQLALCHEMY_BINDS"] = binds
+
+        app.extensions["replica"] = self
+        app.after_request(self.after_request)
+
+    @property
+    def is_available(self):
+        return self.url is not None and time.monotonic() >= self._down_until
+
+    def is_active(self):
+        """Return True if queries are to be sent to the replica."""
+        if not flask.has_app_context() or not flask.g.get("read_only"):
+            return False
+        if self._has_sticky_cookie():
+            return False
+        user = flask.g.get("current_user")
+        return user is None or not self.has_written(_user_id(user))
+
+    def _has_sticky_cookie(self):
+        if not flask.has_request_context():
+            return False
+        try:
+            until = float(flask.request.cookies.get(STICKY_COOKIE, ""))
+        except ValueError:
+            return False
+        # Ignore windows longer than the setting, which no response sets.
+        now = time.time()
+        return now < until <= now + self.sticky
+
+    def has_written(self, user_id):
+        """Return True if the user wrote within the last seconds."""
+        with self._lock:
+            self._expire()
+            return user_id in self._writers
+
+    def add_writer(self, user_id):
+        with self._lock:
+            self._writers.pop(user_id, None)
+            self._writers[user_id] = time.monotonic() + self.sticky
+            self._expire()
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._writers and next(iter(self._writers.values())) <= now:
+            self._writers.popitem(last=False)
+
+    def after_request(self, response):
+        if (
+            self.url is None
+            or flask.request.method in ("GET", "HEAD", "OPTIONS")
+            or response.status_code >= 400
+        ):
+            return response
+
+        user = flask.g.get("current_user")
+        if user is not None:
+            self.add_writer(_user_id(user))
+            response.set_cookie(
+                STICKY_COOKIE,
+                "{:.3f}".format(time.time() + self.sticky),
+                max_age=math.ceil(self.sticky),
+                httponly=True,
+            )
+        return response
+
+    def read_only(self, view):
+        """Decorate a view to run its queries against the replica.
+
+        The view is repeated on the primary if the replica cannot be
+        reached, or if it does not know the token, which may have been
+        issued too recently to be replicated.
+        """
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not self.is_available:
+                return view(*args, **kwargs)
+
+            flask.g.read_only = True
+            flask.g.used_replica = False
+            try:
+                response = flask.make_response(view(*args, **kwargs))
+                if response.status_code != 401 or not flask.g.used_replica:
+                    return response
+            except sqlalchemy.exc.OperationalError:
+                if not flask.g.used_replica:
+                    raise
+                flask.current_app.logger.warning(
+                    "Cannot query the replica, using the primary", exc_info=True
+                )
+                self._down_until = time.monotonic() + self.retry
+            finally:
+                flask.g.read_only = False
+
+            self.db.session.rollback()
+            return view(*args, **kwargs)
+
+        return wrapper
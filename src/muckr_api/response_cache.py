@@ -0,0 +1,232 @@
+"""Response cache for list endpoints.
+
+Pages of artists, venues and users are cached under a key that includes
+the version of the collection, so a write makes the cached pages of its
+collection unreachable in every process, even before they are discarded.
+
+By default each process keeps its own cache in memory, evicting the least
+recently used pages when ``RESPONSE_CACHE_SIZE`` bytes are exceeded.
+Setting ``RESPONSE_CACHE_BACKEND`` to ``redis`` shares the cache between
+processes, using the server at ``RESPONSE_CACHE_URL``; the server's own
+memory limit and eviction policy apply. Setting ``RESPONSE_CACHE_SIZE``
+to zero disables the cache.
+"""
+import collections
+import importlib
+import json
+import threading
+import time
+
+import flask
+
+
+class MemoryBackend:
+    """LRU cache holding up to ``maxsize`` bytes in process memory.
+
+    Each entry is stored with a tag, and all entries with the same tag can
+    be deleted at once.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.size = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+        self._tags = collections.defaultdict(set)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires = entry[2]
+            if expires <= time.monotonic():
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, tag):
+        if len(key) + len(value) > self.maxsize:
+            return
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = value, tag, time.monotonic() + self.ttl
+            self._tags[tag].add(key)
+            self.size += len(key) + len(value)
+            while self.size > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete_tag(self, tag):
+        with self._lock:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self.size = 0
+            self.evictions = 0
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "size": self.size,
+            "maxsize": self.maxsize,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            value, tag, _ = entry
+            self.size -= len(key) + len(value)
+            keys = self._tags[tag]
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+
+class RedisBackend:
+    """Cache shared between processes through a Redis server.
+
+    The keys stored with each tag are kept in a Redis set, so deleting a
+    tag removes entries stored by any process.
+    """
+
+    prefix = "muckr:response:"
+
+    def __init__(self, url, ttl):
+        redis = importlib.import_module("redis")
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, tag):
+        tag = self.prefix + "tag:" + tag
+        with self.client.pipeline() as pipeline:
+            pipeline.set(self.prefix + key, value, ex=self.ttl)
+            pipeline.sadd(tag, self.prefix + key)
+            pipeline.expire(tag, self.ttl)
+            pipeline.execute()
+
+    def delete_tag(self, tag):
+        tag = self.prefix + "tag:" + tag
+        keys = self.client.smembers(tag)
+        self.client.delete(tag, *keys)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self):
+        info = self.client.info("stats")
+        return {"evictions": info.get("evicted_keys", 0)}
+
+
+def _tag(collection, owner):
+    return "{}:{}".format(collection, owner)
+
+
+class ResponseCache:
+    """Cache responses of list endpoints by collection version.
+
+    Responses are tagged with the collection and its owner, so writes can
+    discard the pages they made stale instead of waiting for them to be
+    evicted.
+    """
+
+    def __init__(self, app=None):
+        self.name = None
+        self.backend = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("RESPONSE_CACHE_BACKEND", "memory")
+        app.config.setdefault("RESPONSE_CACHE_SIZE", 16 * 1024 * 1024)
+        app.config.setdefault("RESPONSE_CACHE_TTL", 300)
+        app.config.setdefault("RESPONSE_CACHE_URL", None)
+
+        backend = app.config["RESPONSE_CACHE_BACKEND"]
+        ttl = app.config["RESPONSE_CACHE_TTL"]
+        self.name = backend
+        if app.config["RESPONSE_CACHE_SIZE"] <= 0:
+            self.name = self.backend = None
+        elif backend == "memory":
+            self.backend = MemoryBackend(app.config["RESPONSE_CACHE_SIZE"], ttl)
+        elif backend == "redis":
+            self.backend = RedisBackend(app.config["RESPONSE_CACHE_URL"], ttl)
+        else:
+            raise ValueError("unknown response cache backend: {}".format(backend))
+
+        self.clear()
+
+    def get(self, key):
+        """Return the cached response for the key, or None."""
+        if self.backend is None:
+            return None
+
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        data = json.loads(value)
+        return flask.current_app.response_class(
+            data["body"], headers=data["headers"], mimetype="application/json"
+        )
+
+    def add(self, key, response, collection, owner=None):
+        """Cache a response to a request for the collection of the owner."""
+        if self.backend is None:
+            return
+
+        headers = [
+            [name, value]
+            for name, value in response.headers.items()
+            if name in ("ETag", "Link", "X-Total-Count")
+        ]
+        data = {"body": response.get_data(as_text=True), "headers": headers}
+        self.backend.set(key, json.dumps(data).encode("utf-8"), _tag(collection, owner))
+
+    def discard(self, collection, owner=None):
+        """Discard the cached responses for the collection of the owner."""
+        if self.backend is not None:
+            self.backend.delete_tag(_tag(collection, owner))
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        stats = {
+            "backend": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else None,
+        }
+        if self.backend is not None:
+            stats.update(self.backend.stats())
+        return stats
@@ -0,0 +1,53 @@
+"""Search of artists and venues by name.
+
+The ``q`` request argument selects the names containing it, ignoring
+case; with ``match=prefix``, only the names starting with it. Names are
+compared in lower case, using an index on ``(user_id, lower(name))``. On
+PostgreSQL, a trigram index on ``lower(name)`` serves substring searches,
+which a B-tree index cannot.
+"""
+import flask
+import sqlalchemy
+
+from muckr_api.errors import APIError
+
+MATCHES = {"substring": "contains", "prefix": "startswith"}
+
+TRIGRAM_INDEX = """\
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX ix_{table}_lower_name_trgm ON {table}
+USING gin (lower(name) gin_trgm_ops)"""
+
+
+def add_indexes(model):
+    """Declare the indexes for searching the model by name."""
+    table = model.__table__
+    lower_name = sqlalchemy.func.lower(table.c.name).label("lower_name")
+    sqlalchemy.Index(
+        "ix_{}_user_id_lower_name".format(table.name),
+        table.c.user_id,
+        lower_name,
+        postgresql_ops={"lower_name": "text_pattern_ops"},
+    )
+    sqlalchemy.event.listen(
+        table,
+        "after_create",
+        sqlalchemy.DDL(TRIGRAM_INDEX.format(table=table.name)).execute_if(
+            dialect="postgresql"
+        ),
+    )
+
+
+def filter_by_name(query, model):
+    """Filter the query by the ``q`` and ``match`` request arguments."""
+    value = flask.request.args.get("q")
+    if not value:
+        return query
+
+    match = flask.request.args.get("match", "substring")
+    if match not in MATCHES:
+        message = "match must be one of {}".format(", ".join(MATCHES))
+        raise APIError(400, message=message, details={"match": message})
+
+    operator = getattr(sqlalchemy.func.lower(model.name), MATCHES[match])
+    return query.filter(operator(value.lower(), autoescape=True))
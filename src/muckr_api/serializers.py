@@ -0,0 +1,130 @@
+"""Compiled serializers for marshmallow schemas.
+
+Dumping an object through marshmallow involves a method call per field to
+look up the value, another to format it, and a check for missing values
+and defaults. For the flat schemas used by this API, the same work can be
+done by a single generated function, which is several times faster.
+"""
+import functools
+
+import marshmallow
+from marshmallow import fields
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+
+
+def _text(value):
+    if isinstance(value, bytes):
+        value = value.decode("utf-8")
+    return str(value)
+
+
+# Field types whose serialization the generated code reproduces exactly.
+_FIELD_TYPES = fields.Integer, fields.String, fields.Email
+
+
+def _format(field):
+    """Return the expression formatting a non-null value of the field."""
+    if type(field) is fields.Integer:
+        return "str(int(value))" if field.as_string else "int(value)"
+    return "_text(value)"
+
+
+def _dump_default(field):
+    # marshmallow < 3.13 calls this attribute `default`.
+    if hasattr(field, "dump_default"):
+        return field.dump_default
+    return field.default
+
+
+def _is_compilable(schema):
+    if type(schema).get_attribute is not marshmallow.Schema.get_attribute:
+        return False
+
+    if schema._has_processors(PRE_DUMP) or schema._has_processors(POST_DUMP):
+        return False
+
+    if schema.dict_class is not dict:
+        return False
+
+    for name, field in schema.dump_fields.items():
+        if type(field) not in _FIELD_TYPES:
+            return False
+        if _dump_default(field) is not marshmallow.missing:
+            return False
+        if "." in (field.attribute or name):
+            return False
+
+    return True
+
+
+def compile_serializer(schema):
+    """Generate a function dumping a single object like ``schema.dump``.
+
+    The function only handles objects whose values are accessed as
+    attributes; it does not handle mappings. Returns None if the schema
+    uses features the generated code does not reproduce.
+    """
+    if not _is_compilable(schema):
+        return None
+
+    lines = ["def serialize(obj):", "    data = {}"]
+    for name, field in schema.dump_fields.items():
+        attribute = field.attribute or name
+        key = field.data_key if field.data_key is not None else name
+        formatter = _format(field)
+        lines += [
+            "    value = getattr(obj, {!r}, missing)".format(attribute),
+            "    if value is not missing:",
+            "        data[{!r}] = None if value is None else {}".format(key, formatter),
+        ]
+    lines.append("    return data")
+
+    namespace = {"missing": marshmallow.missing, "_text": _text}
+    exec(compile("\n".join(lines), "<serializer>", "exec"), namespace)
+    return namespace["serialize"]
+
+
+_serializers = {}
+
+
+def get_serializer(schema):
+    # Schema instances are cheap to create and often short-lived, so the
+    # generated code is shared by all instances dumping the same fields.
+    key = type(schema), tuple(schema.dump_fields)
+    try:
+        return _serializers[key]
+    except KeyError:
+        serializer = _serializers[key] = compile_serializer(schema)
+        return serializer
+
+
+@functools.lru_cache(maxsize=256)
+def get_schema(schema_class, only=None, many=False):
+    """Return a shared schema instance dumping the given fields."""
+    return schema_class(only=only, many=many)
+
+
+class CompiledSchema(marshmallow.Schema):
+    """Schema dumping objects through a generated function.
+
+    Falls back to marshmallow for schemas using features the generated
+    code does not support, and for objects that are mappings or sequences.
+    """
+
+    def dump(self, obj, *, many=None):
+        many = self.many if many is None else bool(many)
+        serializer = get_serializer(self)
+
+        if serializer is None or obj is None:
+            return super().dump(obj, many=many)
+
+        if not many:
+            if hasattr(obj, "__getitem__"):
+                return super().dump(obj, many=False)
+            return serializer(obj)
+
+        items = obj if isinstance(obj, list) else list(obj)
+        if any(hasattr(item, "__getitem__") for item in items):
+            return super().dump(items, many=True)
+
+        return [serializer(item) for item in items]
@@ -1,9 +1,13 @@
 """User authentication."""
 import flask
+import sqlalchemy
 from flask_httpauth import HTTPBasicAuth, HTTPTokenAuth
+from sqlalchemy.orm import make_transient_to_detached
 
 from muckr_api.user.models import User
-from muckr_api.errors import APIError
+from muckr_api.errors import APIError, handle_conflict
+from muckr_api.extensions import database, token_cache
+from muckr_api.user.tokens import is_signed_token, signed_tokens
 
 basic_auth = HTTPBasicAuth()
 token_auth = HTTPTokenAuth()
@@ -11,11 +15,11 @@ token_auth = HTTPTokenAuth()
 
 @basic_auth.verify_password
 def verify_password(username, password):
-    user = User.query.filter_by(username=username).first()
-    if user is None:
+    user = User.get_by("username", username)
+    if user is None or not user.check_password(password):
         return False
     flask.g.current_user = user
-    return user.check_password(password)
+    return True
 
 
 @basic_auth.error_handler
@@ -23,12 +27,54 @@ def basic_auth_error():
     return APIError(401).handle()
 
 
+def _load_user(user_id, is_admin):
+    # Attach a user to the session without loading it. Any attribute other
+    # than the id and admin flag is loaded lazily on first access.
+    user = User(id=user_id, is_admin=is_admin)
+    make_transient_to_detached(user)
+    return database.session.merge(user, load=False)
+
+
+def _authenticate(token):
+    if is_signed_token(token):
+        claims = signed_tokens.loads(token)
+        flask.g.token_claims = claims
+        return _load_user(claims["sub"], claims["adm"]) if claims else None
+
+    entry = token_cache.get(token)
+    if entry is not None:
+        return _load_user(entry.user_id, entry.is_admin)
+
+    user = User.check_token(token)
+    if user is not None:
+        token_cache.add(token, user.id, user.is_admin, user.token_expiration)
+    return user
+
+
 @token_auth.verify_token
 def verify_token(token):
-    flask.g.current_user = User.check_token(token) if token else None
+    flask.g.current_user = _authenticate(token) if token else None
     return flask.g.current_user is not None
 
 
 @token_auth.error_handler
 def token_auth_error():
     return APIError(401).handle()
+
+
+def handle_object_deleted(error):
+    """Answer 401 if the authenticated user was deleted behind the cache.
+
+    Tokens verified from the cache or by signature attach a user without
+    loading it, so a user deleted by another process is only noticed when
+    the row is loaded. Other deleted rows are a conflict, as for
+    :class:`~sqlalchemy.orm.exc.StaleDataError`.
+    """
+    database.session.rollback()
+    user = flask.g.get("current_user")
+    identity = sqlalchemy.inspect(user).identity if user is not None else None
+    if identity is None or User.get_by("id", identity[0]) is not None:
+        return handle_conflict(error)
+
+    token_cache.discard_user(identity[0])
+    return APIError(401).handle()
@@ -0,0 +1,106 @@
+"""Token verification cache."""
+import collections
+import hashlib
+import threading
+from datetime import datetime, timedelta
+
+
+CachedToken = collections.namedtuple("CachedToken", ["user_id", "is_admin", "expires"])
+
+
+def _key(token):
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class TokenCache:
+    """Bounded LRU cache of verified tokens.
+
+    Entries are keyed by a hash of the token, so the cache never holds
+    the tokens themselves. Each entry expires after ``TOKEN_CACHE_TTL``
+    seconds, or when the token itself expires, whichever comes first.
+    Setting ``TOKEN_CACHE_SIZE`` to zero disables the cache.
+    """
+
+    def __init__(self, app=None):
+        self.maxsize = 0
+        self.ttl = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._users = collections.defaultdict(set)
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("TOKEN_CACHE_SIZE", 1024)
+        app.config.setdefault("TOKEN_CACHE_TTL", 60)
+
+        self.maxsize = app.config["TOKEN_CACHE_SIZE"]
+        self.ttl = app.config["TOKEN_CACHE_TTL"]
+        self.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, token):
+        key = _key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= datetime.utcnow():
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def add(self, token, user_id, is_admin, expiration):
+        if self.maxsize <= 0:
+            return
+
+        expires = min(datetime.utcnow() + timedelta(seconds=self.ttl), expiration)
+        key = _key(token)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = CachedToken(user_id, bool(is_admin), expires)
+            self._users[user_id].add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def discard(self, token):
+        with self._lock:
+            self._remove(_key(token))
+
+    def discard_user(self, user_id):
+        with self._lock:
+            for key in list(self._users.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._users.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._users[entry.user_id]
+            keys.discard(key)
+            if not keys:
+                del self._users[entry.user_id]
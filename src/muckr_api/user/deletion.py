@@ -0,0 +1,99 @@
+"""Deletion of users with large catalogues."""
+import concurrent.futures
+
+import flask
+import sqlalchemy
+
+from muckr_api.artist.models import Artist
+from muckr_api.extensions import database
+from muckr_api.user.models import User
+from muckr_api.venue.models import Venue
+from muckr_api.versions import bump_version
+
+
+class UserDeleter:
+    """Delete users together with their artists and venues.
+
+    With ``USER_DELETE_MODE`` set to ``cascade``, the user row is deleted
+    and the database deletes the artists and venues in the same statement.
+    With ``batched``, the user is locked out at once, and the rows are
+    deleted in the background, ``USER_DELETE_BATCH_SIZE`` rows per
+    transaction, so no transaction holds locks on a whole catalogue. Such
+    users are flagged with ``is_deleting`` until they are gone, so that
+    deletions interrupted by a restart or an error can be resumed with
+    ``muckr-api delete-users``.
+    """
+
+    def __init__(self, app=None):
+        self.mode = "cascade"
+        self.batch_size = 1000
+        self._executor = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("USER_DELETE_MODE", "cascade")
+        app.config.setdefault("USER_DELETE_BATCH_SIZE", 1000)
+
+        mode = app.config["USER_DELETE_MODE"]
+        if mode not in ("cascade", "batched"):
+            raise ValueError("unknown user delete mode: {}".format(mode))
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+        self.mode = mode
+        self.batch_size = app.config["USER_DELETE_BATCH_SIZE"]
+        self._executor = None
+
+        if mode == "batched":
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="delete-user"
+            )
+
+    @property
+    def is_batched(self):
+        return self.mode == "batched"
+
+    def submit(self, user_id):
+        """Delete the user in the background, returning a future."""
+        app = flask.current_app._get_current_object()
+        return self._executor.submit(self._run, app, user_id)
+
+    def _run(self, app, user_id):
+        with app.app_context():
+            try:
+                self.delete(user_id)
+            except Exception:
+                app.logger.exception("Cannot delete user %s", user_id)
+                raise
+
+    def pending(self):
+        """Return the ids of the users whose deletion is pending."""
+        query = database.session.query(User.id).filter_by(is_deleting=True)
+        return [user_id for user_id, in query.order_by(User.id)]
+
+    def delete(self, user_id):
+        """Delete the user's artists and venues in batches, then the user."""
+        for model in (Artist, Venue):
+            table = model.__table__
+            batch = (
+                sqlalchemy.select([table.c.id])
+                .where(table.c.user_id == user_id)
+                .limit(self.batch_size)
+            )
+            while True:
+                result = database.session.execute(
+                    table.delete().where(table.c.id.in_(batch))
+                )
+                database.session.commit()
+                if result.rowcount < self.batch_size:
+                    break
+
+        User.query.filter_by(id=user_id).delete()
+        bump_version("users")
+        database.session.commit()
+
+
+user_deleter = UserDeleter()
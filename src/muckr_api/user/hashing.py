@@ -0,0 +1,76 @@
+"""Password hashing."""
+import concurrent.futures
+import threading
+
+
+class HasherBusyError(Exception):
+    """Raised when too many password hashes are pending."""
+
+    def __init__(self, retry_after):
+        super().__init__()
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """Run bcrypt hashing and verification on a bounded thread pool.
+
+    At most ``BCRYPT_POOL_SIZE`` hashes are computed at a time, and at most
+    ``BCRYPT_QUEUE_SIZE`` more may wait for a thread. Beyond that, callers
+    get a :class:`HasherBusyError` instead of tying up their worker. Setting
+    ``BCRYPT_POOL_SIZE`` to zero hashes on the calling thread.
+
+    The bound applies to each process. It requires threaded workers with
+    more threads than ``BCRYPT_POOL_SIZE`` and ``BCRYPT_QUEUE_SIZE``
+    together, as a sync worker never has more than one request in flight.
+    """
+
+    def __init__(self, bcrypt, app=None):
+        self.bcrypt = bcrypt
+        self.retry_after = 1
+        self._executor = None
+        self._slots = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("BCRYPT_POOL_SIZE", 2)
+        app.config.setdefault("BCRYPT_QUEUE_SIZE", 4)
+        app.config.setdefault("BCRYPT_RETRY_AFTER", 1)
+
+        pool_size = app.config["BCRYPT_POOL_SIZE"]
+        queue_size = app.config["BCRYPT_QUEUE_SIZE"]
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+        self.retry_after = app.config["BCRYPT_RETRY_AFTER"]
+        self._executor = None
+        self._slots = None
+
+        if pool_size > 0:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=pool_size, thread_name_prefix="bcrypt"
+            )
+            self._slots = threading.BoundedSemaphore(pool_size + queue_size)
+
+    def generate_password_hash(self, password):
+        return self._run(self.bcrypt.generate_password_hash, password)
+
+    def check_password_hash(self, password_hash, password):
+        return self._run(self.bcrypt.check_password_hash, password_hash, password)
+
+    def _run(self, function, *args):
+        if self._executor is None:
+            return function(*args)
+
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise HasherBusyError(self.retry_after)
+
+        # Release the slot on this thread, so that it is free again before
+        # the caller can hash anything else.
+        try:
+            return self._executor.submit(function, *args).result()
+        finally:
+            slots.release()
@@ -2,11 +2,13 @@
 import secrets
 from datetime import datetime, timedelta
 
-from marshmallow import Schema, fields
+import sqlalchemy
+from marshmallow import fields
 from marshmallow.validate import Length
 
-from muckr_api.extensions import bcrypt
+from muckr_api.extensions import bakery, hasher, token_cache
 from muckr_api.extensions import database as db
+from muckr_api.serializers import CompiledSchema
 
 
 class User(db.Model):
@@ -19,23 +21,49 @@ class User(db.Model):
     token = db.Column(db.String(64), index=True, unique=True)
     token_expiration = db.Column(db.DateTime)
     is_admin = db.Column(db.Boolean, default=False)
-    artists = db.relationship("Artist", backref="user", lazy="dynamic")
-    venues = db.relationship("Venue", backref="user", lazy="dynamic")
+    # Set while the user's catalogue is deleted in batches.
+    is_deleting = db.Column(
+        db.Boolean, nullable=False, default=False, server_default=sqlalchemy.false()
+    )
+    version_id = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+    artists_version = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    venues_version = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    # Artists and venues are deleted by the database when their user is.
+    artists = db.relationship(
+        "Artist", backref="user", lazy="dynamic", passive_deletes=True
+    )
+    venues = db.relationship(
+        "Venue", backref="user", lazy="dynamic", passive_deletes=True
+    )
+
+    # The version is bumped by update_user only, so that issuing and revoking
+    # tokens, which may happen concurrently, never conflict.
+    __mapper_args__ = {"version_id_col": version_id, "version_id_generator": False}
 
     def __repr__(self):
         return "<User {}>".format(self.username)
 
     def set_password(self, password):
-        data = bcrypt.generate_password_hash(password)
+        data = hasher.generate_password_hash(password)
         self.password_hash = data.decode("utf-8")
+        if self.id is not None:
+            _discard_after_commit("users", self.id)
 
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        if self.password_hash is None:
+            return False
+        return hasher.check_password_hash(self.password_hash, password)
 
     def get_token(self, expires_in=3600):
         now = datetime.utcnow()
         if self.token and self.token_expiration > now + timedelta(seconds=60):
             return self.token
+        if self.token is not None:
+            _discard_after_commit("tokens", self.token)
         self.token = secrets.token_hex(32)
         self.token_expiration = now + timedelta(seconds=expires_in)
         db.session.add(self)
@@ -44,10 +72,20 @@ class User(db.Model):
     def revoke_token(self):
         if self.token is not None:
             self.token_expiration = datetime.utcnow() - timedelta(seconds=1)
+            _discard_after_commit("tokens", self.token)
+
+    @staticmethod
+    def get_by(key, value):
+        """Return the user with the value in the unique column, or None."""
+        query = bakery(lambda session: session.query(User), key)
+        query += lambda query: query.filter(
+            getattr(User, key) == sqlalchemy.bindparam("value")
+        )
+        return query(db.session()).params(value=value).first()
 
     @staticmethod
     def check_token(token):
-        user = User.query.filter_by(token=token).first()
+        user = User.get_by("token", token)
         if (
             user is not None
             and user.token_expiration is not None
@@ -56,7 +94,39 @@ class User(db.Model):
             return user
 
 
-class UserSchema(Schema):
+def _discard_after_commit(kind, value):
+    # Discarding before the commit would let a concurrent request cache the
+    # token again while the database still accepts it.
+    discards = db.session.info.setdefault("token_cache_discards", {})
+    discards.setdefault(kind, set()).add(value)
+
+
+@sqlalchemy.event.listens_for(db.session, "after_commit")
+def _after_commit(session):
+    discards = session.info.pop("token_cache_discards", {})
+    for token in discards.get("tokens", ()):
+        token_cache.discard(token)
+    for user_id in discards.get("users", ()):
+        token_cache.discard_user(user_id)
+
+
+@sqlalchemy.event.listens_for(db.session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("token_cache_discards", None)
+
+
+class RevokedToken(db.Model):
+    __tablename__ = "revoked_tokens"
+
+    jti = db.Column(db.String(64), primary_key=True)
+    revoked_at = db.Column(db.DateTime, nullable=False)
+    expiration = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return "<RevokedToken {}>".format(self.jti)
+
+
+class UserSchema(CompiledSchema):
     id = fields.Integer(dump_only=True)
     username = fields.Str(required=True, validate=Length(min=1))
     email = fields.Email(required=True)
@@ -0,0 +1,145 @@
+"""Signed access tokens."""
+import hashlib
+import secrets
+import threading
+import time
+from datetime import datetime
+
+import itsdangerous
+
+from muckr_api.extensions import database
+from muckr_api.user.models import RevokedToken
+
+
+def is_signed_token(token):
+    # Database tokens are hexadecimal strings; signed tokens contain a
+    # separator between payload and signature.
+    return "." in token
+
+
+def _user_key(user_id):
+    return "user:{}".format(user_id)
+
+
+def _timestamp(value):
+    return int((value - datetime(1970, 1, 1)).total_seconds())
+
+
+class SignedTokens:
+    """Issue and verify self-contained, HMAC-signed access tokens.
+
+    A token carries the user id, admin flag, a unique token id and its
+    expiration, so verifying it does not require a database lookup.
+    Revoked tokens are recorded in the ``revoked_tokens`` table and kept
+    in memory; the in-memory copy is refreshed from the database every
+    ``TOKEN_REVOCATION_REFRESH`` seconds to pick up revocations made by
+    other processes.
+    """
+
+    def __init__(self, app=None):
+        self.secret_key = None
+        self.refresh_interval = 30
+        self._revoked = {}
+        self._refreshed = None
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("TOKEN_MODE", "database")
+        app.config.setdefault("TOKEN_EXPIRES_IN", 3600)
+        app.config.setdefault("TOKEN_REVOCATION_REFRESH", 30)
+
+        self.secret_key = app.config["SECRET_KEY"]
+        self.refresh_interval = app.config["TOKEN_REVOCATION_REFRESH"]
+
+        with self._lock:
+            self._revoked = {}
+            self._refreshed = None
+
+    @property
+    def _serializer(self):
+        return itsdangerous.URLSafeSerializer(
+            self.secret_key,
+            salt="access-token",
+            signer_kwargs={"digest_method": hashlib.sha256},
+        )
+
+    def dumps(self, user, expires_in=3600):
+        now = int(time.time())
+        claims = {
+            "sub": user.id,
+            "adm": bool(user.is_admin),
+            "jti": secrets.token_hex(16),
+            "iat": now,
+            "exp": now + expires_in,
+        }
+        return self._serializer.dumps(claims)
+
+    def loads(self, token):
+        try:
+            claims = self._serializer.loads(token)
+        except itsdangerous.BadSignature:
+            return None
+
+        if claims["exp"] <= time.time() or self.is_revoked(claims):
+            return None
+
+        return claims
+
+    def is_revoked(self, claims):
+        self._refresh()
+        if claims["jti"] in self._revoked:
+            return True
+
+        revoked_at = self._revoked.get(_user_key(claims["sub"]))
+        return revoked_at is not None and revoked_at[0] >= claims["iat"]
+
+    def revoke(self, claims):
+        self._add(claims["jti"], claims["exp"])
+
+    def revoke_user(self, user_id, expires_in):
+        """Revoke every token issued to the user up to now."""
+        self._add(_user_key(user_id), int(time.time()) + expires_in)
+
+    def _add(self, key, expiration):
+        now = int(time.time())
+        with self._lock:
+            self._revoked[key] = (now, expiration)
+
+        RevokedToken.query.filter(RevokedToken.expiration < datetime.utcnow()).delete()
+        database.session.merge(
+            RevokedToken(
+                jti=key,
+                revoked_at=datetime.utcfromtimestamp(now),
+                expiration=datetime.utcfromtimestamp(expiration),
+            )
+        )
+
+    def _refresh(self):
+        now = time.time()
+        if (
+            self._refreshed is not None
+            and now - self._refreshed < self.refresh_interval
+        ):
+            return
+
+        rows = RevokedToken.query.filter(
+            RevokedToken.expiration > datetime.utcnow()
+        ).all()
+
+        with self._lock:
+            revoked = {
+                key: entry for key, entry in self._revoked.items() if entry[1] > now
+            }
+            for row in rows:
+                revoked[row.jti] = (
+                    _timestamp(row.revoked_at),
+                    _timestamp(row.expiration),
+                )
+            self._revoked = revoked
+            self._refreshed = now
+
+
+signed_tokens = SignedTokens()
@@ -3,41 +3,68 @@ import flask
 from marshmallow import ValidationError
 
 from muckr_api.errors import APIError
-from muckr_api.extensions import database
+from muckr_api.extensions import database, replica, response_cache, token_cache
 from muckr_api.user.auth import basic_auth, token_auth
+from muckr_api.user.deletion import user_deleter
+from muckr_api.serializers import get_schema
 from muckr_api.user.models import User, UserSchema
+from muckr_api.user.tokens import signed_tokens
 from muckr_api.utils import (
-    check_unique_on_create,
-    check_unique_on_update,
+    check_if_match,
+    commit_unique,
+    get_etag,
+    get_fields,
+    is_not_modified,
     jsonify,
+    load_fields,
+    not_modified,
     paginate,
 )
+from muckr_api.versions import get_collection_etag
 
 
 blueprint = flask.Blueprint("user", __name__)
 user_schema = UserSchema()
 users_schema = UserSchema(many=True)
+sort_keys = {"id": User.id, "username": User.username, "email": User.email}
 
 
 @blueprint.route("/users", methods=["GET"])
+@replica.read_only
 @token_auth.login_required
 def get_users():
     if not flask.g.current_user.is_admin:
         raise APIError(401)
-    users = paginate(User.query)
-    data = users_schema.dump(users.items)
-    return jsonify(data)
+    fields = get_fields(users_schema)
+    etag = get_collection_etag(flask.g.current_user, "users")
+    if is_not_modified(etag):
+        return not_modified(etag)
+
+    response = response_cache.get(etag)
+    if response is None:
+        users = paginate(User.query, sort_keys, fields=fields)
+        data = get_schema(UserSchema, fields, many=True).dump(users.items)
+        response = jsonify(data, headers=users.headers, etag=etag)
+        response_cache.add(etag, response, "users")
+
+    return response
 
 
 @blueprint.route("/users/<int:id>", methods=["GET"])
+@replica.read_only
 @token_auth.login_required
 def get_user(id):
-    user = User.query.get_or_404(id)
+    fields = get_fields(user_schema)
+    user = User.query.options(*load_fields(fields, "version_id")).get_or_404(id)
     if user.id != flask.g.current_user.id and not flask.g.current_user.is_admin:
         raise APIError(401)
 
-    data = user_schema.dump(user)
-    return jsonify(data)
+    etag = get_etag(user, fields)
+    if is_not_modified(etag):
+        return not_modified(etag)
+
+    data = get_schema(UserSchema, fields).dump(user)
+    return jsonify(data, etag=etag)
 
 
 @blueprint.route("/users", methods=["POST"])
@@ -48,19 +75,17 @@ def create_user():
     except ValidationError as error:
         raise APIError(422, details=error.messages)
 
-    check_unique_on_create(User.query, data, ["username", "email"])
-
     password = data.pop("password", None)
     user = User(**data)
     assert password is not None
     user.set_password(password)
 
     database.session.add(user)
-    database.session.commit()
+    commit_unique(User.query, data, ["username", "email"])
 
     data = user_schema.dump(user)
 
-    response = jsonify(data)
+    response = jsonify(data, etag=get_etag(user))
     response.status_code = 201
     response.headers["Location"] = flask.url_for("user.get_user", id=user.id)
     return response
@@ -73,14 +98,14 @@ def update_user(id):
     if user.id != flask.g.current_user.id and not flask.g.current_user.is_admin:
         raise APIError(401)
 
+    check_if_match(user)
+
     json = flask.request.get_json() or {}
     try:
         data = UserSchema(partial=True).load(json)
     except ValidationError as error:
         raise APIError(422, details=error.messages)
 
-    check_unique_on_update(User.query, user, data, ["username", "email"])
-
     password = data.pop("password", None)
     if password is not None:
         user.set_password(password)
@@ -88,10 +113,12 @@ def update_user(id):
     for key, value in data.items():
         setattr(user, key, value)
 
-    database.session.commit()
+    if password is not None or data:
+        user.version_id += 1
+    commit_unique(User.query, data, ["username", "email"], user)
 
     data = UserSchema().dump(user)
-    return jsonify(data)
+    return jsonify(data, etag=get_etag(user))
 
 
 @blueprint.route("/users/<int:id>", methods=["DELETE"])
@@ -101,8 +128,22 @@ def delete_user(id):
     if user.id != flask.g.current_user.id and not flask.g.current_user.is_admin:
         raise APIError(401)
 
-    database.session.delete(user)
+    check_if_match(user)
+
+    signed_tokens.revoke_user(id, flask.current_app.config["TOKEN_EXPIRES_IN"])
+    if user_deleter.is_batched:
+        # Lock the user out now; the rows are deleted in the background.
+        user.password_hash = None
+        user.token = None
+        user.is_deleting = True
+    else:
+        database.session.delete(user)
     database.session.commit()
+    token_cache.discard_user(id)
+
+    if user_deleter.is_batched:
+        user_deleter.submit(id)
+        return jsonify({}), 202
 
     return jsonify({}), 204
 
@@ -110,7 +151,11 @@ def delete_user(id):
 @blueprint.route("/tokens", methods=["POST"])
 @basic_auth.login_required
 def create_token():
-    token = flask.g.current_user.get_token()
+    config = flask.current_app.config
+    if config["TOKEN_MODE"] == "signed":
+        token = signed_tokens.dumps(flask.g.current_user, config["TOKEN_EXPIRES_IN"])
+    else:
+        token = flask.g.current_user.get_token(config["TOKEN_EXPIRES_IN"])
     database.session.commit()
     return jsonify({"token": token}), 201
 
@@ -118,6 +163,10 @@ def create_token():
 @blueprint.route("/tokens", methods=["DELETE"])
 @token_auth.login_required
 def delete_token():
-    flask.g.current_user.revoke_token()
+    claims = flask.g.get("token_claims")
+    if claims is not None:
+        signed_tokens.revoke(claims)
+    else:
+        flask.g.current_user.revoke_token()
     database.session.commit()
     return jsonify({}), 204
@@ -1,34 +1,350 @@
 """Common utilities"""
+import base64
+import binascii
+import hashlib
+import json
+
 import flask
+import sqlalchemy
+import sqlalchemy.exc
+import sqlalchemy.orm
 
+from muckr_api.compression import ENCODINGS
 from muckr_api.errors import APIError
+from muckr_api.extensions import bakery, compress, database, json_provider
+
+
+def jsonify(data, headers=None, etag=None):
+    response = json_provider.response(data, headers=headers)
+    if etag is not None:
+        response.set_etag(etag)
+    return response
+
+
+def _raise_bad_request(key, message):
+    raise APIError(400, message=message, details={key: message})
+
+
+def get_fields(schema):
+    """Return the fields selected by the ``fields`` request argument.
+
+    The argument is a comma-separated list of field names. Returns None if
+    it is absent, meaning that all fields are selected.
+    """
+    value = flask.request.args.get("fields")
+    if value is None:
+        return None
+
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(",")))
+    for field in fields:
+        if field not in schema.dump_fields:
+            _raise_bad_request("fields", "unknown field: {}".format(field))
+    return fields
+
+
+def load_fields(fields, *columns):
+    """Return query options loading only the given fields and columns."""
+    if fields is None:
+        return []
+    return [sqlalchemy.orm.load_only(*dict.fromkeys(fields + columns))]
+
+
+def stream_ndjson(query, schema, batch_size=1000):
+    """Stream query results as newline-delimited JSON.
+
+    Rows are fetched from a server-side cursor in batches of ``batch_size``,
+    so memory use does not depend on the number of rows.
+    """
+
+    def generate():
+        for item in query.yield_per(batch_size):
+            yield json_provider.dumps(schema.dump(item)) + b"\n"
+
+    # Tell nginx to pass chunks on as they arrive instead of buffering.
+    return flask.Response(
+        flask.stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        headers={"X-Accel-Buffering": "no"},
+    )
+
 
+def get_owned_or_404(model, id, fields=None):
+    """Return the instance with the id if it belongs to the current user.
 
-def jsonify(data):
-    response = flask.jsonify(data)
-    response.mimetype = "application/json"
+    Ownership is checked in the query itself, using the ``user_id`` column,
+    so the owner is never loaded. Admins may access any instance. Raises
+    404 if there is no such instance. If ``fields`` is given, only these
+    and the version are loaded.
+
+    The query is compiled once for each model, field selection and role.
+    """
+    user = flask.g.current_user
+    query = bakery(lambda session: session.query(model), model)
+    query += lambda query: query.filter(model.id == sqlalchemy.bindparam("id"))
+    params = {"id": id}
+
+    if not user.is_admin:
+        query += lambda query: query.filter(
+            model.user_id == sqlalchemy.bindparam("user_id")
+        )
+        params["user_id"] = user.id
+
+    if fields is not None:
+        query.add_criteria(
+            lambda query: query.options(*load_fields(fields, "version_id")), fields
+        )
+
+    instance = query(database.session()).params(**params).first()
+    if instance is None:
+        flask.abort(404)
+    return instance
+
+
+def get_etag(model, fields=None):
+    """Return the entity tag for the representation of a model.
+
+    The tag is derived from the row version, so it changes whenever the
+    row is updated. Representations restricted to some fields get a tag of
+    their own, which shares its version with the full representation.
+    """
+    etag = "{}-{}-{}".format(model.__tablename__, model.id, model.version_id)
+    if fields is not None:
+        digest = hashlib.sha1(",".join(sorted(fields)).encode("utf-8"))
+        etag += "." + digest.hexdigest()[:8]
+    return etag
+
+
+def _strip_encoding(etag):
+    # Compressed representations carry the content coding as a suffix.
+    base, _, encoding = etag.rpartition(".")
+    return base if base and encoding in ENCODINGS else etag
+
+
+def _get_matching_etag(etag):
+    # Return the tag in If-None-Match matching the entity tag, and whether
+    # it is weak, or None.
+    etags = flask.request.if_none_match
+    for tag in etags.as_set(include_weak=True):
+        if _strip_encoding(tag) == etag:
+            return tag, etags.is_weak(tag)
+    if etags.star_tag:
+        return etag, False
+    return None
+
+
+def is_not_modified(etag):
+    """Return True if ``If-None-Match`` matches the entity tag."""
+    return _get_matching_etag(etag) is not None
+
+
+def not_modified(etag, mimetype="application/json"):
+    """Return a 304 response for a representation matching the entity tag.
+
+    The response carries the tag that matched, which includes the content
+    coding of a compressed representation, as the 200 response would.
+    """
+    response = flask.current_app.response_class(status=304)
+    del response.headers["Content-Type"]
+    response.set_etag(*(_get_matching_etag(etag) or (etag, False)))
+    if compress.is_compressible(mimetype):
+        response.vary.add("Accept-Encoding")
     return response
 
 
-def check_unique(query, key, value):
-    condition = {key: value}
-    if query.filter_by(**condition).first():
-        message = "please use a different {key}".format(key=key)
-        raise APIError(400, message=message, details={key: message})
+def check_if_match(model):
+    """Raise 412 unless ``If-Match`` matches the current version of a model.
+
+    Any representation of the current version matches. Weak tags never
+    match, as the header requires strong comparison.
+    """
+    etags = flask.request.if_match
+    if not etags or etags.star_tag:
+        return
+
+    etag = get_etag(model)
+    if not any(tag.split(".")[0] == etag for tag in etags.as_set()):
+        raise APIError(412)
+
+
+def _is_taken(query, key, value, model=None):
+    query = query.filter_by(**{key: value})
+    if model is not None:
+        query = query.filter(type(model).id != model.id)
+    return database.session.query(query.exists()).scalar()
+
+
+def commit_unique(query, data, keys, model=None):
+    """Commit the session, reporting unique keys that are already taken.
+
+    Uniqueness is enforced by database constraints, so a successful write
+    costs no extra queries. If the commit fails with an integrity error,
+    the session is rolled back and ``query`` is used to find which of the
+    ``keys`` in ``data`` conflict with another row than ``model``. Raises
+    400 with a message for each of them, or 409 if the conflicting row no
+    longer exists.
+    """
+    try:
+        database.session.commit()
+    except sqlalchemy.exc.IntegrityError:
+        database.session.rollback()
+    else:
+        return
+
+    details = {
+        key: "please use a different {key}".format(key=key)
+        for key in keys
+        if key in data and _is_taken(query, key, data[key], model)
+    }
+    if not details:
+        raise APIError(409)
+
+    message = next(iter(details.values()))
+    raise APIError(400, message=message, details=details)
+
+
+class Page:
+    def __init__(self, items, next_url=None, total=None):
+        self.items = items
+        self.next_url = next_url
+        self.total = total
+
+    @property
+    def has_next(self):
+        return self.next_url is not None
+
+    @property
+    def headers(self):
+        headers = {}
+        if self.next_url is not None:
+            headers["Link"] = '<{url}>; rel="next"'.format(url=self.next_url)
+        if self.total is not None:
+            headers["X-Total-Count"] = str(self.total)
+        return headers
+
+
+def _encode_cursor(sort, values):
+    data = json.dumps({"sort": sort, "after": values}).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(data.decode("utf-8"))
+        return data["sort"], data["after"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        _raise_bad_request("cursor", "invalid cursor")
+
+
+def _check_cursor(after, columns):
+    if not isinstance(after, list) or len(after) != len(columns):
+        _raise_bad_request("cursor", "invalid cursor")
+
+    for value, column in zip(after, columns):
+        # Compare types exactly, as JSON booleans would pass for integers.
+        if type(value) is not column.property.columns[0].type.python_type:
+            _raise_bad_request("cursor", "invalid cursor")
+
+
+def _is_unique(attribute):
+    column = attribute.property.columns[0]
+    return bool(column.primary_key or column.unique)
+
+
+def _get_sort_columns(sort, sort_keys):
+    name = sort[1:] if sort.startswith("-") else sort
+    if name not in sort_keys:
+        _raise_bad_request("sort", "cannot sort by {name}".format(name=name))
+
+    column = sort_keys[name]
+    if _is_unique(column):
+        return [column]
+    return [column, sort_keys["id"]]
+
+
+def _next_url(**args):
+    args = dict(
+        ((key, value) for key, value in flask.request.args.items() if key != "page"),
+        **args
+    )
+    return flask.url_for(flask.request.endpoint, **flask.request.view_args, **args)
+
+
+def _estimate_count(query):
+    statement = query.order_by(None).statement
+    connection = database.session.connection()
+    compiled = statement.compile(dialect=connection.dialect)
+    result = connection.execute(
+        "EXPLAIN (FORMAT JSON) {}".format(compiled), compiled.params
+    )
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _count(query):
+    with_total = flask.request.args.get("with_total")
+    if not with_total or with_total == "0":
+        return None
+
+    if with_total == "estimate":
+        if database.session.connection().dialect.name == "postgresql":
+            return _estimate_count(query)
+
+    return query.order_by(None).count()
+
+
+def paginate(query, sort_keys, fields=None):
+    """Return a page of results, ordered by the ``sort`` request argument.
+
+    Pages are selected either by number, using ``page``, or by position,
+    using ``cursor``. Cursors are opaque; an empty cursor selects the first
+    page, and the ``Link`` header of each page holds the cursor for the
+    next one. Unlike page numbers, cursors do not skip over rows, so every
+    page costs the same to fetch.
+
+    One row more than requested is fetched to find out whether there is a
+    next page, so rows are not counted unless the client asks for the
+    total using ``with_total=1``. On PostgreSQL, ``with_total=estimate``
+    returns the planner's estimate instead of an exact count.
+
+    ``sort_keys`` maps the names accepted by ``sort`` to model attributes,
+    and must include ``id`` as a tie-breaker. If ``fields`` is passed, only
+    those columns are loaded, in addition to the sort keys.
+    """
+    per_page = min(max(flask.request.args.get("per_page", 10, type=int), 1), 100)
+    cursor = flask.request.args.get("cursor")
+    sort = flask.request.args.get("sort", "id")
 
+    if cursor:
+        cursor_sort, after = _decode_cursor(cursor)
+        if "sort" in flask.request.args and sort != cursor_sort:
+            _raise_bad_request("sort", "sort does not match cursor")
+        sort = cursor_sort
 
-def check_unique_on_create(query, data, keys):
-    for key in keys:
-        check_unique(query, key, data[key])
+    columns = _get_sort_columns(sort, sort_keys)
+    descending = sort.startswith("-")
+    total = _count(query)
+    query = query.options(
+        *load_fields(fields, *[column.key for column in columns])
+    ).order_by(*[column.desc() if descending else column for column in columns])
 
+    if cursor is None:
+        page = max(flask.request.args.get("page", 1, type=int), 1)
+        items = query.offset((page - 1) * per_page).limit(per_page + 1).all()
+        next_url = _next_url(page=page + 1) if len(items) > per_page else None
+        return Page(items[:per_page], next_url, total)
 
-def check_unique_on_update(query, model, data, keys):
-    for key in keys:
-        if key in data and data[key] != getattr(model, key):
-            check_unique(query, key, data[key])
+    if cursor:
+        _check_cursor(after, columns)
+        key, value = sqlalchemy.tuple_(*columns), sqlalchemy.tuple_(*after)
+        query = query.filter(key < value if descending else key > value)
 
+    items = query.limit(per_page + 1).all()
+    if len(items) <= per_page:
+        return Page(items, total=total)
 
-def paginate(query):
-    page = flask.request.args.get("page", 1, type=int)
-    per_page = min(flask.request.args.get("per_page", 10, type=int), 100)
-    return query.paginate(page, per_page, False)
+    items = items[:per_page]
+    after = [getattr(items[-1], column.key) for column in columns]
+    return Page(items, _next_url(cursor=_encode_cursor(sort, after)), total)
@@ -1,24 +1,48 @@
 """Venue model."""
-from marshmallow import Schema, fields
+from marshmallow import fields
 from marshmallow.validate import Length
 
 from muckr_api.extensions import database as db
+from muckr_api.search import add_indexes
+from muckr_api.serializers import CompiledSchema
 
 
 class Venue(db.Model):
     __tablename__ = "venues"
+    __table_args__ = (
+        db.Index("ix_venues_user_id_id", "user_id", "id"),
+        db.Index("ix_venues_user_id_name", "user_id", "name", "id"),
+        db.Index("ix_venues_user_id_country_city", "user_id", "country", "city"),
+        db.UniqueConstraint(
+            "user_id",
+            "name",
+            name="uq_venues_user_id_name",
+            deferrable=True,
+            initially="DEFERRED",
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(128), index=True)
     city = db.Column(db.String(128))
     country = db.Column(db.String(128))
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id", name="fk_venues_user_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    version_id = db.Column(db.Integer, nullable=False, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version_id}
 
     def __repr__(self):
         return "<Venue {}>".format(self.name)
 
 
-class VenueSchema(Schema):
+add_indexes(Venue)
+
+
+class VenueSchema(CompiledSchema):
     id = fields.Integer(dump_only=True)
     name = fields.Str(required=True, validate=Length(min=1, max=128))
     city = fields.Str(required=True, validate=Length(min=1, max=128))
@@ -2,41 +2,105 @@
 import flask
 from marshmallow import ValidationError
 
+from muckr_api.bulk import (
+    create_items,
+    delete_items,
+    get_ids,
+    get_items,
+    load_collection,
+    load_items,
+    load_updates,
+    sync_items,
+    update_items,
+)
 from muckr_api.errors import APIError
-from muckr_api.extensions import database
+from muckr_api.extensions import database, replica, response_cache
 from muckr_api.user.auth import token_auth
 from muckr_api.venue.models import Venue, VenueSchema
+from muckr_api.search import filter_by_name
+from muckr_api.serializers import get_schema
 from muckr_api.utils import (
-    check_unique_on_create,
-    check_unique_on_update,
+    check_if_match,
+    commit_unique,
+    get_etag,
+    get_fields,
+    get_owned_or_404,
+    is_not_modified,
     jsonify,
+    load_fields,
+    not_modified,
     paginate,
+    stream_ndjson,
 )
+from muckr_api.versions import get_collection_etag
 
 
 blueprint = flask.Blueprint("venue", __name__)
 venue_schema = VenueSchema()
 venues_schema = VenueSchema(many=True)
+sort_keys = {"id": Venue.id, "name": Venue.name}
+
+
+def _filter_by_location(query):
+    # Filter by the country before the city, following the index.
+    for key in ("country", "city"):
+        value = flask.request.args.get(key)
+        if value:
+            query = query.filter(getattr(Venue, key) == value)
+    return query
 
 
 @blueprint.route("/venues", methods=["GET"])
+@replica.read_only
 @token_auth.login_required
 def get_venues():
-    venues = paginate(flask.g.current_user.venues)
-    data = venues_schema.dump(venues.items)
+    fields = get_fields(venues_schema)
+    ids = get_ids() if "ids" in flask.request.args else None
+    etag = get_collection_etag(flask.g.current_user, "venues")
+    if is_not_modified(etag):
+        return not_modified(etag)
+
+    response = response_cache.get(etag)
+    if response is None:
+        schema = get_schema(VenueSchema, fields, many=True)
+        if ids is None:
+            query = filter_by_name(flask.g.current_user.venues, Venue)
+            query = _filter_by_location(query)
+            venues = paginate(query, sort_keys, fields=fields)
+            response = jsonify(
+                schema.dump(venues.items), headers=venues.headers, etag=etag
+            )
+        else:
+            options = load_fields(fields)
+            venues, missing = get_items(Venue, flask.g.current_user.id, ids, *options)
+            data = {"items": schema.dump(venues), "missing": missing}
+            response = jsonify(data, etag=etag)
+        response_cache.add(etag, response, "venues", flask.g.current_user.id)
 
-    return jsonify(data)
+    return response
+
+
+@blueprint.route("/venues/export", methods=["GET"])
+@token_auth.login_required
+def export_venues():
+    fields = get_fields(venue_schema)
+    query = flask.g.current_user.venues.options(*load_fields(fields))
+    return stream_ndjson(query.order_by(Venue.id), get_schema(VenueSchema, fields))
 
 
 @blueprint.route("/venues/<int:id>", methods=["GET"])
+@replica.read_only
 @token_auth.login_required
 def get_venue(id):
-    venue = Venue.query.get_or_404(id)
-    if venue.user.id != flask.g.current_user.id and not flask.g.current_user.is_admin:
-        raise APIError(404)
-    data = venue_schema.dump(venue)
+    fields = get_fields(venue_schema)
+    venue = get_owned_or_404(Venue, id, fields)
+
+    etag = get_etag(venue, fields)
+    if is_not_modified(etag):
+        return not_modified(etag)
 
-    return jsonify(data)
+    data = get_schema(VenueSchema, fields).dump(venue)
+    return jsonify(data, etag=etag)
 
 
 @blueprint.route("/venues", methods=["POST"])
@@ -49,28 +113,56 @@ def create_venue():
     except ValidationError as error:
         raise APIError(422, details=error.messages)
 
-    check_unique_on_create(flask.g.current_user.venues, data, ["name"])
-
     venue = Venue(**data)
     venue.user = flask.g.current_user
 
     database.session.add(venue)
-    database.session.commit()
+    commit_unique(flask.g.current_user.venues, data, ["name"])
 
     data = venue_schema.dump(venue)
 
-    response = jsonify(data)
+    response = jsonify(data, etag=get_etag(venue))
     response.status_code = 201
     response.headers["Location"] = flask.url_for("venue.get_venue", id=venue.id)
     return response
 
 
+@blueprint.route("/venues/bulk", methods=["POST"])
+@token_auth.login_required
+def create_venues():
+    items = load_items(VenueSchema)
+    venues = create_items(Venue, flask.g.current_user.id, items)
+    return jsonify(venues_schema.dump(venues)), 201
+
+
+@blueprint.route("/venues", methods=["PUT"])
+@token_auth.login_required
+def sync_venues():
+    items = load_collection(VenueSchema)
+    return jsonify(sync_items(Venue, flask.g.current_user.id, items))
+
+
+@blueprint.route("/venues", methods=["PATCH"])
+@token_auth.login_required
+def update_venues():
+    items = load_updates(VenueSchema)
+    venues = update_items(Venue, flask.g.current_user.id, items)
+    return jsonify(venues_schema.dump(venues))
+
+
+@blueprint.route("/venues", methods=["DELETE"])
+@token_auth.login_required
+def delete_venues():
+    delete_items(Venue, flask.g.current_user.id, get_ids())
+    return jsonify({}), 204
+
+
 @blueprint.route("/venues/<int:id>", methods=["PUT"])
 @token_auth.login_required
 def update_venue(id):
-    venue = Venue.query.get_or_404(id)
-    if venue.user.id != flask.g.current_user.id and not flask.g.current_user.is_admin:
-        raise APIError(404)
+    venue = get_owned_or_404(Venue, id)
+
+    check_if_match(venue)
 
     json = flask.request.get_json() or {}
 
@@ -79,23 +171,22 @@ def update_venue(id):
     except ValidationError as error:
         raise APIError(422, details=error.messages)
 
-    check_unique_on_update(flask.g.current_user.venues, venue, data, ["name"])
-
+    query = Venue.query.filter_by(user_id=venue.user_id)
     for key, value in data.items():
         setattr(venue, key, value)
 
-    database.session.commit()
+    commit_unique(query, data, ["name"], venue)
 
     data = VenueSchema().dump(venue)
-    return jsonify(data)
+    return jsonify(data, etag=get_etag(venue))
 
 
 @blueprint.route("/venues/<int:id>", methods=["DELETE"])
 @token_auth.login_required
 def delete_venue(id):
-    venue = Venue.query.get_or_404(id)
-    if venue.user.id != flask.g.current_user.id and not flask.g.current_user.is_admin:
-        raise APIError(404)
+    venue = get_owned_or_404(Venue, id)
+
+    check_if_match(venue)
 
     database.session.delete(venue)
     database.session.commit()
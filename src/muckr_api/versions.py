@@ -0,0 +1,148 @@
+"""Collection versions.
+
+Each user has a version number for their artists and one for their
+venues, and the list of users has a version of its own. A version is
+incremented in the same transaction as any insert, update or delete in
+the collection, so list responses can be tagged with it, cached, and
+revalidated without querying the collection.
+
+Changes made through the ORM are tracked automatically when the session
+is flushed. Code changing rows with SQL statements must call
+:func:`bump_versions` itself.
+"""
+import hashlib
+import itertools
+import json
+
+import flask
+import sqlalchemy
+
+from muckr_api.artist.models import Artist
+from muckr_api.extensions import database, response_cache
+from muckr_api.user.models import User
+from muckr_api.venue.models import Venue
+
+COLLECTIONS = {"artists": User.artists_version, "venues": User.venues_version}
+
+# Fields of users shown in the list of users.
+USER_FIELDS = "username", "email"
+
+
+class CollectionVersion(database.Model):
+    """Version of a collection that does not belong to a user."""
+
+    __tablename__ = "collection_versions"
+
+    name = database.Column(database.String(32), primary_key=True)
+    version = database.Column(database.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return "<CollectionVersion {}>".format(self.name)
+
+
+def bump_version(name):
+    """Increment the version of a collection that does not belong to a user."""
+    table = CollectionVersion.__table__
+    result = database.session.execute(
+        table.update().where(table.c.name == name).values(version=table.c.version + 1)
+    )
+    if result.rowcount == 0:
+        database.session.execute(table.insert().values(name=name, version=1))
+    response_cache.discard(name)
+
+
+def bump_versions(collection, user_ids):
+    """Increment the collection version of the given users."""
+    column = COLLECTIONS[collection]
+    user_ids = sorted(user_id for user_id in user_ids if user_id is not None)
+    if not user_ids:
+        return
+
+    database.session.execute(
+        User.__table__.update()
+        .where(User.id.in_(user_ids))
+        .values({column.key: column + 1})
+    )
+
+    for user in database.session.identity_map.values():
+        if isinstance(user, User) and user.id in user_ids:
+            database.session.expire(user, [column.key])
+
+    for user_id in user_ids:
+        response_cache.discard(collection, user_id)
+
+
+def _owners(session, instance):
+    # The foreign key of a new instance is only set when it is flushed.
+    if instance.user_id is not None:
+        yield instance.user_id
+    elif instance.user is not None:
+        yield instance.user.id
+
+    if instance in session.new:
+        return
+
+    # If the instance moved to another user, the previous owner is in the
+    # history, unless the attribute was assigned before it was loaded.
+    history = sqlalchemy.inspect(instance).attrs.user_id.history
+    if history.added and not history.deleted:
+        table = instance.__table__
+        yield session.execute(
+            sqlalchemy.select([table.c.user_id]).where(table.c.id == instance.id)
+        ).scalar()
+    else:
+        yield from history.deleted
+
+
+def _is_user_changed(session, user):
+    # Tokens and passwords change often, but do not appear in the list.
+    if user in session.new or user in session.deleted:
+        return True
+    state = sqlalchemy.inspect(user)
+    return any(state.attrs[key].history.has_changes() for key in USER_FIELDS)
+
+
+@sqlalchemy.event.listens_for(database.session, "before_flush")
+def _before_flush(session, flush_context, instances):
+    users_changed = False
+    changes = {collection: set() for collection in COLLECTIONS}
+    for instance in itertools.chain(session.new, session.dirty, session.deleted):
+        if isinstance(instance, User):
+            users_changed = users_changed or _is_user_changed(session, instance)
+            continue
+        if not isinstance(instance, (Artist, Venue)):
+            continue
+        if instance in session.dirty and not session.is_modified(instance):
+            continue
+        changes[instance.__tablename__].update(_owners(session, instance))
+
+    for collection, user_ids in changes.items():
+        bump_versions(collection, user_ids)
+
+    if users_changed:
+        bump_version("users")
+
+
+def get_version(user, collection):
+    """Return the version of the user's collection, or of the users."""
+    if collection in COLLECTIONS:
+        return getattr(user, COLLECTIONS[collection].key)
+
+    table = CollectionVersion.__table__
+    version = database.session.execute(
+        sqlalchemy.select([table.c.version]).where(table.c.name == collection)
+    ).scalar()
+    return version or 0
+
+
+def get_collection_etag(user, collection):
+    """Return the entity tag for a page of a collection requested by the user.
+
+    The tag combines the collection version with the request arguments,
+    which select the page, its size, order and fields. It also serves as
+    the key of the page in the response cache.
+    """
+    version = get_version(user, collection)
+    args = sorted(flask.request.args.items(multi=True))
+    digest = hashlib.sha1(json.dumps([user.id, args]).encode("utf-8"))
+    return "{}-{}-{}".format(collection, version, digest.hexdigest()[:12])
@@ -1,12 +1,17 @@
 """Test artist views."""
+import gzip
 import json
 import pytest
 
-from muckr_api.artist.models import Artist
+from muckr_api.artist.models import Artist, ArtistSchema
 from muckr_api.artist.views import artist_schema, artists_schema
 
 from tests.artist.factories import ArtistFactory
-from tests.utils import create_token_auth_header
+from tests.utils import (
+    assert_statement_count,
+    create_token_auth_header,
+    record_statements,
+)
 
 
 class TestGetArtists:
@@ -68,10 +73,388 @@ class TestGetArtists:
         assert response.status == "200 OK"
         assert response.get_json() == artists_schema.dump(window)
 
+    def test_get_request_returns_pages_of_artists_by_cursor(
+        self, client, user, database
+    ):
+        artists = ArtistFactory.create_batch(25, user=user)
+        database.session.commit()
+        headers = create_token_auth_header(user.get_token())
+
+        pages = []
+        url = "/artists?cursor=&per_page=10"
+        while url is not None:
+            response = client.get(url, headers=headers)
+            assert response.status == "200 OK"
+            pages.append(response.get_json())
+            link = response.headers.get("Link")
+            url = link[1 : link.index(">")] if link else None
+
+        assert [len(page) for page in pages] == [10, 10, 5]
+        assert sum(pages, []) == artists_schema.dump(artists)
+
+    def test_get_request_by_cursor_is_stable_under_inserts(
+        self, client, user, database
+    ):
+        artists = ArtistFactory.create_batch(4, user=user)
+        database.session.commit()
+        headers = create_token_auth_header(user.get_token())
+
+        response = client.get(
+            "/artists", query_string={"cursor": "", "per_page": 2}, headers=headers
+        )
+        link = response.headers["Link"]
+
+        ArtistFactory.create(user=user, name="aaa")
+        database.session.commit()
+
+        response = client.get(link[1 : link.index(">")], headers=headers)
+        assert response.get_json() == artists_schema.dump(artists[2:])
+
+    @pytest.mark.parametrize("sort", ["name", "-name", "-id"])
+    def test_get_request_returns_sorted_artists(self, client, user, database, sort):
+        artists = [
+            ArtistFactory.create(user=user, name=name) for name in ["b", "c", "a", "d"]
+        ]
+        database.session.commit()
+        headers = create_token_auth_header(user.get_token())
+
+        key = sort.lstrip("-")
+        expected = sorted(
+            artists,
+            key=lambda artist: (getattr(artist, key), artist.id),
+            reverse=sort.startswith("-"),
+        )
+
+        response = client.get(
+            "/artists", query_string={"sort": sort, "per_page": 3}, headers=headers
+        )
+        assert response.get_json() == artists_schema.dump(expected[:3])
+
+        response = client.get(
+            "/artists",
+            query_string={"sort": sort, "per_page": 3, "cursor": ""},
+            headers=headers,
+        )
+        link = response.headers["Link"]
+        response = client.get(link[1 : link.index(">")], headers=headers)
+        assert response.get_json() == artists_schema.dump(expected[3:])
+
+    @pytest.mark.parametrize(
+        "query_string",
+        [
+            {"sort": "user_id"},
+            {"cursor": "invalid"},
+            {"cursor": "e30"},
+            {"cursor": "eyJzb3J0IjogImlkIiwgImFmdGVyIjogWzEsIDJdfQ"},
+            # {"sort": "id", "after": [{"x": 1}]}
+            {"cursor": "eyJzb3J0IjogImlkIiwgImFmdGVyIjogW3sieCI6IDF9XX0"},
+            # {"sort": "name", "after": [1, 1]}
+            {"cursor": "eyJzb3J0IjogIm5hbWUiLCAiYWZ0ZXIiOiBbMSwgMV19"},
+            # {"sort": "id", "after": [true]}
+            {"cursor": "eyJzb3J0IjogImlkIiwgImFmdGVyIjogW3RydWVdfQ"},
+            # {"sort": "name", "after": [null, 1]}
+            {"cursor": "eyJzb3J0IjogIm5hbWUiLCAiYWZ0ZXIiOiBbbnVsbCwgMV19"},
+        ],
+    )
+    def test_get_request_fails_with_invalid_sort_or_cursor(
+        self, client, user, query_string
+    ):
+        response = client.get(
+            "/artists",
+            query_string=query_string,
+            headers=create_token_auth_header(user.get_token()),
+        )
+        assert response.status == "400 BAD REQUEST"
+        assert set(response.get_json()["details"]) <= {"sort", "cursor"}
+
+    def test_get_request_does_not_count_artists(self, client, user, database):
+        ArtistFactory.create_batch(25, user=user)
+        database.session.commit()
+        headers = create_token_auth_header(user.get_token())
+
+        with record_statements(database.engine) as statements:
+            response = client.get("/artists", headers=headers)
+
+        assert response.status == "200 OK"
+        assert "X-Total-Count" not in response.headers
+        assert not any("count(" in statement.lower() for statement in statements)
+
+    @pytest.mark.parametrize("with_total", ["1", "estimate"])
+    def test_get_request_returns_total_if_requested(
+        self, client, user, database, with_total
+    ):
+        ArtistFactory.create_batch(25, user=user)
+        ArtistFactory.create_batch(5)
+        database.session.commit()
+        response = client.get(
+            "/artists",
+            query_string={"with_total": with_total},
+            headers=create_token_auth_header(user.get_token()),
+        )
+
+        assert response.status == "200 OK"
+        assert response.headers["X-Total-Count"] == "25"
+
+    @pytest.mark.parametrize("page, has_next", [(1, True), (2, True), (3, False)])
+    def test_get_request_links_to_next_page_of_artists(
+        self, client, user, database, page, has_next
+    ):
+        ArtistFactory.create_batch(25, user=user)
+        database.session.commit()
+        response = client.get(
+            "/artists",
+            query_string={"page": page},
+            headers=create_token_auth_header(user.get_token()),
+        )
+
+        link = response.headers.get("Link")
+        assert (link is not None) == has_next
+        if has_next:
+            assert "page={page}".format(page=page + 1) in link
+
     def test_get_request_for_artists_fails_without_authentication(self, client):
         response = client.get("/artists")
         assert response.status == "401 UNAUTHORIZED"
 
+    def test_get_request_returns_304_if_collection_is_unchanged(
+        self, client, user, database
+    ):
+        ArtistFactory.create_batch(3, user=user)
+        database.session.commit()
+        headers = create_token_auth_header(user.get_token())
+        response = client.get("/artists", headers=headers)
+        headers["If-None-Match"] = response.headers["ETag"]
+
+        with record_statements(database.engine) as statements:
+            response = client.get("/artists", headers=headers)
+
+        assert response.status == "304 NOT MODIFIED"
+        assert response.data == b""
+        assert not any("FROM artists" in statement for statement in statements)
+
+    def test_get_request_returns_200_after_collection_changes(
+        self, client, user, database
+    ):
+        ArtistFactory.create(user=user)
+        database.session.commit()
+        headers = create_token_auth_header(user.get_token())
+        response = client.get("/artists", headers=headers)
+        etag = response.headers["ETag"]
+        ArtistFactory.create(user=user)
+        database.session.commit()
+
+        headers["If-None-Match"] = etag
+        response = client.get("/artists", headers=headers)
+
+        assert response.status == "200 OK"
+        assert len(response.get_json()) == 2
+        assert response.headers["ETag"] != etag
+
+    def test_get_request_returns_distinct_etag_per_page(self, client, user):
+        headers = create_token_auth_header(user.get_token())
+        first = client.get("/artists", query_string={"page": 1}, headers=headers)
+        second = client.get("/artists", query_string={"page": 2}, headers=headers)
+
+        assert first.headers["ETag"] != second.headers["ETag"]
+
+    def test_get_request_is_served_from_cache(self, client, user, database):
+        ArtistFactory.create_batch(3, user=user)
+        database.session.commit()
+        headers = create_token_auth_header(user.get_token())
+        expected = client.get("/artists", headers=headers).get_json()
+
+        with record_statements(database.engine) as statements:
+            response = client.get("/artists", headers=headers)
+
+        assert response.status == "200 OK"
+        assert response.get_json() == expected
+        assert not any("FROM artists" in statement for statement in statements)
+
+    def test_get_request_reflects_writes_after_caching(self, client, user, database):
+        headers = create_token_auth_header(user.get_token())
+        client.get("/artists", headers=headers)
+        ArtistFactory.create(user=user)
+        database.session.commit()
+
+        response = client.get("/artists", headers=headers)
+
+        assert len(response.get_json()) == 1
+
+
+class TestSearchArtists:
+    def search(self, client, user, query):
+        response = client.get(
+            "/artists?" + query, headers=create_token_auth_header(user.get_token())
+        )
+        assert response.status == "200 OK"
+        return [item["name"] for item in response.get_json()]
+
+    @pytest.fixture
+    def artists(self, user, database):
+        names = ["Abba", "Black Sabbath", "Cabaret", "The Cab", "100% Pure"]
+        artists = [ArtistFactory.create(user=user, name=name) for name in names]
+        ArtistFactory.create(name="Sabbath")
+        database.session.commit()
+        return artists
+
+    def test_get_request_finds_names_containing_query(self, client, user, artists):
+        names = self.search(client, user, "q=abb&sort=name")
+        assert names == ["Abba", "Black Sabbath"]
+
+    def test_get_request_finds_names_starting_with_query(self, client, user, artists):
+        names = self.search(client, user, "q=CAB&match=prefix&sort=name")
+        assert names == ["Cabaret"]
+
+    def test_get_request_matches_wildcards_literally(self, client, user, artists):
+        assert self.search(client, user, "q=0%25") == ["100% Pure"]
+        assert self.search(client, user, "q=_") == []
+
+    def test_get_request_paginates_results(self, client, user, artists):
+        query = "q=ab&sort=name&per_page=2&with_total=1"
+        response = client.get(
+            "/artists?" + query, headers=create_token_auth_header(user.get_token())
+        )
+
+        assert [item["name"] for item in response.get_json()] == [
+            "Abba",
+            "Black Sabbath",
+        ]
+        assert response.headers["X-Total-Count"] == "4"
+        assert "Link" in response.headers
+
+    def test_get_request_fails_if_match_is_invalid(self, client, user):
+        response = client.get(
+            "/artists?q=a&match=suffix",
+            headers=create_token_auth_header(user.get_token()),
+        )
+
+        assert response.status == "400 BAD REQUEST"
+        assert "match" in response.get_json()["details"]
+
+
+class TestGetArtistsById:
+    def get(self, client, user, ids, query=""):
+        url = "/artists?ids={}{}".format(",".join(map(str, ids)), query)
+        return client.get(url, headers=create_token_auth_header(user.get_token()))
+
+    def test_get_request_returns_artists_in_requested_order(
+        self, client, user, database
+    ):
+        artists = ArtistFactory.create_batch(3, user=user)
+        database.session.commit()
+        ids = [artists[2].id, artists[0].id]
+        response = self.get(client, user, ids)
+
+        assert response.status == "200 OK"
+        assert response.get_json() == {
+            "items": artists_schema.dump([artists[2], artists[0]]),
+            "missing": [],
+        }
+
+    def test_get_request_reports_missing_ids(self, client, user, database):
+        artist = ArtistFactory.create(user=user)
+        other = ArtistFactory.create()
+        database.session.commit()
+        ids = [other.id, artist.id, 1000]
+        response = self.get(client, user, ids)
+
+        assert response.get_json() == {
+            "items": artists_schema.dump([artist]),
+            "missing": [other.id, 1000],
+        }
+
+    def test_get_request_uses_one_query(self, client, user, database):
+        artists = ArtistFactory.create_batch(5, user=user)
+        token = user.get_token()
+        database.session.commit()
+        url = "/artists?ids={}".format(",".join(str(artist.id) for artist in artists))
+
+        # Authenticate, select the artists.
+        with assert_statement_count(database.engine, 2):
+            client.get(url, headers=create_token_auth_header(token))
+
+    def test_get_request_returns_selected_fields(self, client, user, database):
+        artist = ArtistFactory.create(user=user)
+        database.session.commit()
+        response = self.get(client, user, [artist.id], "&fields=name")
+
+        assert response.get_json()["items"] == [{"name": artist.name}]
+
+    def test_get_request_returns_304_if_etag_matches(self, client, user, database):
+        artist = ArtistFactory.create(user=user)
+        database.session.commit()
+        etag = self.get(client, user, [artist.id]).headers["ETag"]
+        response = client.get(
+            "/artists?ids={}".format(artist.id),
+            headers={
+                **create_token_auth_header(user.get_token()),
+                "If-None-Match": etag,
+            },
+        )
+
+        assert response.status == "304 NOT MODIFIED"
+
+    def test_get_request_fails_if_ids_are_invalid(self, client, user):
+        response = client.get(
+            "/artists?ids=a", headers=create_token_auth_header(user.get_token())
+        )
+        assert response.status == "400 BAD REQUEST"
+
+    def test_get_request_fails_if_too_many_ids(self, app, client, user):
+        app.config["BULK_MAX_ITEMS"] = 2
+        response = self.get(client, user, [1, 2, 3])
+        assert response.status == "413 REQUEST ENTITY TOO LARGE"
+
+
+class TestExportArtists:
+    def test_get_request_streams_artists_as_ndjson(self, client, user, database):
+        artists = ArtistFactory.create_batch(25, user=user)
+        ArtistFactory.create_batch(5)
+        database.session.commit()
+        response = client.get(
+            "/artists/export", headers=create_token_auth_header(user.get_token())
+        )
+
+        assert response.status == "200 OK"
+        assert response.mimetype == "application/x-ndjson"
+        assert response.is_streamed
+        lines = response.get_data(as_text=True).splitlines()
+        assert [json.loads(line) for line in lines] == artists_schema.dump(artists)
+
+    def test_get_request_streams_requested_fields(self, client, artist):
+        response = client.get(
+            "/artists/export",
+            query_string={"fields": "name"},
+            headers=create_token_auth_header(artist.user.get_token()),
+        )
+
+        assert response.status == "200 OK"
+        assert json.loads(response.data) == {"name": artist.name}
+
+    def test_get_request_compresses_stream(self, client, user, database):
+        artists = ArtistFactory.create_batch(25, user=user)
+        database.session.commit()
+        headers = create_token_auth_header(user.get_token())
+        headers["Accept-Encoding"] = "gzip"
+        response = client.get("/artists/export", headers=headers)
+
+        assert response.status == "200 OK"
+        assert response.headers["Content-Encoding"] == "gzip"
+        lines = gzip.decompress(response.data).splitlines()
+        assert [json.loads(line) for line in lines] == artists_schema.dump(artists)
+
+    def test_get_request_returns_empty_body_without_artists(self, client, user):
+        response = client.get(
+            "/artists/export", headers=create_token_auth_header(user.get_token())
+        )
+
+        assert response.status == "200 OK"
+        assert response.data == b""
+
+    def test_get_request_fails_without_authentication(self, client):
+        response = client.get("/artists/export")
+        assert response.status == "401 UNAUTHORIZED"
+
 
 class TestGetArtist:
     def test_get_request_returns_artist(self, artist, client):
@@ -117,6 +500,71 @@ class TestGetArtist:
         assert response.status == "200 OK"
         assert response.get_json() == artist_schema.dump(artist)
 
+    def test_get_request_returns_etag(self, artist, client):
+        response = client.get(
+            "/artists/{id}".format(id=artist.id),
+            headers=create_token_auth_header(artist.user.get_token()),
+        )
+
+        assert response.get_etag() == ("artists-{}-1".format(artist.id), False)
+
+    def test_get_request_returns_304_if_etag_matches(self, artist, client, mocker):
+        dump = mocker.patch.object(ArtistSchema, "dump")
+        headers = create_token_auth_header(artist.user.get_token())
+        headers["If-None-Match"] = '"artists-{}-1"'.format(artist.id)
+        response = client.get("/artists/{id}".format(id=artist.id), headers=headers)
+
+        assert response.status == "304 NOT MODIFIED"
+        assert response.data == b""
+        assert response.get_etag() == ("artists-{}-1".format(artist.id), False)
+        dump.assert_not_called()
+
+    def test_get_request_returns_304_if_compressed_etag_matches(self, artist, client):
+        headers = create_token_auth_header(artist.user.get_token())
+        headers["If-None-Match"] = '"artists-{}-1.gzip"'.format(artist.id)
+        response = client.get("/artists/{id}".format(id=artist.id), headers=headers)
+
+        assert response.status == "304 NOT MODIFIED"
+        assert response.get_etag() == ("artists-{}-1.gzip".format(artist.id), False)
+        assert "Accept-Encoding" in response.vary
+
+    def test_get_request_returns_artist_if_etag_is_outdated(
+        self, artist, client, database
+    ):
+        artist.name = "changed"
+        database.session.commit()
+        headers = create_token_auth_header(artist.user.get_token())
+        headers["If-None-Match"] = '"artists-{}-1"'.format(artist.id)
+        response = client.get("/artists/{id}".format(id=artist.id), headers=headers)
+
+        assert response.status == "200 OK"
+        assert response.get_json()["name"] == "changed"
+        assert response.get_etag() == ("artists-{}-2".format(artist.id), False)
+
+    def test_get_request_returns_distinct_etag_for_fields(self, artist, client):
+        response = client.get(
+            "/artists/{id}".format(id=artist.id),
+            query_string={"fields": "name"},
+            headers=create_token_auth_header(artist.user.get_token()),
+        )
+
+        etag, weak = response.get_etag()
+        assert etag.startswith("artists-{}-1.".format(artist.id))
+
+    @pytest.mark.parametrize("owner", [True, False])
+    def test_get_request_executes_two_statements(
+        self, artist, admin, client, database, owner
+    ):
+        token = artist.user.get_token() if owner else admin.get_token()
+        url = "/artists/{id}".format(id=artist.id)
+        database.session.commit()
+
+        # One statement authenticates the user, one loads the artist.
+        with assert_statement_count(database.engine, 2):
+            response = client.get(url, headers=create_token_auth_header(token),)
+
+        assert response.status == "200 OK"
+
 
 class TestPostArtist:
     def test_post_request_creates_artist(self, client, user):
@@ -180,6 +628,402 @@ class TestPostArtist:
         assert "name" in response.get_json()["details"]
 
 
+class TestPostArtistsBulk:
+    def items(self, *names):
+        items = [artist_schema.dump(ArtistFactory.build(name=name)) for name in names]
+        for item in items:
+            del item["id"]
+        return items
+
+    def post(self, client, user, items):
+        return client.post(
+            "/artists/bulk",
+            data=json.dumps(items),
+            content_type="application/json",
+            headers=create_token_auth_header(user.get_token()),
+        )
+
+    def test_post_request_creates_artists(self, client, user):
+        items = self.items("b", "a", "c")
+        response = self.post(client, user, items)
+
+        assert response.status == "201 CREATED"
+        created = response.get_json()
+        assert [{**item, "id": None} for item in created] == [
+            {**item, "id": None} for item in items
+        ]
+        artists = Artist.query.order_by(Artist.id).all()
+        assert artists_schema.dump(artists) == sorted(
+            created, key=lambda item: item["id"]
+        )
+        assert all(artist.user_id == user.id for artist in artists)
+
+    def test_post_request_inserts_in_one_statement(self, client, user, database):
+        token = user.get_token()
+        database.session.commit()
+        items = self.items(*"abcde")
+
+        # Authenticate, check names, insert, read back, bump the version.
+        with assert_statement_count(database.engine, 5) as statements:
+            client.post(
+                "/artists/bulk",
+                data=json.dumps(items),
+                content_type="application/json",
+                headers=create_token_auth_header(token),
+            )
+
+        assert sum(statement.startswith("INSERT") for statement in statements) == 1
+
+    def test_post_request_updates_list(self, client, user):
+        self.post(client, user, self.items("a", "b"))
+        response = client.get(
+            "/artists", headers=create_token_auth_header(user.get_token())
+        )
+
+        assert [item["name"] for item in response.get_json()] == ["a", "b"]
+
+    def test_post_request_accepts_empty_list(self, client, user):
+        response = self.post(client, user, [])
+
+        assert response.status == "201 CREATED"
+        assert response.get_json() == []
+
+    def test_post_request_reports_invalid_items_by_index(self, client, user):
+        items = self.items("a", "b")
+        items[1]["name"] = ""
+        response = self.post(client, user, items)
+
+        assert response.status == "422 UNPROCESSABLE ENTITY"
+        assert list(response.get_json()["details"]) == ["1"]
+        assert Artist.query.count() == 0
+
+    def test_post_request_fails_if_body_is_not_a_list(self, client, user):
+        response = self.post(client, user, self.items("a")[0])
+        assert response.status == "422 UNPROCESSABLE ENTITY"
+
+    def test_post_request_reports_repeated_names_by_index(self, client, user):
+        response = self.post(client, user, self.items("a", "b", "a"))
+
+        assert response.status == "400 BAD REQUEST"
+        assert response.get_json()["details"] == {
+            "2": {"name": "please use a different name"}
+        }
+        assert Artist.query.count() == 0
+
+    def test_post_request_reports_existing_names_by_index(self, client, user, database):
+        ArtistFactory.create(user=user, name="b")
+        ArtistFactory.create(name="a")
+        database.session.commit()
+        response = self.post(client, user, self.items("a", "b"))
+
+        assert response.status == "400 BAD REQUEST"
+        assert list(response.get_json()["details"]) == ["1"]
+
+    def test_post_request_fails_if_too_many_items(self, app, client, user):
+        app.config["BULK_MAX_ITEMS"] = 2
+        response = self.post(client, user, self.items("a", "b", "c"))
+
+        assert response.status == "413 REQUEST ENTITY TOO LARGE"
+        assert Artist.query.count() == 0
+
+    def test_post_request_fails_without_authentication(self, client):
+        response = client.post(
+            "/artists/bulk", data="[]", content_type="application/json"
+        )
+        assert response.status == "401 UNAUTHORIZED"
+
+
+class TestPutArtists:
+    def put(self, client, user, names):
+        return client.put(
+            "/artists",
+            data=json.dumps([{"name": name} for name in names]),
+            content_type="application/json",
+            headers=create_token_auth_header(user.get_token()),
+        )
+
+    def names(self, user):
+        return sorted(artist.name for artist in Artist.query.filter_by(user=user))
+
+    def test_put_request_synchronizes_artists(self, client, user, database):
+        for name in ("a", "b", "c"):
+            ArtistFactory.create(user=user, name=name)
+        database.session.commit()
+        response = self.put(client, user, ["b", "d", "c", "e"])
+
+        assert response.status == "200 OK"
+        assert response.get_json() == {
+            "created": 2,
+            "updated": 0,
+            "deleted": 1,
+            "unchanged": 2,
+        }
+        assert self.names(user) == ["b", "c", "d", "e"]
+
+    def test_put_request_keeps_ids_of_existing_artists(self, client, user, database):
+        artist = ArtistFactory.create(user=user, name="a")
+        database.session.commit()
+        id = artist.id
+        self.put(client, user, ["a", "b"])
+
+        assert Artist.query.filter_by(name="a").one().id == id
+
+    def test_put_request_does_not_change_artists_of_other_users(
+        self, client, user, database
+    ):
+        other = ArtistFactory.create(name="a")
+        database.session.commit()
+        self.put(client, user, ["a"])
+
+        assert Artist.query.count() == 2
+        assert Artist.query.get(other.id) is not None
+
+    def test_put_request_removes_all_artists_for_empty_list(
+        self, client, user, database
+    ):
+        ArtistFactory.create_batch(3, user=user)
+        database.session.commit()
+        response = self.put(client, user, [])
+
+        assert response.get_json()["deleted"] == 3
+        assert self.names(user) == []
+
+    def test_put_request_updates_list(self, client, user, database):
+        ArtistFactory.create(user=user, name="a")
+        database.session.commit()
+        headers = create_token_auth_header(user.get_token())
+        client.get("/artists", headers=headers)
+        self.put(client, user, ["b"])
+        response = client.get("/artists", headers=headers)
+
+        assert [item["name"] for item in response.get_json()] == ["b"]
+
+    def test_put_request_keeps_version_if_nothing_changes(self, client, user, database):
+        ArtistFactory.create(user=user, name="a")
+        database.session.commit()
+        headers = create_token_auth_header(user.get_token())
+        etag = client.get("/artists", headers=headers).headers["ETag"]
+        self.put(client, user, ["a"])
+
+        assert client.get("/artists", headers=headers).headers["ETag"] == etag
+
+    def test_put_request_reports_repeated_names_by_index(self, client, user):
+        response = self.put(client, user, ["a", "b", "a"])
+
+        assert response.status == "400 BAD REQUEST"
+        assert list(response.get_json()["details"]) == ["2"]
+
+    def test_put_request_fails_if_too_many_items(self, app, client, user):
+        app.config["BULK_SYNC_MAX_ITEMS"] = 2
+        response = self.put(client, user, ["a", "b", "c"])
+        assert response.status == "413 REQUEST ENTITY TOO LARGE"
+
+    def test_put_request_fails_without_authentication(self, client):
+        response = client.put("/artists", data="[]", content_type="application/json")
+        assert response.status == "401 UNAUTHORIZED"
+
+
+class TestPatchArtists:
+    def patch(self, client, user, items):
+        return client.patch(
+            "/artists",
+            data=json.dumps(items),
+            content_type="application/json",
+            headers=create_token_auth_header(user.get_token()),
+        )
+
+    def test_patch_request_renames_artists(self, client, user, database):
+        artists = ArtistFactory.create_batch(3, user=user)
+        database.session.commit()
+        ids = [artist.id for artist in artists]
+        items = [{"id": ids[2], "name": "c"}, {"id": ids[0], "name": "a"}]
+        response = self.patch(client, user, items)
+
+        assert response.status == "200 OK"
+        assert response.get_json() == items
+        names = [Artist.query.get(id).name for id in ids]
+        assert names[0] == "a" and names[2] == "c"
+        assert names[1] == artists[1].name
+
+    def test_patch_request_updates_in_one_statement(self, client, user, database):
+        artists = ArtistFactory.create_batch(5, user=user)
+        token = user.get_token()
+        database.session.commit()
+        items = [{"id": artist.id, "name": str(artist.id)} for artist in artists]
+
+        # Authenticate, check names, update, read back, bump the version.
+        with assert_statement_count(database.engine, 5) as statements:
+            client.patch(
+                "/artists",
+                data=json.dumps(items),
+                content_type="application/json",
+                headers=create_token_auth_header(token),
+            )
+
+        assert (
+            sum(statement.startswith("UPDATE artists") for statement in statements) == 1
+        )
+
+    def test_patch_request_changes_etags(self, client, user, database):
+        artist = ArtistFactory.create(user=user)
+        database.session.commit()
+        url = "/artists/{}".format(artist.id)
+        headers = create_token_auth_header(user.get_token())
+        etag = client.get(url, headers=headers).headers["ETag"]
+        self.patch(client, user, [{"id": artist.id, "name": "a"}])
+
+        assert client.get(url, headers=headers).headers["ETag"] != etag
+
+    def test_patch_request_updates_list(self, client, user, database):
+        artist = ArtistFactory.create(user=user)
+        database.session.commit()
+        headers = create_token_auth_header(user.get_token())
+        client.get("/artists", headers=headers)
+        self.patch(client, user, [{"id": artist.id, "name": "a"}])
+        response = client.get("/artists", headers=headers)
+
+        assert [item["name"] for item in response.get_json()] == ["a"]
+
+    def test_patch_request_returns_404_for_artist_of_another_user(
+        self, client, user, database
+    ):
+        artist = ArtistFactory.create(user=user)
+        other = ArtistFactory.create()
+        database.session.commit()
+        items = [{"id": artist.id, "name": "a"}, {"id": other.id, "name": "b"}]
+        response = self.patch(client, user, items)
+
+        assert response.status == "404 NOT FOUND"
+        assert response.get_json()["details"] == {"1": {"id": "not found"}}
+        assert Artist.query.get(artist.id).name != "a"
+        assert Artist.query.get(other.id).name != "b"
+
+    def test_patch_request_reports_invalid_items_by_index(self, client, user):
+        items = [{"id": 1, "name": "a"}, {"name": ""}]
+        response = self.patch(client, user, items)
+
+        assert response.status == "422 UNPROCESSABLE ENTITY"
+        assert set(response.get_json()["details"]["1"]) == {"id", "name"}
+
+    def test_patch_request_reports_repeated_ids_by_index(self, client, user):
+        items = [{"id": 1, "name": "a"}, {"id": 1, "name": "b"}]
+        response = self.patch(client, user, items)
+
+        assert response.status == "400 BAD REQUEST"
+        assert list(response.get_json()["details"]) == ["1"]
+
+    def test_patch_request_reports_existing_names_by_index(
+        self, client, user, database
+    ):
+        artists = [
+            ArtistFactory.create(user=user, name=name) for name in ("a", "b", "c")
+        ]
+        database.session.commit()
+        items = [
+            {"id": artists[0].id, "name": "b"},
+            {"id": artists[2].id, "name": "c"},
+        ]
+        response = self.patch(client, user, items)
+
+        assert response.status == "400 BAD REQUEST"
+        assert list(response.get_json()["details"]) == ["0"]
+
+    def test_patch_request_allows_name_of_renamed_artist(self, client, user, database):
+        artists = [ArtistFactory.create(user=user, name=name) for name in ("a", "b")]
+        database.session.commit()
+        items = [
+            {"id": artists[0].id, "name": "c"},
+            {"id": artists[1].id, "name": "a"},
+        ]
+        response = self.patch(client, user, items)
+
+        assert response.status == "200 OK"
+
+    def test_patch_request_reports_swapped_names_by_index(self, client, user, database):
+        artists = [
+            ArtistFactory.create(user=user, name=name) for name in ("a", "b", "c")
+        ]
+        database.session.commit()
+        items = [
+            {"id": artists[0].id, "name": "b"},
+            {"id": artists[2].id, "name": "d"},
+            {"id": artists[1].id, "name": "a"},
+        ]
+        response = self.patch(client, user, items)
+
+        # SQLite cannot defer the unique constraint, unlike PostgreSQL.
+        assert response.status == "400 BAD REQUEST"
+        assert list(response.get_json()["details"]) == ["0", "2"]
+        assert Artist.query.get(artists[2].id).name == "c"
+
+    def test_patch_request_fails_if_too_many_items(self, app, client, user):
+        app.config["BULK_MAX_ITEMS"] = 1
+        response = self.patch(client, user, [{"id": 1}, {"id": 2}])
+        assert response.status == "413 REQUEST ENTITY TOO LARGE"
+
+    def test_patch_request_fails_without_authentication(self, client):
+        response = client.patch("/artists", data="[]", content_type="application/json")
+        assert response.status == "401 UNAUTHORIZED"
+
+
+class TestDeleteArtists:
+    def delete(self, client, user, ids):
+        return client.delete(
+            "/artists?ids={}".format(",".join(map(str, ids))),
+            headers=create_token_auth_header(user.get_token()),
+        )
+
+    def test_delete_request_removes_artists(self, client, user, database):
+        artists = ArtistFactory.create_batch(3, user=user)
+        database.session.commit()
+        ids = [artist.id for artist in artists]
+        response = self.delete(client, user, ids[:2])
+
+        assert response.status == "204 NO CONTENT"
+        assert [artist.id for artist in Artist.query.all()] == ids[2:]
+
+    def test_delete_request_deletes_in_one_statement(self, client, user, database):
+        artists = ArtistFactory.create_batch(5, user=user)
+        token = user.get_token()
+        database.session.commit()
+        url = "/artists?ids={}".format(",".join(str(artist.id) for artist in artists))
+
+        # Authenticate, delete, bump the version.
+        with assert_statement_count(database.engine, 3):
+            client.delete(url, headers=create_token_auth_header(token))
+
+    def test_delete_request_returns_404_for_artist_of_another_user(
+        self, client, user, database
+    ):
+        artist = ArtistFactory.create(user=user)
+        other = ArtistFactory.create()
+        database.session.commit()
+        ids = [artist.id, other.id]
+        response = self.delete(client, user, ids)
+
+        assert response.status == "404 NOT FOUND"
+        assert response.get_json()["details"] == {"1": {"id": "not found"}}
+        assert Artist.query.count() == 2
+
+    @pytest.mark.parametrize("query", ["", "?ids=", "?ids=1,a"])
+    def test_delete_request_fails_if_ids_are_invalid(self, client, user, query):
+        response = client.delete(
+            "/artists" + query, headers=create_token_auth_header(user.get_token())
+        )
+
+        assert response.status == "400 BAD REQUEST"
+        assert "ids" in response.get_json()["details"]
+
+    def test_delete_request_fails_if_too_many_ids(self, app, client, user):
+        app.config["BULK_MAX_ITEMS"] = 1
+        response = self.delete(client, user, [1, 2])
+        assert response.status == "413 REQUEST ENTITY TOO LARGE"
+
+    def test_delete_request_fails_without_authentication(self, client):
+        response = client.delete("/artists?ids=1")
+        assert response.status == "401 UNAUTHORIZED"
+
+
 class TestPutArtist:
     def test_put_request_modifies_name(self, client, artist):
         original = artist_schema.dump(artist)
@@ -282,6 +1126,21 @@ class TestPutArtist:
         assert response.status == "200 OK"
         assert Artist.query.get(artist1.id).name == artist2.name
 
+    def test_put_request_by_admin_checks_names_of_owner(
+        self, client, artist, admin, database
+    ):
+        ArtistFactory.create(user=admin, name="john")
+        database.session.commit()
+        response = client.put(
+            "/artists/{id}".format(id=artist.id),
+            data=json.dumps({"name": "john"}),
+            content_type="application/json",
+            headers=create_token_auth_header(admin.get_token()),
+        )
+
+        assert response.status == "200 OK"
+        assert artist.name == "john"
+
     def test_put_request_succeeds_if_name_is_unchanged(self, artist, client):
         name = artist.name
         response = client.put(
@@ -303,6 +1162,60 @@ class TestPutArtist:
         assert response.status == "422 UNPROCESSABLE ENTITY"
         assert "name" in response.get_json()["details"]
 
+    def test_put_request_returns_new_etag(self, client, artist):
+        response = client.put(
+            "/artists/{id}".format(id=artist.id),
+            data=json.dumps({"name": "john"}),
+            content_type="application/json",
+            headers=create_token_auth_header(artist.user.get_token()),
+        )
+
+        assert response.get_etag() == ("artists-{}-2".format(artist.id), False)
+
+    @pytest.mark.parametrize("etag", ['"artists-{id}-1"', '"artists-{id}-1.gzip"', "*"])
+    def test_put_request_succeeds_if_etag_matches(self, client, artist, etag):
+        headers = create_token_auth_header(artist.user.get_token())
+        headers["If-Match"] = etag.format(id=artist.id)
+        response = client.put(
+            "/artists/{id}".format(id=artist.id),
+            data=json.dumps({"name": "john"}),
+            content_type="application/json",
+            headers=headers,
+        )
+
+        assert response.status == "200 OK"
+
+    @pytest.mark.parametrize("etag", ['"artists-{id}-2"', 'W/"artists-{id}-1"'])
+    def test_put_request_returns_412_if_etag_does_not_match(self, client, artist, etag):
+        headers = create_token_auth_header(artist.user.get_token())
+        headers["If-Match"] = etag.format(id=artist.id)
+        response = client.put(
+            "/artists/{id}".format(id=artist.id),
+            data=json.dumps({"name": "john"}),
+            content_type="application/json",
+            headers=headers,
+        )
+
+        assert response.status == "412 PRECONDITION FAILED"
+        assert artist.name != "john"
+
+    def test_put_request_executes_five_statements(self, artist, client, database):
+        token = artist.user.get_token()
+        url = "/artists/{id}".format(id=artist.id)
+        database.session.commit()
+
+        # Authenticate, load the artist, bump the collection version, update
+        # the artist, and reload it after the commit.
+        with assert_statement_count(database.engine, 5):
+            response = client.put(
+                url,
+                data=json.dumps({"name": "john"}),
+                content_type="application/json",
+                headers=create_token_auth_header(token),
+            )
+
+        assert response.status == "200 OK"
+
 
 class TestDeleteArtist:
     def test_delete_request_removes_artist(self, artist, client):
@@ -351,3 +1264,23 @@ class TestDeleteArtist:
     def test_delete_request_fails_without_authentication(self, artist, client):
         response = client.delete("/artists/{id}".format(id=artist.id))
         assert response.status == "401 UNAUTHORIZED"
+
+    def test_delete_request_returns_412_if_etag_does_not_match(self, artist, client):
+        headers = create_token_auth_header(artist.user.get_token())
+        headers["If-Match"] = '"artists-{}-2"'.format(artist.id)
+        response = client.delete("/artists/{id}".format(id=artist.id), headers=headers)
+
+        assert response.status == "412 PRECONDITION FAILED"
+        assert Artist.query.get(artist.id) is not None
+
+    def test_delete_request_executes_four_statements(self, artist, client, database):
+        token = artist.user.get_token()
+        url = "/artists/{id}".format(id=artist.id)
+        database.session.commit()
+
+        # Authenticate, load the artist, bump the collection version, and
+        # delete the artist.
+        with assert_statement_count(database.engine, 4):
+            response = client.delete(url, headers=create_token_auth_header(token),)
+
+        assert response.status == "204 NO CONTENT"
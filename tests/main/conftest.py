@@ -0,0 +1 @@
+from tests.user.fixtures import *  # noqa
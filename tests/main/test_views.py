@@ -1,8 +1,36 @@
 """Test main views."""
 import muckr_api
+from tests.utils import create_token_auth_header
 
 
 class TestViews:
     def test_index(self, client):
         response = client.get("/")
         assert muckr_api.__version__ in response.data.decode("utf-8")
+
+    def test_stats_returns_token_cache_counters(self, admin, client):
+        response = client.get(
+            "/stats", headers=create_token_auth_header(admin.get_token())
+        )
+        assert response.status == "200 OK"
+        assert {"hits", "misses"} <= set(response.get_json()["token_cache"])
+
+    def test_stats_returns_response_cache_counters(self, admin, client):
+        response = client.get(
+            "/stats", headers=create_token_auth_header(admin.get_token())
+        )
+        stats = response.get_json()["response_cache"]
+        assert {"hits", "misses", "hit_ratio", "evictions"} <= set(stats)
+
+    def test_stats_returns_database_pool_counters(self, admin, client):
+        response = client.get(
+            "/stats", headers=create_token_auth_header(admin.get_token())
+        )
+        stats = response.get_json()["database"]["primary"]
+        assert {"checkouts", "waits", "overflows", "timeouts"} <= set(stats)
+
+    def test_stats_fails_without_admin_status(self, user, client):
+        response = client.get(
+            "/stats", headers=create_token_auth_header(user.get_token())
+        )
+        assert response.status == "401 UNAUTHORIZED"
@@ -1,6 +1,10 @@
 """Test app module."""
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.schema import CreateTable
+
 import muckr_api.app
 import muckr_api.extensions
+from muckr_api.artist.models import Artist
 
 
 def test_import_returns_name_value_pair(app):
@@ -13,3 +17,9 @@ def test_register_shell_context_registers_database(app):
     context = app.make_shell_context()
     assert "database" in context
     assert context["database"] is muckr_api.extensions.database
+
+
+def test_unique_names_are_deferrable_on_postgresql():
+    table = CreateTable(Artist.__table__)
+    assert "DEFERRABLE" in str(table.compile(dialect=postgresql.dialect()))
+    assert "DEFERRABLE" not in str(table.compile(dialect=sqlite.dialect()))
@@ -0,0 +1,127 @@
+"""Test response compression."""
+import gzip
+import importlib
+import json
+
+import flask
+import pytest
+
+from muckr_api.compression import ENCODINGS, _is_installed
+from muckr_api.extensions import compress
+
+installed_encodings = [encoding for encoding in ENCODINGS if _is_installed(encoding)]
+
+ITEMS = [{"id": n, "name": "artist{}".format(n)} for n in range(100)]
+
+
+def decompress(data, encoding):
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    if encoding == "br":
+        return importlib.import_module("brotli").decompress(data)
+    decompressor = importlib.import_module("zstandard").ZstdDecompressor()
+    return decompressor.decompressobj().decompress(data)
+
+
+@pytest.fixture
+def client(app):
+    blueprint = flask.Blueprint("compression", __name__)
+
+    @blueprint.route("/large")
+    def large():
+        return flask.jsonify(ITEMS)
+
+    @blueprint.route("/tagged")
+    def tagged():
+        response = flask.jsonify(ITEMS)
+        response.set_etag("items")
+        return response
+
+    @blueprint.route("/small")
+    def small():
+        return flask.jsonify(ITEMS[:1])
+
+    @blueprint.route("/text")
+    def text():
+        return "x" * 1000
+
+    @blueprint.route("/stream")
+    def stream():
+        def generate():
+            for item in ITEMS:
+                yield json.dumps(item) + "\n"
+
+        return flask.Response(generate(), mimetype="application/x-ndjson")
+
+    app.register_blueprint(blueprint)
+    return app.test_client()
+
+
+@pytest.mark.parametrize("encoding", installed_encodings)
+def test_compresses_large_response(client, encoding):
+    response = client.get("/large", headers={"Accept-Encoding": encoding})
+    assert response.headers["Content-Encoding"] == encoding
+    assert response.headers["Content-Length"] == str(len(response.data))
+    assert json.loads(decompress(response.data, encoding)) == ITEMS
+
+
+@pytest.mark.parametrize("encoding", installed_encodings)
+def test_compresses_streaming_response(client, encoding):
+    response = client.get("/stream", headers={"Accept-Encoding": encoding})
+    lines = decompress(response.data, encoding).splitlines()
+    assert response.headers["Content-Encoding"] == encoding
+    assert "Content-Length" not in response.headers
+    assert [json.loads(line) for line in lines] == ITEMS
+
+
+def test_flushes_streaming_response(client, monkeypatch):
+    monkeypatch.setattr("muckr_api.compression.STREAM_FLUSH_SIZE", 1)
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    chunks = list(response.response)
+    assert len(chunks) == len(ITEMS) + 1
+
+
+def test_tags_compressed_representation(client):
+    response = client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+    assert response.get_etag() == ("items.gzip", False)
+
+
+def test_does_not_compress_small_response(client):
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.get_json() == ITEMS[:1]
+
+
+def test_does_not_compress_without_accept_encoding(client):
+    response = client.get("/large")
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json() == ITEMS
+
+
+def test_does_not_compress_other_mimetypes(client):
+    response = client.get("/text", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_does_not_compress_excluded_blueprint(app, client):
+    compress.exclude_blueprints.add("compression")
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_prefers_encoding_with_higher_quality(client):
+    response = client.get("/large", headers={"Accept-Encoding": "br;q=0.5, gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+
+
+def test_respects_configured_preference(client):
+    compress.encodings = ["gzip"] + installed_encodings
+    response = client.get("/large", headers={"Accept-Encoding": "*"})
+    assert response.headers["Content-Encoding"] == "gzip"
+
+
+def test_rejects_unknown_encoding(app):
+    app.config["COMPRESS_ALGORITHMS"] = ["deflate"]
+    with pytest.raises(ValueError):
+        compress.init_app(app)
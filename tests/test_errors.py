@@ -1,6 +1,9 @@
 """Test error handling."""
+from sqlalchemy.orm.exc import StaleDataError
+
 import muckr_api.errors
 from muckr_api.extensions import database
+from muckr_api.user.hashing import HasherBusyError
 
 
 def test_handle_error_rolls_back_on_internal_error(app, mocker):
@@ -14,3 +17,18 @@ def test_handle_error_returns_status_500_on_internal_error(app):
     assert response.status_code == 500
     assert response.json == {"error": "Internal Server Error"}
     assert response.mimetype == "application/json"
+
+
+def test_handle_busy_returns_status_503_with_retry_after(app):
+    response = muckr_api.errors.handle_busy(HasherBusyError(3))
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+    assert response.json == {"error": "Service Unavailable"}
+
+
+def test_handle_conflict_returns_status_409(app, mocker):
+    mock_session = mocker.patch.object(database, "session")
+    response = muckr_api.errors.handle_conflict(StaleDataError())
+    assert response.status_code == 409
+    assert response.json == {"error": "Conflict"}
+    mock_session.rollback.assert_called_once_with()
@@ -0,0 +1,62 @@
+"""Test JSON encoding for responses."""
+import json
+from datetime import datetime
+
+import flask
+import pytest
+
+from muckr_api.json_provider import BACKENDS, JSONProvider, _is_installed
+
+installed_backends = [backend for backend in BACKENDS if _is_installed(backend)]
+
+
+@pytest.fixture(params=installed_backends)
+def provider(app, request):
+    app.config["JSON_BACKEND"] = request.param
+    return JSONProvider(app)
+
+
+DATA = {
+    "b": [1, 2.5, None, True],
+    "a": {"text": "café / ☃", "empty": {}},
+    "date": datetime(2019, 9, 21, 12, 30),
+}
+
+
+def test_dumps_is_equivalent_to_flask(provider):
+    expected = json.loads(flask.json.dumps(DATA))
+    assert json.loads(provider.dumps(DATA)) == expected
+
+
+def test_dumps_sorts_keys(provider):
+    assert provider.dumps({"b": 1, "a": 2}) == b'{"a":2,"b":1}'
+
+
+def test_dumps_preserves_order_if_configured(app):
+    app.config.update(JSON_SORT_KEYS=False, JSON_BACKEND=installed_backends[0])
+    provider = JSONProvider(app)
+    assert provider.dumps({"b": 1, "a": 2}) == b'{"b":1,"a":2}'
+
+
+def test_dumps_rejects_unknown_types(provider):
+    with pytest.raises(TypeError):
+        provider.dumps({"value": object()})
+
+
+def test_response_has_json_mimetype(provider):
+    response = provider.response({"a": 1}, status=201, headers={"X-Test": "1"})
+    assert response.status_code == 201
+    assert response.mimetype == "application/json"
+    assert response.headers["X-Test"] == "1"
+    assert response.get_json() == {"a": 1}
+
+
+def test_auto_selects_fastest_installed_backend(app):
+    app.config["JSON_BACKEND"] = "auto"
+    assert JSONProvider(app).backend == installed_backends[0]
+
+
+def test_unknown_backend_is_rejected(app):
+    app.config["JSON_BACKEND"] = "unknown"
+    with pytest.raises(ValueError):
+        JSONProvider(app)
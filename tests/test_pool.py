@@ -0,0 +1,93 @@
+"""Test the connection pools."""
+import sqlite3
+
+import pytest
+import sqlalchemy.exc
+import sqlalchemy.pool
+from sqlalchemy.engine.url import make_url
+
+from muckr_api.pool import DatabasePool, InstrumentedPool, instrument
+
+
+@pytest.fixture
+def pool():
+    pool_class = instrument(sqlalchemy.pool.QueuePool)
+    return pool_class(
+        lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=1, timeout=0.01
+    )
+
+
+@pytest.fixture
+def database_pool(app):
+    return DatabasePool(app)
+
+
+def test_instrument_returns_subclass_of_pool_class():
+    pool_class = instrument(sqlalchemy.pool.QueuePool)
+
+    assert issubclass(pool_class, sqlalchemy.pool.QueuePool)
+    assert issubclass(pool_class, InstrumentedPool)
+    assert instrument(sqlalchemy.pool.QueuePool) is pool_class
+    assert instrument(pool_class) is pool_class
+
+
+def test_pool_counts_checkouts(pool):
+    pool.connect().close()
+    pool.connect().close()
+    stats = pool.get_stats()
+
+    assert stats["checkouts"] == 2
+    assert stats["checkout_time_avg"] > 0
+    assert stats["overflows"] == 0
+    assert (stats["in_use"], stats["idle"]) == (0, 1)
+
+
+def test_pool_counts_overflows_and_timeouts(pool):
+    connections = [pool.connect(), pool.connect()]
+    with pytest.raises(sqlalchemy.exc.TimeoutError):
+        pool.connect()
+    stats = pool.get_stats()
+
+    assert stats["overflows"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["waits"] == 1
+    assert stats["wait_time"] >= 0.01
+    assert (stats["in_use"], stats["overflow"]) == (2, 1)
+
+    for connection in connections:
+        connection.close()
+
+
+def test_configure_sets_queue_pool_options(app, database_pool):
+    app.config["DATABASE_POOL_SIZE"] = 3
+    app.config["DATABASE_POOL_PRE_PING"] = True
+    url = make_url("postgresql://localhost/muckr")
+    options = database_pool.configure(app, url, {})
+
+    assert issubclass(options["poolclass"], sqlalchemy.pool.QueuePool)
+    assert options["pool_size"] == 3
+    assert options["max_overflow"] == 10
+    assert options["pool_timeout"] == 30
+    assert options["pool_pre_ping"] is True
+
+
+def test_configure_keeps_pool_class_of_driver(app, database_pool):
+    url = make_url("sqlite://")
+    options = {"poolclass": sqlalchemy.pool.StaticPool}
+    options = database_pool.configure(app, url, options)
+
+    assert issubclass(options["poolclass"], sqlalchemy.pool.StaticPool)
+    assert "pool_size" not in options
+
+
+def test_configure_closes_connections_for_pgbouncer(app, database_pool):
+    app.config["DATABASE_PGBOUNCER"] = True
+    url = make_url("postgresql://localhost/muckr")
+    options = database_pool.configure(app, url, {})
+
+    assert issubclass(options["poolclass"], sqlalchemy.pool.NullPool)
+    assert "pool_size" not in options
+
+
+def test_engine_pool_is_instrumented(database):
+    assert isinstance(database.engine.pool, InstrumentedPool)
@@ -0,0 +1,215 @@
+"""Test routing of reads to the replica."""
+import json
+import time
+import types
+
+import pytest
+
+import muckr_api.app
+import muckr_api.extensions
+import tests.config
+from muckr_api.artist.models import Artist
+from muckr_api.extensions import replica
+from muckr_api.replica import STICKY_COOKIE
+from muckr_api.user.models import User
+
+from tests.artist.factories import ArtistFactory
+from tests.user.factories import UserFactory
+from tests.utils import create_basic_auth_header, create_token_auth_header
+
+
+@pytest.fixture
+def replica_url():
+    return "sqlite://"
+
+
+@pytest.fixture
+def app(replica_url):
+    config = {key: value for key, value in vars(tests.config).items() if key.isupper()}
+    config["DATABASE_REPLICA_URL"] = replica_url
+    app = muckr_api.app.create_app(types.SimpleNamespace(**config))
+    context = app.test_request_context()
+    context.push()
+
+    yield app
+
+    context.pop()
+
+
+@pytest.fixture
+def database(app):
+    database = muckr_api.extensions.database
+    database.app = app
+    database.create_all(bind=None)
+
+    yield database
+
+    database.session.close()
+    database.drop_all(bind=None)
+
+
+@pytest.fixture
+def replica_engine(app, database):
+    engine = database.get_engine(app, bind="replica")
+    database.Model.metadata.create_all(engine)
+
+    yield engine
+
+    database.Model.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def user(database):
+    user = UserFactory.create()
+    user.get_token()
+    database.session.commit()
+    return user
+
+
+@pytest.fixture
+def client(app, database):
+    return app.test_client()
+
+
+def replicate(database, engine, *models):
+    for model in models:
+        table = model.__table__
+        rows = [dict(row) for row in database.session.execute(table.select())]
+        engine.execute(table.delete())
+        if rows:
+            engine.execute(table.insert(), rows)
+
+
+def get_names(client, user):
+    response = client.get("/artists", headers=create_token_auth_header(user.token))
+    assert response.status == "200 OK"
+    return [item["name"] for item in response.get_json()]
+
+
+def post_artist(client, user, name):
+    response = client.post(
+        "/artists",
+        data=json.dumps({"name": name}),
+        content_type="application/json",
+        headers=create_token_auth_header(user.token),
+    )
+    assert response.status == "201 CREATED"
+
+
+def test_get_request_reads_from_replica(client, user, database, replica_engine):
+    ArtistFactory.create(user=user, name="a")
+    database.session.commit()
+    replicate(database, replica_engine, User)
+
+    assert get_names(client, user) == []
+
+
+def test_get_request_for_user_reads_from_replica(
+    client, user, database, replica_engine
+):
+    replicate(database, replica_engine, User)
+    email, url = user.email, "/users/{}".format(user.id)
+    headers = create_token_auth_header(user.token)
+    user.email = "changed@example.com"
+    database.session.commit()
+    response = client.get(url, headers=headers)
+
+    assert response.get_json()["email"] == email
+
+
+def test_post_request_writes_to_primary(client, user, database, replica_engine):
+    replicate(database, replica_engine, User)
+    post_artist(client, user, "a")
+
+    assert Artist.query.count() == 1
+    assert replica_engine.execute(Artist.__table__.select()).fetchall() == []
+
+
+def test_get_request_reads_from_primary_after_write(
+    client, user, database, replica_engine
+):
+    replicate(database, replica_engine, User)
+    post_artist(client, user, "a")
+
+    assert get_names(client, user) == ["a"]
+
+
+def test_get_request_reads_from_replica_after_sticky_window(
+    client, user, database, replica_engine
+):
+    replicate(database, replica_engine, User)
+    replica.sticky = 0
+    post_artist(client, user, "a")
+
+    assert get_names(client, user) == []
+
+
+def test_get_request_reads_from_primary_after_write_in_other_process(
+    client, user, database, replica_engine
+):
+    replicate(database, replica_engine, User)
+    post_artist(client, user, "a")
+    replica._writers.clear()
+
+    assert get_names(client, user) == ["a"]
+
+
+def test_get_request_reads_from_replica_without_sticky_cookie(
+    client, user, database, replica_engine
+):
+    replicate(database, replica_engine, User)
+    post_artist(client, user, "a")
+    replica._writers.clear()
+    client.cookie_jar.clear()
+
+    assert get_names(client, user) == []
+
+
+def test_get_request_ignores_sticky_cookie_beyond_window(
+    client, user, database, replica_engine
+):
+    replicate(database, replica_engine, User)
+    client.set_cookie("localhost", STICKY_COOKIE, str(time.time() + 3600))
+
+    assert get_names(client, user) == []
+
+
+def test_failed_authentication_does_not_mark_writer(client, user, replica_engine):
+    response = client.post(
+        "/tokens", headers=create_basic_auth_header(user.username, "wrong")
+    )
+
+    assert response.status == "401 UNAUTHORIZED"
+    assert not replica.has_written(user.id)
+    assert STICKY_COOKIE not in response.headers.get("Set-Cookie", "")
+
+
+def test_get_request_falls_back_if_token_is_not_replicated(
+    client, user, database, replica_engine
+):
+    ArtistFactory.create(user=user, name="a")
+    database.session.commit()
+
+    assert get_names(client, user) == ["a"]
+
+
+class TestUnavailableReplica:
+    @pytest.fixture
+    def replica_url(self, tmp_path):
+        return "sqlite:///{}".format(tmp_path / "missing" / "replica.db")
+
+    def test_get_request_falls_back_to_primary(self, client, user, database):
+        ArtistFactory.create(user=user, name="a")
+        database.session.commit()
+
+        assert get_names(client, user) == ["a"]
+        assert not replica.is_available
+
+    def test_get_request_uses_primary_while_replica_is_down(
+        self, client, user, database
+    ):
+        get_names(client, user)
+        ArtistFactory.create(user=user, name="a")
+        database.session.commit()
+
+        assert get_names(client, user) == ["a"]
@@ -0,0 +1,108 @@
+"""Test the response cache."""
+import flask
+import pytest
+
+from muckr_api.response_cache import MemoryBackend, ResponseCache
+
+
+@pytest.fixture
+def backend():
+    return MemoryBackend(maxsize=100, ttl=60)
+
+
+@pytest.fixture
+def cache(app):
+    return ResponseCache(app)
+
+
+def test_backend_returns_stored_value(backend):
+    backend.set("key", b"value", "tag")
+    assert backend.get("key") == b"value"
+
+
+def test_backend_returns_none_for_missing_key(backend):
+    assert backend.get("key") is None
+
+
+def test_backend_evicts_least_recently_used_values(backend):
+    for key in "abcd":
+        backend.set(key, b"x" * 20, "tag")
+    backend.get("a")
+    backend.set("e", b"x" * 20, "tag")
+
+    assert backend.get("a") is not None
+    assert backend.get("b") is None
+    assert backend.stats() == {
+        "entries": 4,
+        "size": 84,
+        "maxsize": 100,
+        "evictions": 1,
+    }
+
+
+def test_backend_does_not_store_values_exceeding_maxsize(backend):
+    backend.set("key", b"x" * 100, "tag")
+    assert backend.get("key") is None
+    assert backend.size == 0
+
+
+def test_backend_expires_values(backend, mocker):
+    backend.set("key", b"value", "tag")
+    mocker.patch("time.monotonic", return_value=10 ** 9)
+    assert backend.get("key") is None
+    assert backend.size == 0
+
+
+def test_backend_deletes_values_by_tag(backend):
+    backend.set("a", b"value", "tag")
+    backend.set("b", b"value", "tag")
+    backend.set("c", b"value", "other")
+    backend.delete_tag("tag")
+
+    assert [backend.get(key) for key in "abc"] == [None, None, b"value"]
+
+
+def test_cache_returns_cached_response(cache):
+    response = flask.jsonify([1, 2])
+    response.headers["Link"] = '<next>; rel="next"'
+    response.set_etag("etag")
+    cache.add("key", response, "artists", 1)
+
+    cached = cache.get("key")
+    assert cached.get_json() == [1, 2]
+    assert cached.headers["Link"] == '<next>; rel="next"'
+    assert cached.get_etag() == ("etag", False)
+    assert cached.mimetype == "application/json"
+
+
+def test_cache_discards_responses_by_owner(cache):
+    cache.add("a", flask.jsonify([]), "artists", 1)
+    cache.add("b", flask.jsonify([]), "artists", 2)
+    cache.discard("artists", 1)
+
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+
+
+def test_cache_counts_hits_and_misses(cache):
+    cache.add("key", flask.jsonify([]), "artists", 1)
+    cache.get("key")
+    cache.get("other")
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+    assert stats["backend"] == "memory"
+
+
+def test_cache_is_disabled_if_size_is_zero(app):
+    app.config["RESPONSE_CACHE_SIZE"] = 0
+    cache = ResponseCache(app)
+    cache.add("key", flask.jsonify([]), "artists", 1)
+    assert cache.get("key") is None
+    assert cache.stats()["backend"] is None
+
+
+def test_cache_rejects_unknown_backend(app):
+    app.config["RESPONSE_CACHE_BACKEND"] = "memcached"
+    with pytest.raises(ValueError):
+        ResponseCache(app)
@@ -0,0 +1,114 @@
+"""Test compiled serializers."""
+import json
+from types import SimpleNamespace
+
+import marshmallow
+import pytest
+from marshmallow import fields, post_dump
+
+from muckr_api.artist.models import ArtistSchema
+from muckr_api.serializers import CompiledSchema, compile_serializer, get_serializer
+from muckr_api.user.models import UserSchema
+from muckr_api.venue.models import VenueSchema
+from tests.artist.factories import ArtistFactory
+from tests.user.factories import UserFactory
+from tests.venue.factories import VenueFactory
+
+
+def _reference_dump(schema, obj, many=None):
+    return marshmallow.Schema.dump(schema, obj, many=many)
+
+
+def _assert_identical(schema, obj, many=None):
+    expected = _reference_dump(schema, obj, many=many)
+    actual = schema.dump(obj, many=many)
+    assert json.dumps(actual) == json.dumps(expected)
+
+
+@pytest.mark.usefixtures("app")
+@pytest.mark.parametrize(
+    "schema_class, factory",
+    [
+        (ArtistSchema, ArtistFactory),
+        (VenueSchema, VenueFactory),
+        (UserSchema, UserFactory),
+    ],
+)
+class TestModelSchemas:
+    def test_schema_is_compiled(self, schema_class, factory):
+        assert get_serializer(schema_class()) is not None
+
+    def test_dump_is_identical_for_object(self, schema_class, factory):
+        _assert_identical(schema_class(), factory.build(id=1))
+
+    def test_dump_is_identical_for_objects(self, schema_class, factory):
+        objects = [factory.build(id=index) for index in range(10)]
+        _assert_identical(schema_class(many=True), objects)
+        _assert_identical(schema_class(), objects, many=True)
+
+    def test_dump_is_identical_for_missing_id(self, schema_class, factory):
+        _assert_identical(schema_class(), factory.build())
+
+    def test_dump_is_identical_with_only(self, schema_class, factory):
+        _assert_identical(schema_class(only=["id"]), factory.build(id=1))
+
+    def test_dump_is_identical_for_mapping(self, schema_class, factory):
+        obj = _reference_dump(schema_class(), factory.build(id=1))
+        _assert_identical(schema_class(), obj)
+        _assert_identical(schema_class(), [obj], many=True)
+
+
+class Schema(CompiledSchema):
+    number = fields.Integer()
+    text = fields.String(attribute="other")
+    renamed = fields.String(data_key="key")
+    numeric_string = fields.Integer(as_string=True)
+    secret = fields.String(load_only=True)
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        SimpleNamespace(number=1, other="a", renamed="b", numeric_string=2, secret="s"),
+        SimpleNamespace(
+            number="3", other=b"bytes", renamed=4, numeric_string=5.0, secret=None
+        ),
+        SimpleNamespace(number=None, other=None, renamed=None, numeric_string=None),
+        SimpleNamespace(),
+    ],
+)
+def test_dump_is_identical_for_field_options(obj):
+    _assert_identical(Schema(), obj)
+
+
+def test_dump_is_identical_for_generator():
+    objects = (SimpleNamespace(number=number) for number in range(3))
+    assert Schema(many=True).dump(objects) == [{"number": n} for n in range(3)]
+
+
+def test_schema_with_hooks_is_not_compiled():
+    class HookSchema(CompiledSchema):
+        number = fields.Integer()
+
+        @post_dump
+        def double(self, data, **kwargs):
+            return {"number": data["number"] * 2}
+
+    assert compile_serializer(HookSchema()) is None
+    assert HookSchema().dump(SimpleNamespace(number=2)) == {"number": 4}
+
+
+def test_schema_with_unsupported_field_is_not_compiled():
+    class NestedSchema(CompiledSchema):
+        values = fields.List(fields.Integer())
+
+    assert compile_serializer(NestedSchema()) is None
+    assert NestedSchema().dump(SimpleNamespace(values=[1])) == {"values": [1]}
+
+
+def test_schema_with_default_is_not_compiled():
+    class DefaultSchema(CompiledSchema):
+        number = fields.Integer(dump_default=0)
+
+    assert compile_serializer(DefaultSchema()) is None
+    assert DefaultSchema().dump(SimpleNamespace()) == {"number": 0}
@@ -0,0 +1,108 @@
+"""Test common utilities."""
+import flask
+import pytest
+import sqlalchemy
+import sqlalchemy.exc
+import sqlalchemy.orm
+import werkzeug.exceptions
+
+from muckr_api.errors import APIError
+from muckr_api.user.models import User
+from muckr_api.utils import commit_unique, get_owned_or_404, not_modified
+from muckr_api.venue.models import Venue
+
+from tests.user.factories import UserFactory
+from tests.venue.factories import VenueFactory
+
+
+@pytest.fixture
+def venue(database):
+    venue = VenueFactory.create()
+    database.session.commit()
+    flask.g.current_user = venue.user
+    return venue
+
+
+def test_commit_unique_commits_session(database):
+    UserFactory.create(username="john")
+    commit_unique(User.query, {"username": "john"}, ["username"])
+    database.session.rollback()
+    assert User.query.filter_by(username="john").count() == 1
+
+
+def test_commit_unique_reports_taken_keys(database):
+    UserFactory.create(username="john")
+    database.session.commit()
+    UserFactory.create(username="john")
+
+    with pytest.raises(APIError) as error:
+        commit_unique(User.query, {"username": "john"}, ["username", "email"])
+
+    assert error.value.status_code == 400
+    assert list(error.value.payload["details"]) == ["username"]
+
+
+def test_commit_unique_raises_conflict_if_no_key_is_taken(database, mocker):
+    error = sqlalchemy.exc.IntegrityError("INSERT", {}, Exception())
+    mocker.patch.object(database.session, "commit", side_effect=error)
+
+    with pytest.raises(APIError) as error:
+        commit_unique(User.query, {"username": "john"}, ["username"])
+
+    assert error.value.status_code == 409
+
+
+def test_get_owned_or_404_returns_instance_of_current_user(venue):
+    assert get_owned_or_404(Venue, venue.id) is venue
+
+
+def test_get_owned_or_404_fails_for_instance_of_another_user(venue, database):
+    flask.g.current_user = UserFactory.create()
+    database.session.commit()
+
+    with pytest.raises(werkzeug.exceptions.NotFound):
+        get_owned_or_404(Venue, venue.id)
+
+
+def test_get_owned_or_404_returns_any_instance_to_admin(venue, database):
+    flask.g.current_user = UserFactory.create(is_admin=True)
+    database.session.commit()
+
+    assert get_owned_or_404(Venue, venue.id) is venue
+
+
+def test_get_owned_or_404_loads_only_fields(venue, database):
+    id = venue.id
+    database.session.expunge_all()
+    venue = get_owned_or_404(Venue, id, ("name",))
+
+    assert {"city", "country"} <= sqlalchemy.inspect(venue).unloaded
+    assert "version_id" not in sqlalchemy.inspect(venue).unloaded
+
+
+def test_get_owned_or_404_compiles_query_once(venue, mocker):
+    get_owned_or_404(Venue, venue.id, ("name",))
+    compile = mocker.spy(sqlalchemy.orm.Query, "_compile_context")
+    with pytest.raises(werkzeug.exceptions.NotFound):
+        get_owned_or_404(Venue, venue.id + 1, ("name",))
+
+    assert compile.call_count == 0
+
+
+@pytest.mark.parametrize(
+    "if_none_match, etag",
+    [
+        ('"artists-1-1"', ("artists-1-1", False)),
+        ('"artists-1-1.gzip"', ("artists-1-1.gzip", False)),
+        ('W/"artists-1-1"', ("artists-1-1", True)),
+        ("*", ("artists-1-1", False)),
+    ],
+)
+def test_not_modified_returns_matching_etag(app, if_none_match, etag):
+    with app.test_request_context(headers={"If-None-Match": if_none_match}):
+        response = not_modified("artists-1-1")
+        headers = response.get_wsgi_headers(flask.request.environ)
+
+    assert response.get_etag() == etag
+    assert "Content-Type" not in headers
+    assert "Accept-Encoding" in response.vary
@@ -0,0 +1,121 @@
+"""Test collection versions."""
+import pytest
+
+from muckr_api.artist.models import Artist
+from muckr_api.versions import (
+    bump_version,
+    bump_versions,
+    get_collection_etag,
+    get_version,
+)
+
+from tests.artist.factories import ArtistFactory
+from tests.user.factories import UserFactory
+from tests.venue.factories import VenueFactory
+
+
+@pytest.fixture
+def user(database):
+    user = UserFactory.create()
+    database.session.commit()
+    return user
+
+
+def test_new_user_has_initial_versions(user):
+    assert (user.artists_version, user.venues_version) == (0, 0)
+
+
+def test_insert_bumps_version(user, database):
+    ArtistFactory.create(user=user)
+    database.session.commit()
+    assert (user.artists_version, user.venues_version) == (1, 0)
+
+
+def test_update_bumps_version(user, database):
+    venue = VenueFactory.create(user=user)
+    database.session.commit()
+    venue.city = "Paris"
+    database.session.commit()
+    assert user.venues_version == 2
+
+
+def test_delete_bumps_version(user, database):
+    artist = ArtistFactory.create(user=user)
+    database.session.commit()
+    database.session.delete(artist)
+    database.session.commit()
+    assert user.artists_version == 2
+
+
+def test_unmodified_instance_does_not_bump_version(user, database):
+    artist = ArtistFactory.create(user=user)
+    database.session.commit()
+    artist.name = artist.name
+    database.session.commit()
+    assert user.artists_version == 1
+
+
+def test_moving_instance_bumps_both_versions(user, database):
+    artist = ArtistFactory.create(user=user)
+    other = UserFactory.create()
+    database.session.commit()
+    artist.user_id = other.id
+    database.session.commit()
+    assert (user.artists_version, other.artists_version) == (2, 1)
+
+
+def test_version_is_bumped_in_same_transaction(user, database):
+    ArtistFactory.create(user=user)
+    database.session.flush()
+    assert user.artists_version == 1
+    database.session.rollback()
+    assert user.artists_version == 0
+    assert Artist.query.count() == 0
+
+
+def test_bump_versions_increments_each_user(user, database):
+    other = UserFactory.create()
+    database.session.commit()
+    bump_versions("venues", [user.id, other.id])
+    database.session.commit()
+    assert (user.venues_version, other.venues_version) == (1, 1)
+
+
+def test_bump_versions_ignores_empty_list(user, database):
+    bump_versions("venues", [])
+    assert user.venues_version == 0
+
+
+def test_collection_etag_depends_on_version(app, user, database):
+    etag = get_collection_etag(user, "artists")
+    bump_versions("artists", [user.id])
+    assert get_collection_etag(user, "artists") != etag
+
+
+def test_collection_etag_depends_on_arguments(app, user):
+    with app.test_request_context("/artists?page=1"):
+        first = get_collection_etag(user, "artists")
+    with app.test_request_context("/artists?page=2"):
+        second = get_collection_etag(user, "artists")
+    assert first != second
+
+
+def test_new_user_bumps_users_version(user):
+    assert get_version(user, "users") == 1
+
+
+def test_user_update_bumps_users_version(user, database):
+    user.email = "changed@example.com"
+    database.session.commit()
+    assert get_version(user, "users") == 2
+
+
+def test_token_does_not_bump_users_version(user, database):
+    user.get_token()
+    database.session.commit()
+    assert get_version(user, "users") == 1
+
+
+def test_bump_version_increments_version(user, database):
+    bump_version("users")
+    assert get_version(user, "users") == 2
@@ -10,6 +10,9 @@ from muckr_api.user.auth import (
     verify_password,
     verify_token,
 )
+from muckr_api.user.models import User
+from muckr_api.user.tokens import signed_tokens
+from tests.utils import create_token_auth_header
 
 
 @pytest.mark.parametrize(
@@ -25,7 +28,7 @@ def test_verify_password(user, username, password, result):
     if username is None:
         username = user.username
     assert verify_password(username, password) == result
-    if username == user.username:
+    if result:
         assert flask.g.current_user.id == user.id
     else:
         assert "current_user" not in flask.g
@@ -55,3 +58,88 @@ def test_verify_token_fails_with_invalid_token(user, token):
 def test_token_auth_error():
     assert token_auth_error().status_code == 401
     assert "error" in token_auth_error().get_json()
+
+
+def test_verify_token_caches_verified_token(user, mocker):
+    token = user.get_token()
+    assert verify_token(token)
+    check_token = mocker.spy(User, "check_token")
+    assert verify_token(token)
+    assert flask.g.current_user.id == user.id
+    check_token.assert_not_called()
+
+
+def test_verify_token_fails_after_token_is_revoked(user, database):
+    token = user.get_token()
+    assert verify_token(token)
+    user.revoke_token()
+    database.session.commit()
+    assert not verify_token(token)
+
+
+def test_verify_token_fails_after_user_is_deleted(user, client):
+    token = user.get_token()
+    assert verify_token(token)
+    client.delete(
+        "/users/{id}".format(id=user.id), headers=create_token_auth_header(token)
+    )
+    assert not verify_token(token)
+
+
+@pytest.mark.parametrize(
+    "method, url",
+    [
+        ("GET", "/artists"),
+        ("GET", "/users/{id}"),
+        ("POST", "/artists"),
+        ("DELETE", "/tokens"),
+    ],
+)
+def test_request_fails_if_cached_user_was_deleted(user, client, database, method, url):
+    token = user.get_token()
+    database.session.commit()
+    url, headers = url.format(id=user.id), create_token_auth_header(token)
+    assert client.get("/artists", headers=headers).status == "200 OK"
+
+    # Another process deletes the user; this one still has the token cached.
+    database.session.execute(User.__table__.delete())
+    database.session.commit()
+    database.session.expunge_all()
+    response = client.open(url, method=method, headers=headers, json={"name": "a"})
+
+    assert response.status == "401 UNAUTHORIZED"
+
+
+def test_request_fails_if_user_of_signed_token_was_deleted(app, user, client, database):
+    app.config["TOKEN_MODE"] = "signed"
+    headers = create_token_auth_header(signed_tokens.dumps(user))
+    database.session.execute(User.__table__.delete())
+    database.session.commit()
+    database.session.expunge_all()
+    response = client.get("/artists", headers=headers)
+
+    assert response.status == "401 UNAUTHORIZED"
+
+
+def test_set_password_invalidates_cached_tokens(user, database, mocker):
+    token = user.get_token()
+    assert verify_token(token)
+    user.set_password("secret")
+    database.session.commit()
+    check_token = mocker.spy(User, "check_token")
+    assert verify_token(token)
+    check_token.assert_called_once_with(token)
+
+
+def test_verify_token_succeeds_with_signed_token(user, mocker):
+    token = signed_tokens.dumps(user)
+    check_token = mocker.spy(User, "check_token")
+    assert verify_token(token)
+    assert flask.g.current_user.id == user.id
+    check_token.assert_not_called()
+
+
+def test_verify_token_fails_with_revoked_signed_token(user):
+    token = signed_tokens.dumps(user)
+    signed_tokens.revoke(signed_tokens.loads(token))
+    assert not verify_token(token)
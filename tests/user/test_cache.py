@@ -0,0 +1,85 @@
+"""Test token verification cache."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from muckr_api.user.cache import TokenCache
+
+
+@pytest.fixture
+def cache(app):
+    return TokenCache(app)
+
+
+def _expiration(seconds=3600):
+    return datetime.utcnow() + timedelta(seconds=seconds)
+
+
+def test_get_returns_none_for_unknown_token(cache):
+    assert cache.get("token") is None
+    assert cache.misses == 1
+
+
+def test_get_returns_added_entry(cache):
+    cache.add("token", 1, True, _expiration())
+    entry = cache.get("token")
+    assert entry.user_id == 1
+    assert entry.is_admin is True
+    assert cache.hits == 1
+
+
+def test_cache_does_not_store_tokens(cache):
+    cache.add("token", 1, False, _expiration())
+    assert "token" not in cache._entries
+
+
+def test_entry_expires_with_token(cache):
+    cache.add("token", 1, False, _expiration(-1))
+    assert cache.get("token") is None
+    assert len(cache) == 0
+
+
+def test_entry_expires_after_ttl(cache):
+    cache.ttl = -1
+    cache.add("token", 1, False, _expiration())
+    assert cache.get("token") is None
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    cache.maxsize = 2
+    cache.add("token1", 1, False, _expiration())
+    cache.add("token2", 2, False, _expiration())
+    cache.get("token1")
+    cache.add("token3", 3, False, _expiration())
+    assert cache.get("token1") is not None
+    assert cache.get("token2") is None
+    assert cache.get("token3") is not None
+
+
+def test_discard_removes_entry(cache):
+    cache.add("token", 1, False, _expiration())
+    cache.discard("token")
+    assert cache.get("token") is None
+
+
+def test_discard_user_removes_all_entries_of_user(cache):
+    cache.add("token1", 1, False, _expiration())
+    cache.add("token2", 1, False, _expiration())
+    cache.add("token3", 2, False, _expiration())
+    cache.discard_user(1)
+    assert cache.get("token1") is None
+    assert cache.get("token2") is None
+    assert cache.get("token3") is not None
+
+
+def test_cache_is_disabled_with_zero_size(cache):
+    cache.maxsize = 0
+    cache.add("token", 1, False, _expiration())
+    assert cache.get("token") is None
+
+
+def test_stats_counts_hits_and_misses(cache):
+    cache.add("token", 1, False, _expiration())
+    cache.get("token")
+    cache.get("other")
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1, "maxsize": 1024}
@@ -0,0 +1,123 @@
+"""Test deletion of users."""
+import pytest
+
+import muckr_api.commands
+from muckr_api.artist.models import Artist
+from muckr_api.user.deletion import UserDeleter, user_deleter
+from muckr_api.user.models import User
+from muckr_api.venue.models import Venue
+
+from tests.artist.factories import ArtistFactory
+from tests.utils import (
+    create_basic_auth_header,
+    create_token_auth_header,
+    record_statements,
+)
+from tests.venue.factories import VenueFactory
+
+
+def catalogue_deletes(statements):
+    return [
+        statement
+        for statement in statements
+        if statement.startswith(("DELETE FROM artists", "DELETE FROM venues"))
+    ]
+
+
+@pytest.fixture
+def catalogue(user, database):
+    ArtistFactory.create_batch(5, user=user)
+    VenueFactory.create_batch(3, user=user)
+    ArtistFactory.create()
+    database.session.commit()
+
+
+@pytest.fixture
+def batched(app):
+    app.config.update(USER_DELETE_MODE="batched", USER_DELETE_BATCH_SIZE=2)
+    user_deleter.init_app(app)
+    yield user_deleter
+    app.config["USER_DELETE_MODE"] = "cascade"
+    user_deleter.init_app(app)
+
+
+def test_delete_request_cascades_in_one_statement(user, catalogue, client, database):
+    headers = create_token_auth_header(user.get_token())
+    database.session.commit()
+
+    with record_statements(database.engine) as statements:
+        response = client.delete("/users/{}".format(user.id), headers=headers)
+
+    assert response.status == "204 NO CONTENT"
+    assert catalogue_deletes(statements) == []
+    assert (Artist.query.count(), Venue.query.count()) == (1, 0)
+
+
+def test_delete_deletes_in_batches(user, catalogue, database, batched):
+    user_id = user.id
+    with record_statements(database.engine) as statements:
+        batched.delete(user_id)
+
+    assert len(catalogue_deletes(statements)) == 3 + 2
+    assert User.query.filter_by(id=user_id).count() == 0
+    assert (Artist.query.count(), Venue.query.count()) == (1, 0)
+
+
+def test_delete_request_deletes_in_background(user, catalogue, client, batched, mocker):
+    submit = mocker.spy(batched, "submit")
+    user_id = user.id
+    response = client.delete(
+        "/users/{}".format(user_id), headers=create_token_auth_header(user.get_token()),
+    )
+
+    assert response.status == "202 ACCEPTED"
+    submit.spy_return.result()
+    assert User.query.filter_by(id=user_id).count() == 0
+    assert (Artist.query.count(), Venue.query.count()) == (1, 0)
+
+
+def test_delete_request_locks_user_out(user, client, batched, mocker):
+    mocker.patch.object(batched, "submit")
+    username = user.username
+    client.delete(
+        "/users/{}".format(user.id), headers=create_token_auth_header(user.get_token()),
+    )
+
+    response = client.post(
+        "/tokens", headers=create_basic_auth_header(username, "example")
+    )
+    assert response.status == "401 UNAUTHORIZED"
+
+
+def test_delete_request_records_pending_deletion(user, client, batched, mocker):
+    mocker.patch.object(batched, "submit")
+    user_id = user.id
+    client.delete(
+        "/users/{}".format(user_id), headers=create_token_auth_header(user.get_token()),
+    )
+
+    assert batched.pending() == [user_id]
+
+
+def test_delete_users_resumes_pending_deletions(
+    app, user, catalogue, client, batched, mocker
+):
+    mocker.patch.object(batched, "submit")
+    user_id = user.id
+    client.delete(
+        "/users/{}".format(user_id), headers=create_token_auth_header(user.get_token()),
+    )
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(muckr_api.commands.delete_users, catch_exceptions=False)
+
+    assert result.exit_code == 0
+    assert batched.pending() == []
+    assert User.query.filter_by(id=user_id).count() == 0
+    assert (Artist.query.count(), Venue.query.count()) == (1, 0)
+
+
+def test_init_app_rejects_unknown_mode(app):
+    app.config["USER_DELETE_MODE"] = "eventually"
+    with pytest.raises(ValueError):
+        UserDeleter(app)
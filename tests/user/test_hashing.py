@@ -0,0 +1,65 @@
+"""Test password hashing."""
+import sys
+import threading
+
+import pytest
+
+from muckr_api.extensions import bcrypt
+from muckr_api.user.hashing import HasherBusyError, PasswordHasher
+
+
+@pytest.fixture
+def hasher(app):
+    app.config.update(BCRYPT_POOL_SIZE=1, BCRYPT_QUEUE_SIZE=0, BCRYPT_RETRY_AFTER=5)
+    return PasswordHasher(bcrypt, app)
+
+
+def test_hasher_hashes_and_checks_passwords(hasher):
+    password_hash = hasher.generate_password_hash("secret")
+    assert hasher.check_password_hash(password_hash, "secret")
+    assert not hasher.check_password_hash(password_hash, "wrong")
+
+
+def test_hasher_runs_on_calling_thread_without_pool(app):
+    app.config.update(BCRYPT_POOL_SIZE=0)
+    hasher = PasswordHasher(bcrypt, app)
+    assert hasher._run(threading.get_ident) == threading.get_ident()
+
+
+def test_hasher_runs_off_calling_thread(hasher):
+    assert hasher._run(threading.get_ident) != threading.get_ident()
+
+
+def test_hasher_raises_when_queue_is_full(hasher):
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait()
+
+    thread = threading.Thread(target=hasher._run, args=(block,))
+    thread.start()
+    started.wait()
+
+    with pytest.raises(HasherBusyError) as exception:
+        hasher.check_password_hash("hash", "password")
+
+    release.set()
+    thread.join()
+
+    assert exception.value.retry_after == 5
+
+
+def test_hasher_accepts_work_after_queue_drains(hasher):
+    hasher._run(lambda: None)
+    assert hasher._run(lambda: 42) == 42
+
+
+def test_hasher_frees_slot_before_returning(hasher):
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for _ in range(20000):
+            hasher._run(lambda: None)
+    finally:
+        sys.setswitchinterval(interval)
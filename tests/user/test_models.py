@@ -3,7 +3,9 @@ import random
 from datetime import datetime, timedelta
 
 import pytest
+import sqlalchemy.orm
 
+from muckr_api.extensions import token_cache
 from muckr_api.user.models import User
 
 from tests.user.factories import UserFactory
@@ -68,6 +70,67 @@ def test_revoke_token_is_noop_without_token(user):
     assert user.token_expiration is None
 
 
+def test_revoke_token_discards_cached_token_after_commit(user, database):
+    token = user.get_token()
+    database.session.commit()
+    token_cache.add(token, user.id, False, user.token_expiration)
+    user.revoke_token()
+    assert token_cache.get(token) is not None
+
+    database.session.commit()
+    assert token_cache.get(token) is None
+
+
+def test_revoke_token_keeps_cached_token_after_rollback(user, database):
+    token = user.get_token()
+    database.session.commit()
+    token_cache.add(token, user.id, False, user.token_expiration)
+    user.revoke_token()
+    database.session.rollback()
+    database.session.commit()
+
+    assert token_cache.get(token) is not None
+
+
+def test_set_password_discards_cached_tokens_after_commit(user, database):
+    token = user.get_token()
+    database.session.commit()
+    token_cache.add(token, user.id, False, user.token_expiration)
+    user.set_password("changed")
+    assert token_cache.get(token) is not None
+
+    database.session.commit()
+    assert token_cache.get(token) is None
+
+
+def test_tokens_of_concurrent_sessions_do_not_conflict(user, database):
+    session = sqlalchemy.orm.Session(bind=database.engine)
+    try:
+        session.query(User).get(user.id).token = "0" * 64
+        session.commit()
+    finally:
+        session.close()
+
+    user.get_token()
+    database.session.commit()
+
+
+def test_get_by_returns_user_with_value(user):
+    assert User.get_by("username", user.username) is user
+
+
+def test_get_by_returns_none_for_unknown_value(user):
+    assert User.get_by("username", "unknown") is None
+
+
+def test_get_by_compiles_query_once(user, mocker):
+    User.get_by("username", user.username)
+    compile = mocker.spy(sqlalchemy.orm.Query, "_compile_context")
+    User.get_by("username", "unknown")
+
+    assert compile.call_count == 0
+
+
 def test_check_token_returns_user_if_token_is_valid(user):
     token = user.get_token()
     dbuser = User.check_token(token)
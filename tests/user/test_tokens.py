@@ -0,0 +1,70 @@
+"""Test signed access tokens."""
+import pytest
+
+from muckr_api.user.models import RevokedToken
+from muckr_api.user.tokens import SignedTokens, is_signed_token
+
+
+@pytest.fixture
+def signed_tokens(app):
+    return SignedTokens(app)
+
+
+def test_dumps_returns_signed_token(signed_tokens, user):
+    token = signed_tokens.dumps(user)
+    assert is_signed_token(token)
+    assert not is_signed_token(user.get_token())
+
+
+def test_loads_returns_claims(signed_tokens, user):
+    claims = signed_tokens.loads(signed_tokens.dumps(user))
+    assert claims["sub"] == user.id
+    assert claims["adm"] is False
+
+
+def test_loads_rejects_tampered_token(signed_tokens, user):
+    token = signed_tokens.dumps(user)
+    payload, signature = token.rsplit(".", 1)
+    assert signed_tokens.loads(payload + "." + signature[::-1]) is None
+
+
+def test_loads_rejects_token_signed_with_other_key(signed_tokens, user):
+    token = signed_tokens.dumps(user)
+    signed_tokens.secret_key = "other"
+    assert signed_tokens.loads(token) is None
+
+
+def test_loads_rejects_expired_token(signed_tokens, user):
+    assert signed_tokens.loads(signed_tokens.dumps(user, expires_in=-1)) is None
+
+
+def test_revoke_rejects_token(signed_tokens, user, database):
+    token = signed_tokens.dumps(user)
+    signed_tokens.revoke(signed_tokens.loads(token))
+    database.session.commit()
+    assert signed_tokens.loads(token) is None
+    assert RevokedToken.query.count() == 1
+
+
+def test_revoke_does_not_affect_other_tokens(signed_tokens, user):
+    token1, token2 = signed_tokens.dumps(user), signed_tokens.dumps(user)
+    signed_tokens.revoke(signed_tokens.loads(token1))
+    assert signed_tokens.loads(token2) is not None
+
+
+def test_revoke_user_rejects_all_tokens_of_user(signed_tokens, user, admin):
+    token1, token2 = signed_tokens.dumps(user), signed_tokens.dumps(user)
+    token3 = signed_tokens.dumps(admin)
+    signed_tokens.revoke_user(user.id, 3600)
+    assert signed_tokens.loads(token1) is None
+    assert signed_tokens.loads(token2) is None
+    assert signed_tokens.loads(token3) is not None
+
+
+def test_revocations_are_loaded_from_database(app, signed_tokens, user, database):
+    token = signed_tokens.dumps(user)
+    signed_tokens.revoke(signed_tokens.loads(token))
+    database.session.commit()
+
+    other = SignedTokens(app)
+    assert other.loads(token) is None
@@ -1,10 +1,14 @@
 """Test user views."""
 import random
+import threading
 
 import json
 import pytest
 
+from muckr_api.extensions import bcrypt, hasher
+from muckr_api.user.hashing import HasherBusyError
 from muckr_api.user.models import User
+from muckr_api.user.tokens import signed_tokens
 from muckr_api.user.views import user_schema, users_schema
 
 from tests.user.factories import UserFactory
@@ -68,6 +72,38 @@ class TestGetUsers:
         assert response.status == "200 OK"
         assert response.get_json() == users_schema.dump(window)
 
+    def test_get_request_returns_users_sorted_by_username(self, users, admin, client):
+        response = client.get(
+            "/users",
+            query_string={"sort": "-username", "per_page": 100},
+            headers=create_token_auth_header(admin.get_token()),
+        )
+        expected = sorted(users + [admin], key=lambda user: user.username)
+
+        assert response.status == "200 OK"
+        assert response.get_json() == users_schema.dump(expected[::-1])
+
+    def test_get_request_returns_requested_fields(self, users, admin, client):
+        response = client.get(
+            "/users",
+            query_string={"fields": "username"},
+            headers=create_token_auth_header(admin.get_token()),
+        )
+
+        assert response.status == "200 OK"
+        assert response.get_json() == [
+            {"username": user.username} for user in users[:10]
+        ]
+
+    def test_get_request_fails_for_password_field(self, admin, client):
+        response = client.get(
+            "/users",
+            query_string={"fields": "password"},
+            headers=create_token_auth_header(admin.get_token()),
+        )
+
+        assert response.status == "400 BAD REQUEST"
+
     def test_get_request_for_users_fails_without_authentication(self, users, client):
         response = client.get("/users")
         assert response.status == "401 UNAUTHORIZED"
@@ -78,6 +114,33 @@ class TestGetUsers:
         )
         assert response.status == "401 UNAUTHORIZED"
 
+    def test_get_request_reflects_new_users_after_caching(self, admin, client):
+        headers = create_token_auth_header(admin.get_token())
+        client.get("/users", headers=headers)
+        client.post(
+            "/users",
+            data=json.dumps(
+                {"username": "john", "email": "john@example.com", "password": "x"}
+            ),
+            content_type="application/json",
+        )
+
+        response = client.get("/users", headers=headers)
+
+        assert [user["username"] for user in response.get_json()] == [
+            "admin",
+            "john",
+        ]
+
+    def test_get_request_returns_304_if_users_are_unchanged(self, admin, client):
+        headers = create_token_auth_header(admin.get_token())
+        response = client.get("/users", headers=headers)
+        headers["If-None-Match"] = response.headers["ETag"]
+
+        response = client.get("/users", headers=headers)
+
+        assert response.status == "304 NOT MODIFIED"
+
 
 class TestGetUser:
     def test_get_request_returns_user(self, user, client):
@@ -89,6 +152,16 @@ class TestGetUser:
         assert response.status == "200 OK"
         assert response.get_json() == user_schema.dump(user)
 
+    def test_get_request_returns_requested_fields(self, user, client):
+        response = client.get(
+            "/users/{id}".format(id=user.id),
+            query_string={"fields": "id,email"},
+            headers=create_token_auth_header(user.get_token()),
+        )
+
+        assert response.status == "200 OK"
+        assert response.get_json() == {"id": user.id, "email": user.email}
+
     def test_get_request_fails_without_authentication(self, user, client):
         response = client.get("/users/{id}".format(id=user.id))
         assert response.status == "401 UNAUTHORIZED"
@@ -117,6 +190,18 @@ class TestGetUser:
         assert response.status == "404 NOT FOUND"
         assert response.get_json() == {"error": "Not Found"}
 
+    def test_get_request_returns_304_if_etag_matches(self, user, client):
+        headers = create_token_auth_header(user.get_token())
+        response = client.get("/users/{id}".format(id=user.id), headers=headers)
+        etag, _ = response.get_etag()
+
+        headers["If-None-Match"] = '"{}"'.format(etag)
+        response = client.get("/users/{id}".format(id=user.id), headers=headers)
+
+        assert etag == "users-{}-{}".format(user.id, user.version_id)
+        assert response.status == "304 NOT MODIFIED"
+        assert response.data == b""
+
 
 class TestPostUser:
     def test_post_request_creates_user(self, client):
@@ -159,6 +244,23 @@ class TestPostUser:
         assert response.status == "400 BAD REQUEST"
         assert attribute in response.get_json()["details"]
 
+    def test_post_request_reports_all_existing_attributes(self, user, client):
+        data = {"username": user.username, "email": user.email, "password": "x"}
+        response = client.post(
+            "/users", data=json.dumps(data), content_type="application/json"
+        )
+
+        assert response.status == "400 BAD REQUEST"
+        assert response.get_json() == {
+            "error": "Bad Request",
+            "message": "please use a different username",
+            "details": {
+                "username": "please use a different username",
+                "email": "please use a different email",
+            },
+        }
+        assert User.query.count() == 1
+
     @pytest.mark.parametrize(
         "attribute,value", [("username", ""), ("email", ""), ("email", "foo")]
     )
@@ -302,6 +404,49 @@ class TestPutUser:
         assert response.status == "422 UNPROCESSABLE ENTITY"
         assert attribute in response.get_json()["details"]
 
+    def test_put_request_returns_412_if_etag_does_not_match(self, client, user):
+        headers = create_token_auth_header(user.get_token())
+        headers["If-Match"] = '"users-{}-0"'.format(user.id)
+        response = client.put(
+            "/users/{id}".format(id=user.id),
+            data=json.dumps({"username": "john"}),
+            content_type="application/json",
+            headers=headers,
+        )
+
+        assert response.status == "412 PRECONDITION FAILED"
+        assert user.username != "john"
+
+    def test_put_request_succeeds_if_etag_matches(self, client, user, database):
+        headers = create_token_auth_header(user.get_token())
+        database.session.commit()
+        headers["If-Match"] = '"users-{}-{}"'.format(user.id, user.version_id)
+        response = client.put(
+            "/users/{id}".format(id=user.id),
+            data=json.dumps({"username": "john"}),
+            content_type="application/json",
+            headers=headers,
+        )
+
+        assert response.status == "200 OK"
+        assert response.get_etag() == (
+            "users-{}-{}".format(user.id, user.version_id),
+            False,
+        )
+
+    def test_put_request_changes_etag(self, client, user, database):
+        headers = create_token_auth_header(user.get_token())
+        database.session.commit()
+        etag = "users-{}-{}".format(user.id, user.version_id)
+        response = client.put(
+            "/users/{id}".format(id=user.id),
+            data=json.dumps({"password": "secret"}),
+            content_type="application/json",
+            headers=headers,
+        )
+
+        assert response.get_etag()[0] != etag
+
 
 class TestDeleteUser:
     def test_delete_request_removes_user(self, user, client):
@@ -336,6 +481,23 @@ class TestDeleteUser:
         assert response.status == "204 NO CONTENT"
         assert User.query.get(user.id) is None
 
+    def test_delete_request_revokes_signed_tokens(self, user, client):
+        token = signed_tokens.dumps(user)
+        client.delete(
+            "/users/{id}".format(id=user.id), headers=create_token_auth_header(token)
+        )
+
+        response = client.get("/artists", headers=create_token_auth_header(token))
+        assert response.status == "401 UNAUTHORIZED"
+
+    def test_delete_request_returns_412_if_etag_does_not_match(self, client, user):
+        headers = create_token_auth_header(user.get_token())
+        headers["If-Match"] = '"users-{}-0"'.format(user.id)
+        response = client.delete("/users/{id}".format(id=user.id), headers=headers)
+
+        assert response.status == "412 PRECONDITION FAILED"
+        assert User.query.get(user.id) is not None
+
 
 class TestPostToken:
     def test_post_request_creates_valid_token(self, user, client, database):
@@ -363,6 +525,77 @@ class TestPostToken:
         assert "error" in response.get_json()
         assert user.token is None
 
+    def test_post_request_fails_if_password_hasher_is_busy(self, user, client, mocker):
+        mocker.patch(
+            "muckr_api.extensions.hasher.check_password_hash",
+            side_effect=HasherBusyError(1),
+        )
+        response = client.post(
+            "/tokens",
+            data=json.dumps({}),
+            content_type="application/json",
+            headers=create_basic_auth_header(user.username, "example"),
+        )
+
+        assert response.status == "503 SERVICE UNAVAILABLE"
+        assert response.headers["Retry-After"] == "1"
+
+    def test_post_request_fails_while_other_requests_use_password_hasher(
+        self, app, user, client, mocker
+    ):
+        app.config.update(BCRYPT_POOL_SIZE=1, BCRYPT_QUEUE_SIZE=0)
+        hasher.init_app(app)
+        started, release = threading.Event(), threading.Event()
+        check_password_hash = bcrypt.check_password_hash
+
+        def block(*args):
+            started.set()
+            release.wait()
+            return check_password_hash(*args)
+
+        mocker.patch.object(bcrypt, "check_password_hash", side_effect=block)
+        headers = create_basic_auth_header(user.username, "example")
+        responses = []
+
+        def post():
+            responses.append(client.post("/tokens", headers=headers))
+
+        thread = threading.Thread(target=post)
+        thread.start()
+        started.wait()
+        try:
+            post()
+        finally:
+            release.set()
+            thread.join()
+
+        busy, created = responses
+        assert busy.status == "503 SERVICE UNAVAILABLE"
+        assert busy.headers["Retry-After"] == "1"
+        assert created.status == "201 CREATED"
+
+    def test_post_request_keeps_etag_of_user(self, client, user, database):
+        version_id = user.version_id
+        client.post(
+            "/tokens", headers=create_basic_auth_header(user.username, "example")
+        )
+        database.session.refresh(user)
+
+        assert user.version_id == version_id
+
+    def test_post_request_creates_signed_token(self, app, user, client):
+        app.config["TOKEN_MODE"] = "signed"
+        response = client.post(
+            "/tokens",
+            data=json.dumps({}),
+            content_type="application/json",
+            headers=create_basic_auth_header(user.username, "example"),
+        )
+
+        assert response.status == "201 CREATED"
+        assert signed_tokens.loads(response.get_json()["token"])["sub"] == user.id
+        assert user.token is None
+
 
 class TestDeleteToken:
     def test_delete_request_expires_token(self, user, client):
@@ -390,3 +623,10 @@ class TestDeleteToken:
 
         assert response.status == "401 UNAUTHORIZED"
         assert user.check_token(user.token) is not None
+
+    def test_delete_request_revokes_signed_token(self, user, client):
+        token = signed_tokens.dumps(user)
+        response = client.delete("/tokens", headers=create_token_auth_header(token))
+
+        assert response.status == "204 NO CONTENT"
+        assert signed_tokens.loads(token) is None
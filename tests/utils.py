@@ -1,4 +1,7 @@
 import base64
+import contextlib
+
+import sqlalchemy
 
 
 def create_basic_auth_header(username, password):
@@ -13,3 +16,48 @@ def create_basic_auth_header(username, password):
 
 def create_token_auth_header(token):
     return {"Authorization": "Bearer {token}".format(token=token)}
+
+
+@contextlib.contextmanager
+def record_statements(engine):
+    """Record the SQL statements executed on the engine."""
+    statements = []
+
+    def before_cursor_execute(connection, cursor, statement, *args):
+        statements.append(statement)
+
+    sqlalchemy.event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        sqlalchemy.event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@contextlib.contextmanager
+def assert_statement_count(engine, count):
+    """Assert that the block executes exactly ``count`` SQL statements."""
+    with record_statements(engine) as statements:
+        yield statements
+
+    assert len(statements) == count, "executed {} statements:\n{}".format(
+        len(statements), "\n".join(statements)
+    )
+
+
+@contextlib.contextmanager
+def record_query_plans(engine):
+    """Record the SQLite query plans of the SELECT statements on the engine."""
+    plans = []
+
+    def before_cursor_execute(connection, cursor, statement, parameters, *args):
+        if statement.startswith("SELECT"):
+            rows = connection.connection.execute(
+                "EXPLAIN QUERY PLAN " + statement, parameters
+            )
+            plans.append("\n".join(row[-1] for row in rows))
+
+    sqlalchemy.event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield plans
+    finally:
+        sqlalchemy.event.remove(engine, "before_cursor_execute", before_cursor_execute)
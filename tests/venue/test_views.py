@@ -2,11 +2,16 @@
 import json
 import pytest
 
-from muckr_api.venue.models import Venue
+from muckr_api.venue.models import Venue, VenueSchema
 from muckr_api.venue.views import venue_schema, venues_schema
 
 from tests.venue.factories import VenueFactory
-from tests.utils import create_token_auth_header
+from tests.utils import (
+    assert_statement_count,
+    create_token_auth_header,
+    record_query_plans,
+    record_statements,
+)
 
 
 class TestGetVenues:
@@ -68,10 +73,368 @@ class TestGetVenues:
         assert response.status == "200 OK"
         assert response.get_json() == venues_schema.dump(window)
 
+    def test_get_request_returns_next_page_of_venues_by_cursor(
+        self, client, user, database
+    ):
+        venues = VenueFactory.create_batch(5, user=user)
+        database.session.commit()
+        headers = create_token_auth_header(user.get_token())
+
+        response = client.get(
+            "/venues",
+            query_string={"cursor": "", "per_page": 3, "sort": "-name"},
+            headers=headers,
+        )
+        link = response.headers["Link"]
+        response = client.get(link[1 : link.index(">")], headers=headers)
+
+        assert response.status == "200 OK"
+        assert "Link" not in response.headers
+        assert response.get_json() == venues_schema.dump(venues[::-1][3:])
+
+    def test_get_request_returns_requested_fields(self, client, user, database):
+        venues = VenueFactory.create_batch(3, user=user)
+        database.session.commit()
+
+        with record_statements(database.engine) as statements:
+            response = client.get(
+                "/venues",
+                query_string={"fields": "id,name"},
+                headers=create_token_auth_header(user.get_token()),
+            )
+
+        assert response.status == "200 OK"
+        assert response.get_json() == [
+            {"id": venue.id, "name": venue.name} for venue in venues
+        ]
+        (select,) = [s for s in statements if "FROM venues" in s]
+        assert "venues.name" in select
+        assert "venues.city" not in select
+        assert "venues.country" not in select
+
+    @pytest.mark.parametrize("fields", ["", "id,", "id,user_id", "password"])
+    def test_get_request_fails_with_unknown_fields(self, client, user, fields):
+        response = client.get(
+            "/venues",
+            query_string={"fields": fields},
+            headers=create_token_auth_header(user.get_token()),
+        )
+
+        assert response.status == "400 BAD REQUEST"
+        assert "fields" in response.get_json()["details"]
+
     def test_get_request_for_venues_fails_without_authentication(self, client):
         response = client.get("/venues")
         assert response.status == "401 UNAUTHORIZED"
 
+    def test_get_request_returns_304_if_collection_is_unchanged(
+        self, client, user, database
+    ):
+        VenueFactory.create_batch(3, user=user)
+        database.session.commit()
+        headers = create_token_auth_header(user.get_token())
+        response = client.get("/venues", headers=headers)
+        headers["If-None-Match"] = response.headers["ETag"]
+
+        with record_statements(database.engine) as statements:
+            response = client.get("/venues", headers=headers)
+
+        assert response.status == "304 NOT MODIFIED"
+        assert response.data == b""
+        assert not any("FROM venues" in statement for statement in statements)
+
+    def test_get_request_returns_200_after_collection_changes(
+        self, client, user, database
+    ):
+        VenueFactory.create(user=user)
+        database.session.commit()
+        headers = create_token_auth_header(user.get_token())
+        response = client.get("/venues", headers=headers)
+        etag = response.headers["ETag"]
+        VenueFactory.create(user=user)
+        database.session.commit()
+
+        headers["If-None-Match"] = etag
+        response = client.get("/venues", headers=headers)
+
+        assert response.status == "200 OK"
+        assert len(response.get_json()) == 2
+        assert response.headers["ETag"] != etag
+
+    def test_get_request_returns_distinct_etag_per_page(self, client, user):
+        headers = create_token_auth_header(user.get_token())
+        first = client.get("/venues", query_string={"page": 1}, headers=headers)
+        second = client.get("/venues", query_string={"page": 2}, headers=headers)
+
+        assert first.headers["ETag"] != second.headers["ETag"]
+
+    def test_get_request_is_served_from_cache(self, client, user, database):
+        VenueFactory.create_batch(3, user=user)
+        database.session.commit()
+        headers = create_token_auth_header(user.get_token())
+        expected = client.get("/venues", headers=headers).get_json()
+
+        with record_statements(database.engine) as statements:
+            response = client.get("/venues", headers=headers)
+
+        assert response.status == "200 OK"
+        assert response.get_json() == expected
+        assert not any("FROM venues" in statement for statement in statements)
+
+    def test_get_request_reflects_writes_after_caching(self, client, user, database):
+        headers = create_token_auth_header(user.get_token())
+        client.get("/venues", headers=headers)
+        VenueFactory.create(user=user)
+        database.session.commit()
+
+        response = client.get("/venues", headers=headers)
+
+        assert len(response.get_json()) == 1
+
+
+class TestSearchVenues:
+    def search(self, client, user, query):
+        response = client.get(
+            "/venues?" + query, headers=create_token_auth_header(user.get_token())
+        )
+        assert response.status == "200 OK"
+        return [item["name"] for item in response.get_json()]
+
+    @pytest.fixture
+    def venues(self, user, database):
+        names = ["Abba", "Black Sabbath", "Cabaret", "The Cab", "100% Pure"]
+        venues = [VenueFactory.create(user=user, name=name) for name in names]
+        VenueFactory.create(name="Sabbath")
+        database.session.commit()
+        return venues
+
+    def test_get_request_finds_names_containing_query(self, client, user, venues):
+        names = self.search(client, user, "q=abb&sort=name")
+        assert names == ["Abba", "Black Sabbath"]
+
+    def test_get_request_finds_names_starting_with_query(self, client, user, venues):
+        names = self.search(client, user, "q=CAB&match=prefix&sort=name")
+        assert names == ["Cabaret"]
+
+    def test_get_request_matches_wildcards_literally(self, client, user, venues):
+        assert self.search(client, user, "q=0%25") == ["100% Pure"]
+        assert self.search(client, user, "q=_") == []
+
+    def test_get_request_paginates_results(self, client, user, venues):
+        query = "q=ab&sort=name&per_page=2&with_total=1"
+        response = client.get(
+            "/venues?" + query, headers=create_token_auth_header(user.get_token())
+        )
+
+        assert [item["name"] for item in response.get_json()] == [
+            "Abba",
+            "Black Sabbath",
+        ]
+        assert response.headers["X-Total-Count"] == "4"
+        assert "Link" in response.headers
+
+    def test_get_request_fails_if_match_is_invalid(self, client, user):
+        response = client.get(
+            "/venues?q=a&match=suffix",
+            headers=create_token_auth_header(user.get_token()),
+        )
+
+        assert response.status == "400 BAD REQUEST"
+        assert "match" in response.get_json()["details"]
+
+
+class TestGetVenuesByLocation:
+    def get(self, client, user, query):
+        response = client.get(
+            "/venues?" + query, headers=create_token_auth_header(user.get_token())
+        )
+        assert response.status == "200 OK"
+        return [item["name"] for item in response.get_json()]
+
+    @pytest.fixture
+    def venues(self, user, database):
+        locations = [
+            ("a", "Berlin", "Germany"),
+            ("b", "Paris", "France"),
+            ("c", "Hamburg", "Germany"),
+            ("d", "Berlin", "Germany"),
+            ("e", "Berlin", "USA"),
+        ]
+        venues = [
+            VenueFactory.create(user=user, name=name, city=city, country=country)
+            for name, city, country in locations
+        ]
+        VenueFactory.create(city="Berlin", country="Germany")
+        database.session.commit()
+        return venues
+
+    def test_get_request_filters_by_country(self, client, user, venues):
+        assert self.get(client, user, "country=Germany") == ["a", "c", "d"]
+
+    def test_get_request_filters_by_city(self, client, user, venues):
+        assert self.get(client, user, "city=Berlin") == ["a", "d", "e"]
+
+    def test_get_request_filters_by_country_and_city(self, client, user, venues):
+        names = self.get(client, user, "country=Germany&city=Berlin&sort=-name")
+        assert names == ["d", "a"]
+
+    def test_get_request_combines_location_with_search(self, client, user, venues):
+        names = self.get(client, user, "country=Germany&q=c")
+        assert names == ["c"]
+
+    @pytest.fixture
+    def catalogue(self, user, database):
+        # Venues spread over many countries and cities, as the statistics
+        # of a real catalogue would show.
+        rows = [
+            {
+                "name": "venue{}".format(n),
+                "city": "city{}".format(n % 100),
+                "country": "country{}".format(n % 50),
+                "user_id": user.id,
+            }
+            for n in range(500)
+        ]
+        database.session.execute(Venue.__table__.insert(), rows)
+        database.session.execute("ANALYZE")
+        database.session.commit()
+
+    @pytest.mark.parametrize(
+        "query", ["country=country1", "country=country1&city=city1"]
+    )
+    def test_get_request_uses_location_index(
+        self, client, user, database, catalogue, query
+    ):
+        token = user.get_token()
+        database.session.commit()
+
+        with record_query_plans(database.engine) as plans:
+            response = client.get(
+                "/venues?" + query, headers=create_token_auth_header(token)
+            )
+
+        assert response.get_json()
+        plan = next(plan for plan in plans if "venues" in plan)
+        assert "USING INDEX ix_venues_user_id_country_city" in plan
+        assert "SCAN" not in plan
+
+    def test_get_request_by_country_and_city_needs_no_sort(
+        self, client, user, database, catalogue
+    ):
+        token = user.get_token()
+        database.session.commit()
+
+        with record_query_plans(database.engine) as plans:
+            client.get(
+                "/venues?country=country1&city=city1",
+                headers=create_token_auth_header(token),
+            )
+
+        plan = next(plan for plan in plans if "venues" in plan)
+        assert "TEMP B-TREE" not in plan
+
+
+class TestGetVenuesById:
+    def get(self, client, user, ids, query=""):
+        url = "/venues?ids={}{}".format(",".join(map(str, ids)), query)
+        return client.get(url, headers=create_token_auth_header(user.get_token()))
+
+    def test_get_request_returns_venues_in_requested_order(
+        self, client, user, database
+    ):
+        venues = VenueFactory.create_batch(3, user=user)
+        database.session.commit()
+        ids = [venues[2].id, venues[0].id]
+        response = self.get(client, user, ids)
+
+        assert response.status == "200 OK"
+        assert response.get_json() == {
+            "items": venues_schema.dump([venues[2], venues[0]]),
+            "missing": [],
+        }
+
+    def test_get_request_reports_missing_ids(self, client, user, database):
+        venue = VenueFactory.create(user=user)
+        other = VenueFactory.create()
+        database.session.commit()
+        ids = [other.id, venue.id, 1000]
+        response = self.get(client, user, ids)
+
+        assert response.get_json() == {
+            "items": venues_schema.dump([venue]),
+            "missing": [other.id, 1000],
+        }
+
+    def test_get_request_uses_one_query(self, client, user, database):
+        venues = VenueFactory.create_batch(5, user=user)
+        token = user.get_token()
+        database.session.commit()
+        url = "/venues?ids={}".format(",".join(str(venue.id) for venue in venues))
+
+        # Authenticate, select the venues.
+        with assert_statement_count(database.engine, 2):
+            client.get(url, headers=create_token_auth_header(token))
+
+    def test_get_request_returns_selected_fields(self, client, user, database):
+        venue = VenueFactory.create(user=user)
+        database.session.commit()
+        response = self.get(client, user, [venue.id], "&fields=name")
+
+        assert response.get_json()["items"] == [{"name": venue.name}]
+
+    def test_get_request_returns_304_if_etag_matches(self, client, user, database):
+        venue = VenueFactory.create(user=user)
+        database.session.commit()
+        etag = self.get(client, user, [venue.id]).headers["ETag"]
+        response = client.get(
+            "/venues?ids={}".format(venue.id),
+            headers={
+                **create_token_auth_header(user.get_token()),
+                "If-None-Match": etag,
+            },
+        )
+
+        assert response.status == "304 NOT MODIFIED"
+
+    def test_get_request_fails_if_ids_are_invalid(self, client, user):
+        response = client.get(
+            "/venues?ids=a", headers=create_token_auth_header(user.get_token())
+        )
+        assert response.status == "400 BAD REQUEST"
+
+    def test_get_request_fails_if_too_many_ids(self, app, client, user):
+        app.config["BULK_MAX_ITEMS"] = 2
+        response = self.get(client, user, [1, 2, 3])
+        assert response.status == "413 REQUEST ENTITY TOO LARGE"
+
+
+class TestExportVenues:
+    def test_get_request_streams_venues_as_ndjson(self, client, user, database):
+        venues = VenueFactory.create_batch(25, user=user)
+        VenueFactory.create_batch(5)
+        database.session.commit()
+        response = client.get(
+            "/venues/export", headers=create_token_auth_header(user.get_token())
+        )
+
+        assert response.status == "200 OK"
+        assert response.mimetype == "application/x-ndjson"
+        assert response.is_streamed
+        lines = response.get_data(as_text=True).splitlines()
+        assert [json.loads(line) for line in lines] == venues_schema.dump(venues)
+
+    def test_get_request_returns_empty_body_without_venues(self, client, user):
+        response = client.get(
+            "/venues/export", headers=create_token_auth_header(user.get_token())
+        )
+
+        assert response.status == "200 OK"
+        assert response.data == b""
+
+    def test_get_request_fails_without_authentication(self, client):
+        response = client.get("/venues/export")
+        assert response.status == "401 UNAUTHORIZED"
+
 
 class TestGetVenue:
     def test_get_request_returns_venue(self, venue, client):
@@ -83,6 +446,26 @@ class TestGetVenue:
         assert response.status == "200 OK"
         assert response.get_json() == venue_schema.dump(venue)
 
+    def test_get_request_returns_requested_fields(self, venue, client):
+        response = client.get(
+            "/venues/{id}".format(id=venue.id),
+            query_string={"fields": "city,country"},
+            headers=create_token_auth_header(venue.user.get_token()),
+        )
+
+        assert response.status == "200 OK"
+        assert response.get_json() == {"city": venue.city, "country": venue.country}
+
+    def test_get_request_fails_with_unknown_fields(self, venue, client):
+        response = client.get(
+            "/venues/{id}".format(id=venue.id),
+            query_string={"fields": "id,address"},
+            headers=create_token_auth_header(venue.user.get_token()),
+        )
+
+        assert response.status == "400 BAD REQUEST"
+        assert "fields" in response.get_json()["details"]
+
     def test_get_request_fails_without_authentication(self, venue, client):
         response = client.get("/venues/{id}".format(id=venue.id))
         assert response.status == "401 UNAUTHORIZED"
@@ -117,6 +500,71 @@ class TestGetVenue:
         assert response.status == "200 OK"
         assert response.get_json() == venue_schema.dump(venue)
 
+    def test_get_request_returns_etag(self, venue, client):
+        response = client.get(
+            "/venues/{id}".format(id=venue.id),
+            headers=create_token_auth_header(venue.user.get_token()),
+        )
+
+        assert response.get_etag() == ("venues-{}-1".format(venue.id), False)
+
+    def test_get_request_returns_304_if_etag_matches(self, venue, client, mocker):
+        dump = mocker.patch.object(VenueSchema, "dump")
+        headers = create_token_auth_header(venue.user.get_token())
+        headers["If-None-Match"] = '"venues-{}-1"'.format(venue.id)
+        response = client.get("/venues/{id}".format(id=venue.id), headers=headers)
+
+        assert response.status == "304 NOT MODIFIED"
+        assert response.data == b""
+        assert response.get_etag() == ("venues-{}-1".format(venue.id), False)
+        dump.assert_not_called()
+
+    def test_get_request_returns_304_if_compressed_etag_matches(self, venue, client):
+        headers = create_token_auth_header(venue.user.get_token())
+        headers["If-None-Match"] = '"venues-{}-1.gzip"'.format(venue.id)
+        response = client.get("/venues/{id}".format(id=venue.id), headers=headers)
+
+        assert response.status == "304 NOT MODIFIED"
+        assert response.get_etag() == ("venues-{}-1.gzip".format(venue.id), False)
+        assert "Accept-Encoding" in response.vary
+
+    def test_get_request_returns_venue_if_etag_is_outdated(
+        self, venue, client, database
+    ):
+        venue.name = "changed"
+        database.session.commit()
+        headers = create_token_auth_header(venue.user.get_token())
+        headers["If-None-Match"] = '"venues-{}-1"'.format(venue.id)
+        response = client.get("/venues/{id}".format(id=venue.id), headers=headers)
+
+        assert response.status == "200 OK"
+        assert response.get_json()["name"] == "changed"
+        assert response.get_etag() == ("venues-{}-2".format(venue.id), False)
+
+    def test_get_request_returns_distinct_etag_for_fields(self, venue, client):
+        response = client.get(
+            "/venues/{id}".format(id=venue.id),
+            query_string={"fields": "name"},
+            headers=create_token_auth_header(venue.user.get_token()),
+        )
+
+        etag, weak = response.get_etag()
+        assert etag.startswith("venues-{}-1.".format(venue.id))
+
+    @pytest.mark.parametrize("owner", [True, False])
+    def test_get_request_executes_two_statements(
+        self, venue, admin, client, database, owner
+    ):
+        token = venue.user.get_token() if owner else admin.get_token()
+        url = "/venues/{id}".format(id=venue.id)
+        database.session.commit()
+
+        # One statement authenticates the user, one loads the venue.
+        with assert_statement_count(database.engine, 2):
+            response = client.get(url, headers=create_token_auth_header(token),)
+
+        assert response.status == "200 OK"
+
 
 class TestPostVenue:
     def test_post_request_creates_venue(self, client, user):
@@ -180,6 +628,382 @@ class TestPostVenue:
         assert "name" in response.get_json()["details"]
 
 
+class TestPostVenuesBulk:
+    def items(self, *names):
+        items = [venue_schema.dump(VenueFactory.build(name=name)) for name in names]
+        for item in items:
+            del item["id"]
+        return items
+
+    def post(self, client, user, items):
+        return client.post(
+            "/venues/bulk",
+            data=json.dumps(items),
+            content_type="application/json",
+            headers=create_token_auth_header(user.get_token()),
+        )
+
+    def test_post_request_creates_venues(self, client, user):
+        items = self.items("b", "a", "c")
+        response = self.post(client, user, items)
+
+        assert response.status == "201 CREATED"
+        created = response.get_json()
+        assert [{**item, "id": None} for item in created] == [
+            {**item, "id": None} for item in items
+        ]
+        venues = Venue.query.order_by(Venue.id).all()
+        assert venues_schema.dump(venues) == sorted(
+            created, key=lambda item: item["id"]
+        )
+        assert all(venue.user_id == user.id for venue in venues)
+
+    def test_post_request_inserts_in_one_statement(self, client, user, database):
+        token = user.get_token()
+        database.session.commit()
+        items = self.items(*"abcde")
+
+        # Authenticate, check names, insert, read back, bump the version.
+        with assert_statement_count(database.engine, 5) as statements:
+            client.post(
+                "/venues/bulk",
+                data=json.dumps(items),
+                content_type="application/json",
+                headers=create_token_auth_header(token),
+            )
+
+        assert sum(statement.startswith("INSERT") for statement in statements) == 1
+
+    def test_post_request_updates_list(self, client, user):
+        self.post(client, user, self.items("a", "b"))
+        response = client.get(
+            "/venues", headers=create_token_auth_header(user.get_token())
+        )
+
+        assert [item["name"] for item in response.get_json()] == ["a", "b"]
+
+    def test_post_request_accepts_empty_list(self, client, user):
+        response = self.post(client, user, [])
+
+        assert response.status == "201 CREATED"
+        assert response.get_json() == []
+
+    def test_post_request_reports_invalid_items_by_index(self, client, user):
+        items = self.items("a", "b")
+        items[1]["name"] = ""
+        response = self.post(client, user, items)
+
+        assert response.status == "422 UNPROCESSABLE ENTITY"
+        assert list(response.get_json()["details"]) == ["1"]
+        assert Venue.query.count() == 0
+
+    def test_post_request_fails_if_body_is_not_a_list(self, client, user):
+        response = self.post(client, user, self.items("a")[0])
+        assert response.status == "422 UNPROCESSABLE ENTITY"
+
+    def test_post_request_reports_repeated_names_by_index(self, client, user):
+        response = self.post(client, user, self.items("a", "b", "a"))
+
+        assert response.status == "400 BAD REQUEST"
+        assert response.get_json()["details"] == {
+            "2": {"name": "please use a different name"}
+        }
+        assert Venue.query.count() == 0
+
+    def test_post_request_reports_existing_names_by_index(self, client, user, database):
+        VenueFactory.create(user=user, name="b")
+        VenueFactory.create(name="a")
+        database.session.commit()
+        response = self.post(client, user, self.items("a", "b"))
+
+        assert response.status == "400 BAD REQUEST"
+        assert list(response.get_json()["details"]) == ["1"]
+
+    def test_post_request_fails_if_too_many_items(self, app, client, user):
+        app.config["BULK_MAX_ITEMS"] = 2
+        response = self.post(client, user, self.items("a", "b", "c"))
+
+        assert response.status == "413 REQUEST ENTITY TOO LARGE"
+        assert Venue.query.count() == 0
+
+    def test_post_request_fails_without_authentication(self, client):
+        response = client.post(
+            "/venues/bulk", data="[]", content_type="application/json"
+        )
+        assert response.status == "401 UNAUTHORIZED"
+
+
+class TestPutVenues:
+    def put(self, client, user, items):
+        return client.put(
+            "/venues",
+            data=json.dumps(items),
+            content_type="application/json",
+            headers=create_token_auth_header(user.get_token()),
+        )
+
+    def items(self, user):
+        venues = Venue.query.filter_by(user=user).order_by(Venue.name)
+        return [
+            {key: value for key, value in item.items() if key != "id"}
+            for item in venues_schema.dump(venues)
+        ]
+
+    def test_put_request_synchronizes_venues(self, client, user, database):
+        for name in ("a", "b", "c"):
+            VenueFactory.create(user=user, name=name, city="x", country="y")
+        database.session.commit()
+        items = [
+            {"name": "b", "city": "x", "country": "y"},
+            {"name": "c", "city": "z", "country": "y"},
+            {"name": "d", "city": "x", "country": "y"},
+        ]
+        response = self.put(client, user, items)
+
+        assert response.status == "200 OK"
+        assert response.get_json() == {
+            "created": 1,
+            "updated": 1,
+            "deleted": 1,
+            "unchanged": 1,
+        }
+        assert self.items(user) == items
+
+    def test_put_request_changes_etag_of_updated_venue(self, client, user, database):
+        venue = VenueFactory.create(user=user, name="a", city="x", country="y")
+        database.session.commit()
+        url = "/venues/{}".format(venue.id)
+        headers = create_token_auth_header(user.get_token())
+        etag = client.get(url, headers=headers).headers["ETag"]
+        self.put(client, user, [{"name": "a", "city": "z", "country": "y"}])
+
+        assert client.get(url, headers=headers).headers["ETag"] != etag
+
+    def test_put_request_does_not_change_venues_of_other_users(
+        self, client, user, database
+    ):
+        other = VenueFactory.create(name="a", city="x", country="y")
+        database.session.commit()
+        self.put(client, user, [{"name": "a", "city": "z", "country": "y"}])
+
+        assert Venue.query.count() == 2
+        assert Venue.query.get(other.id).city == "x"
+
+    def test_put_request_reports_invalid_items_by_index(self, client, user):
+        items = [{"name": "a", "city": "x", "country": "y"}, {"name": "b"}]
+        response = self.put(client, user, items)
+
+        assert response.status == "422 UNPROCESSABLE ENTITY"
+        assert list(response.get_json()["details"]) == ["1"]
+
+    def test_put_request_fails_without_authentication(self, client):
+        response = client.put("/venues", data="[]", content_type="application/json")
+        assert response.status == "401 UNAUTHORIZED"
+
+
+class TestPatchVenues:
+    def patch(self, client, user, items):
+        return client.patch(
+            "/venues",
+            data=json.dumps(items),
+            content_type="application/json",
+            headers=create_token_auth_header(user.get_token()),
+        )
+
+    def test_patch_request_modifies_venues(self, client, user, database):
+        venues = VenueFactory.create_batch(3, user=user)
+        database.session.commit()
+        ids = [venue.id for venue in venues]
+        items = [{"id": ids[2], "name": "c"}, {"id": ids[0], "city": "a"}]
+        response = self.patch(client, user, items)
+
+        assert response.status == "200 OK"
+        assert response.get_json() == [
+            {**venue_schema.dump(venues[2]), "name": "c"},
+            {**venue_schema.dump(venues[0]), "city": "a"},
+        ]
+        changed = venues_schema.dump(Venue.query.order_by(Venue.id))
+        assert changed == [
+            {**venue_schema.dump(venues[0]), "city": "a"},
+            venue_schema.dump(venues[1]),
+            {**venue_schema.dump(venues[2]), "name": "c"},
+        ]
+
+    def test_patch_request_updates_in_one_statement(self, client, user, database):
+        venues = VenueFactory.create_batch(5, user=user)
+        token = user.get_token()
+        database.session.commit()
+        items = [{"id": venue.id, "name": str(venue.id)} for venue in venues]
+
+        # Authenticate, check names, update, read back, bump the version.
+        with assert_statement_count(database.engine, 5) as statements:
+            client.patch(
+                "/venues",
+                data=json.dumps(items),
+                content_type="application/json",
+                headers=create_token_auth_header(token),
+            )
+
+        assert (
+            sum(statement.startswith("UPDATE venues") for statement in statements) == 1
+        )
+
+    def test_patch_request_changes_etags(self, client, user, database):
+        venue = VenueFactory.create(user=user)
+        database.session.commit()
+        url = "/venues/{}".format(venue.id)
+        headers = create_token_auth_header(user.get_token())
+        etag = client.get(url, headers=headers).headers["ETag"]
+        self.patch(client, user, [{"id": venue.id, "name": "a"}])
+
+        assert client.get(url, headers=headers).headers["ETag"] != etag
+
+    def test_patch_request_updates_list(self, client, user, database):
+        venue = VenueFactory.create(user=user)
+        database.session.commit()
+        headers = create_token_auth_header(user.get_token())
+        client.get("/venues", headers=headers)
+        self.patch(client, user, [{"id": venue.id, "name": "a"}])
+        response = client.get("/venues", headers=headers)
+
+        assert [item["name"] for item in response.get_json()] == ["a"]
+
+    def test_patch_request_returns_404_for_venue_of_another_user(
+        self, client, user, database
+    ):
+        venue = VenueFactory.create(user=user)
+        other = VenueFactory.create()
+        database.session.commit()
+        items = [{"id": venue.id, "name": "a"}, {"id": other.id, "name": "b"}]
+        response = self.patch(client, user, items)
+
+        assert response.status == "404 NOT FOUND"
+        assert response.get_json()["details"] == {"1": {"id": "not found"}}
+        assert Venue.query.get(venue.id).name != "a"
+        assert Venue.query.get(other.id).name != "b"
+
+    def test_patch_request_reports_invalid_items_by_index(self, client, user):
+        items = [{"id": 1, "name": "a"}, {"city": ""}]
+        response = self.patch(client, user, items)
+
+        assert response.status == "422 UNPROCESSABLE ENTITY"
+        assert set(response.get_json()["details"]["1"]) == {"id", "city"}
+
+    def test_patch_request_reports_repeated_ids_by_index(self, client, user):
+        items = [{"id": 1, "name": "a"}, {"id": 1, "name": "b"}]
+        response = self.patch(client, user, items)
+
+        assert response.status == "400 BAD REQUEST"
+        assert list(response.get_json()["details"]) == ["1"]
+
+    def test_patch_request_reports_existing_names_by_index(
+        self, client, user, database
+    ):
+        venues = [VenueFactory.create(user=user, name=name) for name in ("a", "b", "c")]
+        database.session.commit()
+        items = [
+            {"id": venues[0].id, "name": "b"},
+            {"id": venues[2].id, "name": "c"},
+        ]
+        response = self.patch(client, user, items)
+
+        assert response.status == "400 BAD REQUEST"
+        assert list(response.get_json()["details"]) == ["0"]
+
+    def test_patch_request_allows_name_of_renamed_venue(self, client, user, database):
+        venues = [VenueFactory.create(user=user, name=name) for name in ("a", "b")]
+        database.session.commit()
+        items = [
+            {"id": venues[0].id, "name": "c"},
+            {"id": venues[1].id, "name": "a"},
+        ]
+        response = self.patch(client, user, items)
+
+        assert response.status == "200 OK"
+
+    def test_patch_request_reports_swapped_names_by_index(self, client, user, database):
+        venues = [VenueFactory.create(user=user, name=name) for name in ("a", "b", "c")]
+        database.session.commit()
+        items = [
+            {"id": venues[0].id, "name": "b"},
+            {"id": venues[2].id, "name": "d"},
+            {"id": venues[1].id, "name": "a"},
+        ]
+        response = self.patch(client, user, items)
+
+        # SQLite cannot defer the unique constraint, unlike PostgreSQL.
+        assert response.status == "400 BAD REQUEST"
+        assert list(response.get_json()["details"]) == ["0", "2"]
+        assert Venue.query.get(venues[2].id).name == "c"
+
+    def test_patch_request_fails_if_too_many_items(self, app, client, user):
+        app.config["BULK_MAX_ITEMS"] = 1
+        response = self.patch(client, user, [{"id": 1}, {"id": 2}])
+        assert response.status == "413 REQUEST ENTITY TOO LARGE"
+
+    def test_patch_request_fails_without_authentication(self, client):
+        response = client.patch("/venues", data="[]", content_type="application/json")
+        assert response.status == "401 UNAUTHORIZED"
+
+
+class TestDeleteVenues:
+    def delete(self, client, user, ids):
+        return client.delete(
+            "/venues?ids={}".format(",".join(map(str, ids))),
+            headers=create_token_auth_header(user.get_token()),
+        )
+
+    def test_delete_request_removes_venues(self, client, user, database):
+        venues = VenueFactory.create_batch(3, user=user)
+        database.session.commit()
+        ids = [venue.id for venue in venues]
+        response = self.delete(client, user, ids[:2])
+
+        assert response.status == "204 NO CONTENT"
+        assert [venue.id for venue in Venue.query.all()] == ids[2:]
+
+    def test_delete_request_deletes_in_one_statement(self, client, user, database):
+        venues = VenueFactory.create_batch(5, user=user)
+        token = user.get_token()
+        database.session.commit()
+        url = "/venues?ids={}".format(",".join(str(venue.id) for venue in venues))
+
+        # Authenticate, delete, bump the version.
+        with assert_statement_count(database.engine, 3):
+            client.delete(url, headers=create_token_auth_header(token))
+
+    def test_delete_request_returns_404_for_venue_of_another_user(
+        self, client, user, database
+    ):
+        venue = VenueFactory.create(user=user)
+        other = VenueFactory.create()
+        database.session.commit()
+        ids = [venue.id, other.id]
+        response = self.delete(client, user, ids)
+
+        assert response.status == "404 NOT FOUND"
+        assert response.get_json()["details"] == {"1": {"id": "not found"}}
+        assert Venue.query.count() == 2
+
+    @pytest.mark.parametrize("query", ["", "?ids=", "?ids=1,a"])
+    def test_delete_request_fails_if_ids_are_invalid(self, client, user, query):
+        response = client.delete(
+            "/venues" + query, headers=create_token_auth_header(user.get_token())
+        )
+
+        assert response.status == "400 BAD REQUEST"
+        assert "ids" in response.get_json()["details"]
+
+    def test_delete_request_fails_if_too_many_ids(self, app, client, user):
+        app.config["BULK_MAX_ITEMS"] = 1
+        response = self.delete(client, user, [1, 2])
+        assert response.status == "413 REQUEST ENTITY TOO LARGE"
+
+    def test_delete_request_fails_without_authentication(self, client):
+        response = client.delete("/venues?ids=1")
+        assert response.status == "401 UNAUTHORIZED"
+
+
 class TestPutVenue:
     def test_put_request_modifies_name(self, client, venue):
         original = venue_schema.dump(venue)
@@ -303,6 +1127,60 @@ class TestPutVenue:
         assert response.status == "422 UNPROCESSABLE ENTITY"
         assert "name" in response.get_json()["details"]
 
+    def test_put_request_returns_new_etag(self, client, venue):
+        response = client.put(
+            "/venues/{id}".format(id=venue.id),
+            data=json.dumps({"name": "john"}),
+            content_type="application/json",
+            headers=create_token_auth_header(venue.user.get_token()),
+        )
+
+        assert response.get_etag() == ("venues-{}-2".format(venue.id), False)
+
+    @pytest.mark.parametrize("etag", ['"venues-{id}-1"', '"venues-{id}-1.gzip"', "*"])
+    def test_put_request_succeeds_if_etag_matches(self, client, venue, etag):
+        headers = create_token_auth_header(venue.user.get_token())
+        headers["If-Match"] = etag.format(id=venue.id)
+        response = client.put(
+            "/venues/{id}".format(id=venue.id),
+            data=json.dumps({"name": "john"}),
+            content_type="application/json",
+            headers=headers,
+        )
+
+        assert response.status == "200 OK"
+
+    @pytest.mark.parametrize("etag", ['"venues-{id}-2"', 'W/"venues-{id}-1"'])
+    def test_put_request_returns_412_if_etag_does_not_match(self, client, venue, etag):
+        headers = create_token_auth_header(venue.user.get_token())
+        headers["If-Match"] = etag.format(id=venue.id)
+        response = client.put(
+            "/venues/{id}".format(id=venue.id),
+            data=json.dumps({"name": "john"}),
+            content_type="application/json",
+            headers=headers,
+        )
+
+        assert response.status == "412 PRECONDITION FAILED"
+        assert venue.name != "john"
+
+    def test_put_request_executes_five_statements(self, venue, client, database):
+        token = venue.user.get_token()
+        url = "/venues/{id}".format(id=venue.id)
+        database.session.commit()
+
+        # Authenticate, load the venue, bump the collection version, update
+        # the venue, and reload it after the commit.
+        with assert_statement_count(database.engine, 5):
+            response = client.put(
+                url,
+                data=json.dumps({"name": "john"}),
+                content_type="application/json",
+                headers=create_token_auth_header(token),
+            )
+
+        assert response.status == "200 OK"
+
 
 class TestDeleteVenue:
     def test_delete_request_removes_venue(self, venue, client):
@@ -351,3 +1229,23 @@ class TestDeleteVenue:
     def test_delete_request_fails_without_authentication(self, venue, client):
         response = client.delete("/venues/{id}".format(id=venue.id))
         assert response.status == "401 UNAUTHORIZED"
+
+    def test_delete_request_returns_412_if_etag_does_not_match(self, venue, client):
+        headers = create_token_auth_header(venue.user.get_token())
+        headers["If-Match"] = '"venues-{}-2"'.format(venue.id)
+        response = client.delete("/venues/{id}".format(id=venue.id), headers=headers)
+
+        assert response.status == "412 PRECONDITION FAILED"
+        assert Venue.query.get(venue.id) is not None
+
+    def test_delete_request_executes_four_statements(self, venue, client, database):
+        token = venue.user.get_token()
+        url = "/venues/{id}".format(id=venue.id)
+        database.session.commit()
+
+        # Authenticate, load the venue, bump the collection version, and
+        # delete the venue.
+        with assert_statement_count(database.engine, 4):
+            response = client.delete(url, headers=create_token_auth_header(token),)
+
+        assert response.status == "204 NO CONTENT"